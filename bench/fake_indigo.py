@@ -0,0 +1,76 @@
+"""
+Local stand-in for the Indigo flight search and seat map APIs, serving
+the data/ fixtures (or a bench.generate data set) with a simulated
+response time:
+
+    python -m bench.fake_indigo --port 8700 --latency 0.3 --jitter 0.1
+
+Point config/config.yaml at it for server_production.py:
+
+    indigo:
+      flight_search_url: http://127.0.0.1:8700/flight-search
+      seat_map_url: http://127.0.0.1:8700/seat-map
+"""
+import argparse
+import os
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def handler(bodies: dict, latency: float, jitter: float, failure_rate: float):
+
+    class FakeIndigo(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self):
+            length = int(self.headers.get("content-length") or 0)
+            if length:
+                self.rfile.read(length)
+
+            body = bodies.get(self.path.split("?")[0])
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+            if body is None or random.random() < failure_rate:
+                status, body = (404, b'{"errors":["not found"]}') if body is None else (503, b'{"errors":["unavailable"]}')
+            else:
+                status = 200
+
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_GET = _respond
+        do_POST = _respond
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeIndigo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve data files as the Indigo flight search and seat map APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--data", default="data")
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of requests answered with 503")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.data, "flights-dataa-extended.json"), "rb") as f:
+        flights = f.read()
+    with open(os.path.join(args.data, "available_seats.json"), "rb") as f:
+        seats = f.read()
+
+    bodies = {"/flight-search": flights, "/seat-map": seats}
+    server = ThreadingHTTPServer((args.host, args.port), handler(bodies, args.latency, args.jitter, args.failure_rate))
+    print(f"✈️ Fake Indigo on http://{args.host}:{args.port} (/flight-search, /seat-map)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
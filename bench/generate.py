@@ -0,0 +1,227 @@
+"""
+Synthetic data at scale, shaped like the fixtures in data/:
+
+    python -m bench.generate --out /tmp/bench-data --profiles 100000 \
+        --cancellations 100000 --journeys 20000 --seat-maps 500
+
+Every record is cloned from a fixture record and given fresh identities
+(names, contacts, GUIDs, PNRs, flight numbers, departure times, seat
+availability). Cancellations belong to generated profiles and fly
+generated routes, so lookups in the benchmarks hit real data. Files are
+written one record at a time, so memory stays flat at any size.
+"""
+import argparse
+import copy
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from tools.codec import dumps, load_file
+
+
+LAST_NAMES = (
+    "Mehta", "Sharma", "Iyer", "Reddy", "Nair", "Gupta", "Desai", "Rao", "Kapoor", "Singh",
+    "Patel", "Menon", "Joshi", "Bose", "Khan", "Das", "Pillai", "Verma", "Chopra", "Kulkarni"
+)
+FIRST_NAMES = (
+    "Karan", "Rohini", "Aarav", "Diya", "Vikram", "Ananya", "Rahul", "Priya", "Arjun", "Meera"
+)
+ROUTES = (
+    ("DEL", "BOM"), ("BLR", "HYD"), ("BOM", "BLR"), ("DEL", "BLR"),
+    ("HYD", "MAA"), ("CCU", "DEL"), ("MAA", "BOM"), ("GOI", "DEL")
+)
+BASE_DEPARTURE = datetime(2025, 12, 27, tzinfo=timezone.utc)
+IST = timedelta(hours=5, minutes=30)
+
+
+def utc(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def flight_number(i: int) -> str:
+    return f"6E{100 + i % 9000}"
+
+
+def departure(i: int) -> datetime:
+    """Flight i's departure: spread over three days in 5-minute steps."""
+    return BASE_DEPARTURE + timedelta(minutes=5 * (i * 7919 % 864))
+
+
+class ArrayWriter:
+    """Writes a JSON array to a file one element at a time."""
+
+    def __init__(self, f, prefix: str = "", suffix: str = ""):
+        self.f = f
+        self.suffix = suffix
+        self.first = True
+        f.write(prefix + "[")
+
+    def write(self, record):
+        self.f.write(("" if self.first else ",") + "\n" + dumps(record))
+        self.first = False
+
+    def close(self):
+        self.f.write("\n]" + self.suffix)
+
+
+def user(i: int, seed: int) -> dict:
+    """Profile i's user_info; derived from i alone, so cancellations can rebuild it."""
+    last = LAST_NAMES[i % len(LAST_NAMES)]
+    first = FIRST_NAMES[(i // len(LAST_NAMES)) % len(FIRST_NAMES)]
+    return {
+        "USR_FIRSTNAME": first,
+        "USR_LASTNAME": last,
+        "USR_MOBILE": str(9000000000 + i),
+        "USR_EMAIL": f"{first.lower()}.{last.lower()}{i}@mail.com",
+        "USR_GUID": str(uuid.uuid5(uuid.NAMESPACE_OID, f"{seed}-{i}"))
+    }
+
+
+def write_profiles(path: str, templates: list, count: int, seed: int, rng: random.Random):
+    with open(path, "w", encoding="utf-8") as f:
+        out = ArrayWriter(f)
+        for i in range(count):
+            template = templates[i % len(templates)]
+            info = user(i, seed)
+            booking = dict(template["booking_details"][0])
+            booking["USR_GUID"] = info["USR_GUID"]
+            booking["HIGHSPENDERHIGHFREQ"] = rng.random() < 0.3
+            booking["HIGHSPENDERLOWFREQ"] = rng.random() < 0.1
+            booking["STUDENT"] = int(rng.random() < 0.2)
+            booking["TOTALSPEND"] = round(rng.uniform(5000, 400000), 2)
+            out.write({"user_info": info, "booking_details": [booking]})
+        out.close()
+
+
+def write_cancellations(path: str, templates: list, count: int, profiles: int,
+                        flights: int, seed: int, rng: random.Random):
+    cancelled = [t for t in templates if t.get("event_type") == "flight_cancelled"] or templates
+    other = [t for t in templates if t.get("event_type") != "flight_cancelled"] or templates
+
+    with open(path, "w", encoding="utf-8") as f:
+        out = ArrayWriter(f)
+        for i in range(count):
+            is_cancelled = rng.random() < 0.7
+            record = dict(rng.choice(cancelled if is_cancelled else other))
+            info = user(rng.randrange(max(profiles, 1)), seed)
+            flight = rng.randrange(max(flights, 1))
+            origin, destination = ROUTES[flight % len(ROUTES)]
+            departs = departure(flight)
+
+            record.update({
+                "USR_GUID": info["USR_GUID"],
+                "user_info": {k: info[k] for k in ("USR_FIRSTNAME", "USR_LASTNAME", "USR_MOBILE", "USR_EMAIL")},
+                "pnr": f"PNR{i:08d}",
+                "ticket_number": f"TKT{i:08d}",
+                "origin": origin,
+                "destination": destination,
+                "flight_number": flight_number(flight),
+                "scheduled_departure_time": (departs + IST).strftime("%Y-%m-%dT%H:%M:%S"),
+                "scheduled_arrival_time": (departs + IST + timedelta(minutes=135)).strftime("%Y-%m-%dT%H:%M:%S"),
+                "utc_scheduled_departure": utc(departs),
+                "utc_scheduled_arrival": utc(departs + timedelta(minutes=135))
+            })
+            out.write(record)
+        out.close()
+
+
+def write_flight_search(path: str, template: dict, count: int, per_trip: int, rng: random.Random):
+    journeys = [j for t in template["data"]["trips"] for j in t.get("journeysAvailable", [])]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"data":{"trips":[')
+        for trip_start in range(0, count, per_trip):
+            out = ArrayWriter(f, prefix=("," if trip_start else "") + '\n{"journeysAvailable":', suffix="}")
+            for i in range(trip_start, min(trip_start + per_trip, count)):
+                journey = copy.deepcopy(journeys[i % len(journeys)])
+                origin, destination = ROUTES[i % len(ROUTES)]
+                departs = departure(i)
+                times = {
+                    "origin": origin,
+                    "destination": destination,
+                    "utcDeparture": utc(departs),
+                    "utcArrival": utc(departs + timedelta(minutes=rng.choice((75, 105, 135, 160))))
+                }
+
+                journey["journeyKey"] = f"J{i:09d}"
+                journey["fillingFast"] = rng.random() < 0.2
+                journey.get("designator", {}).update(times)
+                for segment in journey.get("segments", [])[:1]:
+                    segment.setdefault("designator", {}).update(times)
+                    segment.setdefault("identifier", {}).update(
+                        {"carrierCode": "6E", "identifier": flight_number(i)[2:]}
+                    )
+                for fare in journey.get("passengerFares") or []:
+                    if fare.get("totalFareAmount") is not None:
+                        fare["totalFareAmount"] = round(fare["totalFareAmount"] * rng.uniform(0.7, 1.6))
+                out.write(journey)
+            out.close()
+        f.write("\n]}}")
+
+
+def write_seat_maps(path: str, template: dict, count: int, rng: random.Random):
+    seat_maps = template["data"]["seatMaps"]
+
+    with open(path, "w", encoding="utf-8") as f:
+        out = ArrayWriter(f, prefix='{"data":{"seatMaps":', suffix="}}")
+        for i in range(count):
+            entry = copy.deepcopy(seat_maps[i % len(seat_maps)])
+            seat_map = entry.setdefault("seatMap", {})
+            seat_map["departureStation"], seat_map["arrivalStation"] = ROUTES[i % len(ROUTES)]
+            seat_map["name"] = f"{seat_map['departureStation']}-{seat_map['arrivalStation']} {i}"
+
+            for deck in seat_map.get("decks", {}).values():
+                for cabin in deck.get("compartments", {}).values():
+                    for unit in cabin.get("units", []):
+                        unit["availability"] = rng.choice((0, 0, 5, 7, 13))
+                        unit["assignable"] = rng.random() < 0.85
+            out.write(entry)
+        out.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate scaled copies of the data/ fixtures")
+    parser.add_argument("--out", required=True, help="directory for the generated files")
+    parser.add_argument("--templates", default="data", help="fixture directory to clone records from")
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--cancellations", type=int, default=10000)
+    parser.add_argument("--journeys", type=int, default=10000)
+    parser.add_argument("--journeys-per-trip", type=int, default=100)
+    parser.add_argument("--seat-maps", type=int, default=100, help="aircraft seat maps (~220 seats each)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    os.makedirs(args.out, exist_ok=True)
+
+    started = time.perf_counter()
+    write_profiles(
+        os.path.join(args.out, "cdp.json"),
+        load_file(os.path.join(args.templates, "cdp.json")),
+        args.profiles, args.seed, rng
+    )
+    write_cancellations(
+        os.path.join(args.out, "cancell_trigger.json"),
+        load_file(os.path.join(args.templates, "cancell_trigger.json")),
+        args.cancellations, args.profiles, args.journeys, args.seed, rng
+    )
+    write_flight_search(
+        os.path.join(args.out, "flights-dataa-extended.json"),
+        load_file(os.path.join(args.templates, "flights-dataa-extended.json")),
+        args.journeys, args.journeys_per_trip, rng
+    )
+    write_seat_maps(
+        os.path.join(args.out, "available_seats.json"),
+        load_file(os.path.join(args.templates, "available_seats.json")),
+        args.seat_maps, rng
+    )
+
+    for name in sorted(os.listdir(args.out)):
+        print(f"📦 {name}: {os.path.getsize(os.path.join(args.out, name)) / 1e6:.1f} MB")
+    print(f"✅ Generated in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Load driver for POST /flight-recovery:
+
+    python -m bench.load --api http://127.0.0.1:9000 --mcp http://127.0.0.1:8765 \
+        --cancellations data/cancell_trigger.json --rps 50 --duration 30
+    python -m bench.load --api http://127.0.0.1:9000 --input recoveries.jsonl --concurrency 32
+
+Requests come from a JSONL file of {"pnr": ..., "last_name": ...} lines,
+or are built from a cancellations file. They are sent in order and the
+input repeats as needed. --rps is an open loop: requests start on
+schedule however slow the responses are. --concurrency is a closed loop
+with that many requests in flight. Before and after the run the API's
+and the MCP server's /metrics are scraped. The difference gives each
+stage's count, mean and estimated p50/p99, plus its errors.
+
+For a fully offline run, start bench.fake_indigo and set
+`azure.backend: fake` (tools/agent_backend.FakeAgentBackend) first.
+"""
+import argparse
+import asyncio
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from tools.codec import dumps, load_file, loads
+
+
+SAMPLE = re.compile(r'^(\w+)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def load_requests(path: Optional[str], cancellations: Optional[str]) -> List[dict]:
+    if path:
+        with open(path, "rb") as f:
+            return [loads(line) for line in f if line.strip()]
+
+    return [
+        {"pnr": c.get("pnr"), "last_name": c.get("user_info", {}).get("USR_LASTNAME", "")}
+        for c in load_file(cancellations, "cancellations")
+    ]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))]
+
+
+# ---------- /metrics scraping ----------
+
+def parse_metrics(text: str) -> Dict[Tuple[str, Tuple], float]:
+    samples = {}
+    for line in text.splitlines():
+        match = SAMPLE.match(line)
+        if match:
+            name, labels, value = match.groups()
+            samples[(name, tuple(LABEL.findall(labels or "")))] = float(value)
+    return samples
+
+
+async def scrape(http: httpx.AsyncClient, urls: List[str]) -> Dict[Tuple[str, Tuple], float]:
+    samples = {}
+    for url in urls:
+        try:
+            response = await http.get(url.rstrip("/") + "/metrics")
+            samples.update(parse_metrics(response.text))
+        except httpx.HTTPError as e:
+            print(f"⚠️ Could not scrape {url}/metrics: {e}")
+    return samples
+
+
+def stage_report(before: dict, after: dict) -> List[dict]:
+    """Per-stage deltas of recovery_stage_seconds / recovery_stage_errors_total."""
+    stages: Dict[Tuple, dict] = {}
+
+    for (name, labels), value in after.items():
+        delta = value - before.get((name, labels), 0.0)
+        if name == "recovery_stage_seconds_bucket":
+            key = tuple(l for l in labels if l[0] != "le")
+            le = dict(labels)["le"]
+            stages.setdefault(key, {"buckets": []})["buckets"].append((float(le), delta))
+        elif name in ("recovery_stage_seconds_sum", "recovery_stage_seconds_count", "recovery_stage_errors_total"):
+            stages.setdefault(labels, {"buckets": []})[name.rsplit("_", 1)[-1]] = delta
+
+    rows = []
+    for labels, s in stages.items():
+        count = s.get("count", 0)
+        if not count:
+            continue
+        buckets = sorted(s["buckets"])
+        rows.append({
+            "stage": " ".join(v for _, v in labels),
+            "count": int(count),
+            "errors": int(s.get("total", 0)),
+            "mean_ms": s.get("sum", 0) / count * 1000,
+            "p50_ms": bucket_quantile(buckets, count, 0.5) * 1000,
+            "p99_ms": bucket_quantile(buckets, count, 0.99) * 1000
+        })
+    return sorted(rows, key=lambda r: -r["mean_ms"])
+
+
+def bucket_quantile(buckets: List[Tuple[float, float]], count: float, q: float) -> float:
+    """Upper bound of the bucket holding quantile q (cumulative buckets)."""
+    for bound, cumulative in buckets:
+        if cumulative >= q * count:
+            return bound if bound != float("inf") else buckets[-2][0]
+    return 0.0
+
+
+# ---------- driver ----------
+
+async def send(http: httpx.AsyncClient, api: str, body: dict, results: list):
+    started = time.perf_counter()
+    try:
+        response = await http.post(api.rstrip("/") + "/flight-recovery", content=dumps(body),
+                                   headers={"content-type": "application/json"})
+        status = response.status_code
+        outcome = loads(response.content).get("status") if status == 200 else None
+    except httpx.HTTPError as e:
+        status, outcome = type(e).__name__, None
+    results.append((time.perf_counter() - started, status, outcome))
+
+
+async def run(args) -> Tuple[list, float, List[dict]]:
+    bodies = load_requests(args.input, args.cancellations)
+    results: list = []
+
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as http:
+        metric_urls = [u for u in (args.api, args.mcp) if u]
+        before = await scrape(http, metric_urls)
+        started = time.perf_counter()
+        deadline = started + args.duration
+
+        if args.rps:
+            tasks = []
+            i = 0
+            while True:
+                at = started + i / args.rps
+                if at >= deadline:
+                    break
+                await asyncio.sleep(max(0.0, at - time.perf_counter()))
+                tasks.append(asyncio.create_task(send(http, args.api, bodies[i % len(bodies)], results)))
+                i += 1
+            await asyncio.gather(*tasks)
+        else:
+            counter = iter(range(10 ** 12))
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    await send(http, args.api, bodies[next(counter) % len(bodies)], results)
+
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+        elapsed = time.perf_counter() - started
+        after = await scrape(http, metric_urls)
+
+    return results, elapsed, stage_report(before, after)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive /flight-recovery at a fixed rate or concurrency")
+    parser.add_argument("--api", default="http://127.0.0.1:9000")
+    parser.add_argument("--mcp", help="MCP server base URL, for its /metrics")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="JSONL of {pnr, last_name} requests")
+    source.add_argument("--cancellations", help="build requests from a cancellations file")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rps", type=float, help="open loop: requests started per second")
+    mode.add_argument("--concurrency", type=int, help="closed loop: requests in flight")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to send for")
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--json", help="write the summary to this file")
+    args = parser.parse_args()
+
+    results, elapsed, stages = asyncio.run(run(args))
+
+    latencies = sorted(r[0] for r in results)
+    statuses = Counter(str(r[1]) for r in results)
+    outcomes = Counter(str(r[2]) for r in results if r[1] == 200)
+    errors = sum(n for s, n in statuses.items() if s != "200")
+
+    summary = {
+        "requests": len(results),
+        "throughput_rps": len(results) / elapsed if elapsed else 0.0,
+        "error_rate": errors / len(results) if results else 0.0,
+        "http_status": dict(statuses),
+        "recovery_status": dict(outcomes),
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p90": percentile(latencies, 90) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": (latencies[-1] if latencies else 0.0) * 1000
+        },
+        "stages": stages
+    }
+
+    print(f"📈 {summary['requests']} requests in {elapsed:.1f}s: {summary['throughput_rps']:.1f} req/s, "
+          f"error rate {summary['error_rate']:.2%}")
+    print(f"   HTTP {summary['http_status']}  recovery {summary['recovery_status']}")
+    print("   latency ms  " + "  ".join(f"{k} {v:.1f}" for k, v in summary["latency_ms"].items()))
+
+    if stages:
+        print(f"\n{'stage':<40}{'count':>8}{'errors':>8}{'mean ms':>10}{'~p50 ms':>10}{'~p99 ms':>10}")
+        for r in stages:
+            print(f"{r['stage']:<40}{r['count']:>8}{r['errors']:>8}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Micro-benchmarks for the recovery hot paths:
+
+    python -m bench.run --data /tmp/bench-data --seconds 2 --json results.json
+    python -m bench.run --data /tmp/bench-data --baseline results.json
+
+Each case is called repeatedly for --seconds (at least --min-calls times)
+with inputs drawn from the data set, reporting throughput and latency
+percentiles. Peak memory is the tracemalloc peak of one extra call. With
+--baseline, a p50 or peak memory more than --tolerance above the
+baseline's fails the run (exit status 1). Run from the repository root;
+every case calls the tools modules directly on the --data files, so no
+config, .env or server is needed.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from tools.cancellation_index import CancellationIndex
+from tools.codec import dumps, load_file
+from tools.flight_catalog import extract_available_flights
+from tools.profile import find_users
+from tools.profile_store import ProfileStore
+from tools.seat_inventory import SeatInventory
+from tools.seat_available import filter_available_seats_keep_structure
+from tools.validator import check_user_autorecovery_eligibility
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(fn: Callable[[Any], Any], inputs: List[Any], seconds: float, min_calls: int) -> Dict[str, float]:
+    timings = []
+    deadline = time.perf_counter() + seconds
+    i = 0
+
+    gc.collect()
+    while len(timings) < min_calls or time.perf_counter() < deadline:
+        arg = inputs[i % len(inputs)]
+        i += 1
+        started = time.perf_counter_ns()
+        fn(arg)
+        timings.append(time.perf_counter_ns() - started)
+
+    tracemalloc.start()
+    fn(inputs[0])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    total = sum(timings) / 1e9
+    return {
+        "calls": len(timings),
+        "ops_per_sec": len(timings) / total if total else float("inf"),
+        "p50_ms": percentile(timings, 50) / 1e6,
+        "p95_ms": percentile(timings, 95) / 1e6,
+        "p99_ms": percentile(timings, 99) / 1e6,
+        "max_ms": timings[-1] / 1e6,
+        "peak_kib": peak / 1024
+    }
+
+
+def build_cases(data_dir: str, samples: int, rng: random.Random) -> Dict[str, tuple]:
+    cancellations = CancellationIndex.from_file(os.path.join(data_dir, "cancell_trigger.json"))
+    cdp = load_file(os.path.join(data_dir, "cdp.json"), "cdp")
+    flights_json = load_file(os.path.join(data_dir, "flights-dataa-extended.json"))
+    seat_json = load_file(os.path.join(data_dir, "available_seats.json"))
+
+    store = ProfileStore(cdp)
+    picked = [rng.choice(cancellations.records) for _ in range(samples)]
+    pnrs = [c.get("pnr") for c in picked]
+    # mostly real passengers, plus misses and wrong contacts
+    people = [
+        (c["user_info"].get("USR_LASTNAME"), c["user_info"].get("USR_EMAIL") or str(c["user_info"].get("USR_MOBILE")))
+        for c in picked
+    ]
+    people[::10] = [("Nobody", "nobody@example.com")] * len(people[::10])
+
+    return {
+        "find_cancellation": (cancellations.by_pnr, pnrs),
+        "cancellations_for_flight": (
+            lambda c: cancellations.find(flight_number=c.get("flight_number"), event_type="flight_cancelled"), picked
+        ),
+        "check_user_autorecovery_eligibility": (
+            lambda p: check_user_autorecovery_eligibility(p[0], p[1], store=store), people
+        ),
+        "find_users": (lambda p: find_users(p[0], p[1], store=store), people),
+        "extract_available_flights": (extract_available_flights, [flights_json]),
+        "extract_available_seats_from_seatmap": (lambda s: SeatInventory.from_seatmap(s).to_list(), [seat_json]),
+        "filter_available_seats_keep_structure": (filter_available_seats_keep_structure, [seat_json]),
+    }
+
+
+def report(results: Dict[str, Dict[str, float]]):
+    print(f"{'case':<40}{'calls':>8}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'peak KiB':>11}")
+    for name, r in results.items():
+        print(
+            f"{name:<40}{r['calls']:>8}{r['ops_per_sec']:>12.1f}{r['p50_ms']:>10.3f}"
+            f"{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['max_ms']:>10.3f}{r['peak_kib']:>11.1f}"
+        )
+
+
+def regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    found = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key in ("p50_ms", "peak_kib"):
+            if base[key] > 0 and r[key] > base[key] * (1 + tolerance):
+                found.append(f"{name} {key}: {base[key]:.3f} -> {r[key]:.3f}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recovery hot paths")
+    parser.add_argument("--data", default="data", help="directory with the four data files (see bench.generate)")
+    parser.add_argument("--cases", nargs="*", help="only these cases")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per case")
+    parser.add_argument("--min-calls", type=int, default=5)
+    parser.add_argument("--samples", type=int, default=1000, help="distinct lookup inputs per case")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    cases = build_cases(args.data, args.samples, random.Random(args.seed))
+    results = {}
+    for name, (fn, inputs) in cases.items():
+        if args.cases and name not in args.cases:
+            continue
+        results[name] = measure(fn, inputs, args.seconds, args.min_calls)
+
+    report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(dumps(results))
+
+    if args.baseline:
+        found = regressions(results, load_file(args.baseline), args.tolerance)
+        for line in found:
+            print(f"❌ Regression: {line}")
+        if found:
+            sys.exit(1)
+        print("✅ No regressions against", args.baseline)
+
+
+if __name__ == "__main__":
+    main()
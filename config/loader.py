@@ -14,6 +14,10 @@ def load_config():
     }
 
     missing = [k for k, v in secrets.items() if not v]
+
+    # optional: without it, operator-only endpoints (bulk recovery) are disabled
+    secrets["OPERATOR_API_KEY"] = os.getenv("OPERATOR_API_KEY")
+
     if missing:
         raise RuntimeError(
             f"Missing required Indigo environment variables: {missing}"
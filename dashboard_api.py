@@ -1,15 +1,38 @@
-import json
-import requests
-from fastapi import FastAPI, HTTPException
+import asyncio
+import hmac
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from azure.ai.projects import AIProjectClient
-from azure.identity import DefaultAzureCredential
-from azure.ai.agents.models import ListSortOrder
+from tools.agent_backend import create_agent_backend
+from tools.agent_runs import AgentRunError
+from tools.scoring import decide_recovery, passenger_booking, passenger_segment, score_seats, seat_reason
+from tools.batch_scoring import FlightColumns, SeatColumns, score_cohort
+from tools.codec import HAS_ORJSON, dumps
+from tools.decision_cache import DecisionCache, canonical_key
+from tools.mcp_client import MCPClient
+from tools.recovery_ingest import CancellationFeed, CancellationIngestor, RecoveryNotReady, RecoveryStore
+from tools.metrics import PROMETHEUS_CONTENT_TYPE, render
+from tools.tracing import TRACE_HEADER, bind_trace_id, span
+from tools.prompt_builder import (
+    AGENT_INSTRUCTIONS,
+    FLIGHT_FIELDS,
+    ORIGINAL_FIELDS,
+    PASSENGER_FIELDS,
+    SEAT_FIELDS,
+    build_recovery_prompt,
+    expand_agent_output,
+)
 from config.loader import load_config
 
 
-config, _ = load_config()
+config, secrets = load_config()
 
 try:
     PROJECT_ENDPOINT = config["azure"]["project_endpoint"]
@@ -23,64 +46,142 @@ MCP_URL = (
     f"{config['server']['mcp_path']}"
 )
 
+MCP_TIMEOUT = config["server"].get("mcp_timeout", 30)
+MCP_MAX_CONNECTIONS = config["server"].get("mcp_max_connections", 100)
+AGENT_RUN_TIMEOUT = config["azure"].get("run_timeout", 120)
+AGENT_PROMPT = config["azure"].get("prompt", {})
+# opt-in: push AGENT_INSTRUCTIONS to the (shared) agent at startup so messages carry only data;
+# otherwise, or if the sync fails, every message carries the rules
+SYNC_INSTRUCTIONS = config["azure"].get("sync_instructions", False)
 
-app = FastAPI(title="Flight Recovery API")
+# agent: always ask the agent | local: rules only | auto: rules when they decide, else agent
+DECISION_MODE = config.get("recovery", {}).get("decision_mode", "agent")
+BULK_CONCURRENCY = config.get("recovery", {}).get("bulk_concurrency", 8)
+# hold + confirm the chosen seat on the MCP server so concurrent recoveries never share one;
+# only servers that advertise the seat tools (server.py) can do this
+SEAT_HOLDS = config.get("recovery", {}).get("seat_holds", True)
+SEAT_ATTEMPTS = config.get("recovery", {}).get("seat_attempts", 5)
+DECISION_CACHE = config.get("recovery", {}).get("decision_cache", {})
+# ask recover_passenger for projected, top-K candidates instead of the full payload
+LEAN_PAYLOAD = config.get("recovery", {}).get("lean_payload", True)
+INGEST = config.get("recovery", {}).get("ingest", {})
+# bulk recovery acts on whole flights without passenger last names: operators only
+OPERATOR_API_KEY = secrets.get("OPERATOR_API_KEY")
+OPERATOR_HEADER = "x-operator-key"
+# how often a precomputed hit re-asks the MCP server for its data snapshot version
+SNAPSHOT_CHECK_INTERVAL = config.get("data", {}).get("reload_interval", 2)
 
 
+logger = logging.getLogger("flight-recovery-api")
 
-class RecoveryRequest(BaseModel):
-    pnr: str
-    last_name: str
 
+# one keep-alive connection pool to the MCP server for the whole process
+mcp_client = MCPClient(MCP_URL, timeout=MCP_TIMEOUT, max_connections=MCP_MAX_CONNECTIONS)
 
 
+# process-wide agent client (or the offline fake), created in lifespan
+agent_backend = None
 
-def execute_mcp_tool(tool_name: str, arguments: dict) -> dict:
-    payload = {
-        "jsonrpc": "2.0",
-        "method": "tools/call",
-        "params": {
-            "name": tool_name,
-            "arguments": arguments
-        },
-        "id": 1
-    }
+# whether the agent's own instructions hold AGENT_INSTRUCTIONS (set by a successful sync)
+instructions_synced = False
 
-    headers = {
-        "Accept": "application/json, text/event-stream",
-        "Content-Type": "application/json"
-    }
+# tool name -> input schema advertised by the MCP server, listed once it answers
+mcp_tools: Optional[Dict[str, dict]] = None
 
-    response = requests.post(MCP_URL, json=payload, headers=headers, timeout=30)
+# recoveries decided ahead of the passenger's request, filled from the INGEST feed
+recovery_store = RecoveryStore(
+    max_entries=INGEST.get("max_entries", 100000),
+    ttl=INGEST.get("ttl", 900)
+)
 
-    if response.status_code != 200:
-        raise RuntimeError(response.text)
+# monotonic time of the last snapshot_version check
+snapshot_checked_at = float("-inf")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global agent_backend, instructions_synced
+    agent_backend = create_agent_backend(config["azure"])
+    await agent_backend.start()
+
+    if SYNC_INSTRUCTIONS:
+        try:
+            await agent_backend.sync_instructions(AGENT_INSTRUCTIONS)
+            instructions_synced = True
+        except Exception as e:
+            logger.warning("⚠️ Could not sync agent instructions, sending them with every message: %s", e)
+
+    await mcp_client.start()
+
+    ingestor = None
+    if INGEST.get("path"):
+        ingestor = CancellationIngestor(
+            CancellationFeed(
+                INGEST["path"],
+                poll_interval=INGEST.get("poll_interval", 1),
+                from_start=INGEST.get("from_start", False)
+            ),
+            precompute_recovery,
+            recovery_store,
+            workers=INGEST.get("workers", 4),
+            queue_size=INGEST.get("queue_size", 1000),
+            retries=INGEST.get("retries", 5),
+            retry_delay=INGEST.get("retry_delay", 2)
+        )
+        ingestor.start()
+
+    try:
+        yield
+    finally:
+        if ingestor is not None:
+            await ingestor.close()
+        await mcp_client.close()
+        await agent_backend.close()
+
+
+app = FastAPI(
+    title="Flight Recovery API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if HAS_ORJSON else JSONResponse
+)
+
+
+# agent decisions shared by passengers with identical recovery inputs; max_entries 0 disables
+decision_cache = DecisionCache(
+    max_entries=DECISION_CACHE.get("max_entries", 1024),
+    ttl=DECISION_CACHE.get("ttl", 300)
+)
+
+
+
+class RecoveryRequest(BaseModel):
+    pnr: str
+    last_name: str
 
-    for line in response.text.splitlines():
-        if not line.startswith("data:"):
-            continue
 
-        raw = line.replace("data:", "", 1).strip()
-        mcp_payload = json.loads(raw)
-        result = mcp_payload.get("result", {})
 
-        structured = result.get("structuredContent", {})
-        content = structured.get("content", [])
 
-        if content and content[0].get("type") == "json":
-            return content[0]["json"]
+async def execute_mcp_tool(tool_name: str, arguments: dict) -> dict:
+    with span("mcp_round_trip", tool=tool_name):
+        return await mcp_client.call_tool(tool_name, arguments)
 
-        for item in result.get("content", []):
-            if item.get("type") == "text":
-                try:
-                    embedded = json.loads(item["text"])
-                    for c in embedded.get("content", []):
-                        if c.get("type") == "json":
-                            return c["json"]
-                except Exception:
-                    pass
 
-    raise RuntimeError("No MCP JSON response found")
+async def advertised_tools() -> Dict[str, dict]:
+    """The MCP server's tools, listed on first use; an unreachable server is asked again next time."""
+    global mcp_tools
+    if mcp_tools is None:
+        try:
+            mcp_tools = await mcp_client.list_tools()
+        except Exception as e:
+            logger.warning("⚠️ Could not list MCP tools: %s", e)
+            return {}
+        logger.info("🧰 MCP server tools: %s", ", ".join(sorted(mcp_tools)))
+    return mcp_tools
+
+
+async def seat_holds_enabled() -> bool:
+    return SEAT_HOLDS and "hold_seat" in await advertised_tools()
+
 
 
 
@@ -90,242 +191,505 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[TRACE_HEADER],
 )
-@app.post("/flight-recovery")
-def flight_recovery(request: RecoveryRequest):
-    try:
 
-        mcp_data = execute_mcp_tool(
-            "recover_passenger",
-            {"pnr": request.pnr, "last_name": request.last_name}
-        )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """One trace id per request (the caller's x-trace-id if sent), passed on to the MCP server."""
+    trace_id = bind_trace_id(request.headers.get(TRACE_HEADER))
+    response = await call_next(request)
+    response.headers[TRACE_HEADER] = trace_id
+    return response
 
-        if mcp_data.get("status") != "success":
-            return {
-                "status": mcp_data.get("status"),
-                "reason": mcp_data.get("reason"),
-                "message": "Passenger not eligible for auto-recovery. Agent NOT invoked."
-            }
 
-        recovery = mcp_data.get("recovery", {})
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 
-        if not recovery.get("available_flights") or not recovery.get("available_seats"):
-            return {
-                "status": "error",
-                "message": "Flights or seats missing — agent invocation blocked."
-            }
+async def run_recovery_agent(prompt: str) -> dict:
+    with span("agent_run"):
+        return await agent_backend.run(prompt)
 
 
-        booking = (
-            mcp_data.get("passenger", {})
-            .get("Past Data", [{}])[0]
-            .get("booking_details", [{}])[0]
-        )
+def precheck_recovery(mcp_data: dict):
+    """Response for payloads the agent must not see, else None."""
+    if mcp_data.get("status") != "success":
+        return {
+            "status": mcp_data.get("status"),
+            "reason": mcp_data.get("reason"),
+            "message": "Passenger not eligible for auto-recovery. Agent NOT invoked."
+        }
 
-        if booking.get("STUDENT", 0) > 0:
-            recovery["available_seats"] = [
-                s for s in recovery["available_seats"]
-                if s.get("travel_class") == "Y"
-            ]
+    recovery = mcp_data.get("recovery", {})
+
+    if not recovery.get("available_flights") or not recovery.get("available_seats"):
+        return {
+            "status": "error",
+            "message": "Flights or seats missing — agent invocation blocked."
+        }
+
+    return None
 
 
-        client = AIProjectClient(
-            endpoint=PROJECT_ENDPOINT,
-            credential=DefaultAzureCredential()
+def restrict_student_seats(mcp_data: dict) -> bool:
+    """Students only get economy seats. Returns True if the filter applied."""
+    recovery = mcp_data.get("recovery", {})
+
+    booking = (
+        mcp_data.get("passenger", {})
+        .get("Past Data", [{}])[0]
+        .get("booking_details", [{}])[0]
+    )
+
+    if booking.get("STUDENT", 0) > 0:
+        recovery["available_seats"] = [
+            s for s in recovery["available_seats"]
+            if s.get("travel_class") == "Y"
+        ]
+        return True
+
+    return False
+
+
+def local_response(local: dict) -> dict:
+    if local["decision"] is None:
+        return {
+            "status": "error",
+            "message": "No flight or seat satisfies the recovery rules."
+        }
+
+    return {
+        "status": "success",
+        **local["decision"],
+        "decision_source": "rules"
+    }
+
+
+def decision_key(mcp_data: dict) -> str:
+    """
+    Canonical hash of everything the agent's decision depends on: segment,
+    cabin, journey intent, original route/times and the candidate flights.
+    Seats are covered by the snapshot version when the server sends one
+    (secure_seat resolves seats taken since), else by the seat list itself.
+    """
+    original = mcp_data.get("original_flight", {})
+    recovery = mcp_data.get("recovery", {})
+    booking = passenger_booking(mcp_data)
+
+    return canonical_key(
+        passenger_segment(booking),
+        original.get("cabin_class"),
+        {"BUSINESS": booking.get("BUSINESS"), "LEISURE": booking.get("LEISURE")},
+        original.get("origin"),
+        original.get("destination"),
+        original.get("utc_scheduled_departure"),
+        original.get("utc_scheduled_arrival"),
+        recovery.get("available_flights", []),
+        mcp_data.get("snapshot_version") or recovery.get("available_seats", [])
+    )
+
+
+async def agent_decision(mcp_data: dict) -> dict:
+    """Agent output for the payload, shared through decision_cache when enabled."""
+    async def run():
+        with span("prompt_build"):
+            prompt = build_recovery_prompt(
+                mcp_data,
+                max_flights=AGENT_PROMPT.get("max_flights", 10),
+                max_seats=AGENT_PROMPT.get("max_seats", 15),
+                instructions=None if instructions_synced else AGENT_INSTRUCTIONS
+            )
+        return await run_recovery_agent(prompt)
+
+    if decision_cache.max_entries <= 0:
+        return await run()
+
+    return await decision_cache.get_or_compute(
+        decision_key(mcp_data),
+        run,
+        version=mcp_data.get("snapshot_version")
+    )
+
+
+def uses_local(local: dict) -> bool:
+    """Whether DECISION_MODE answers with this decide_recovery result instead of the agent."""
+    return local["decided"] or DECISION_MODE == "local"
+
+
+async def secure_seat(mcp_data: dict, response: dict) -> dict:
+    """
+    Hold and confirm the decided seat. If another recovery already took it,
+    fall back to the next best seats under the same rules, up to
+    SEAT_ATTEMPTS seats in total.
+    """
+    flight = response.get("selected_flight") or {}
+    chosen = response.get("selected_seat") or {}
+    original = mcp_data.get("original_flight", {})
+    segment = passenger_segment(passenger_booking(mcp_data))
+
+    candidates = [chosen] + [
+        seat for _, seat in score_seats(mcp_data.get("recovery", {}).get("available_seats", []), original, segment)
+        if seat.get("seat_number") != chosen.get("seat_number")
+        or seat.get("travel_class") != chosen.get("travel_class")
+    ]
+
+    for seat in candidates[:SEAT_ATTEMPTS]:
+        hold = await execute_mcp_tool("hold_seat", {
+            "pnr": mcp_data.get("pnr"),
+            "flight_uid": flight.get("flight_uid"),
+            "seat_number": seat.get("seat_number"),
+            "travel_class": seat.get("travel_class")
+        })
+        status = hold.get("status")
+        if status == "held":
+            confirmed = await execute_mcp_tool("confirm_seat", {"hold_id": hold["hold_id"]})
+            status = confirmed.get("status")
+
+        if hold.get("reason") == "UNKNOWN_FLIGHT":
+            logger.warning("⚠️ Flight %s is not in the MCP catalogue, no seat held for PNR %s",
+                           flight.get("flight_uid"), mcp_data.get("pnr"))
+            break
+
+        # only a confirmed seat is secured ("confirmed" straight away: this PNR already had it)
+        if status != "confirmed":
+            if status != "unavailable":
+                logger.warning("⚠️ Could not secure seat %s for PNR %s: %s",
+                               seat.get("seat_number"), mcp_data.get("pnr"), hold.get("reason") or status)
+            continue
+
+        if seat is not chosen:
+            logger.info("🪑 Seat %s taken for PNR %s, assigned %s",
+                        chosen.get("seat_number"), mcp_data.get("pnr"), seat.get("seat_number"))
+            response["selected_seat"] = seat
+            response.setdefault("reasoning", {})["seat_reason"] = (
+                f"{seat_reason(segment, original, seat)} "
+                f"(seat {chosen.get('seat_number')} was taken by a concurrent recovery)"
+            )
+        return response
+
+    return {
+        "status": "error",
+        "message": "No seat could be secured on the selected flight."
+    }
+
+
+async def resolve_recovery(mcp_data: dict, local: dict = None) -> dict:
+    """
+    Decide one recover_passenger payload: rules and/or agent per
+    DECISION_MODE, then secure the seat. `local` is a precomputed
+    decide_recovery result.
+    """
+    blocked = precheck_recovery(mcp_data)
+    if blocked:
+        return blocked
+
+    restrict_student_seats(mcp_data)
+
+
+    if DECISION_MODE in ("local", "auto"):
+        if local is None:
+            local = decide_recovery(mcp_data)
+
+        if uses_local(local):
+            response = local_response(local)
+            if response["status"] == "success" and not local.get("seat_secured") and await seat_holds_enabled():
+                response = await secure_seat(mcp_data, response)
+            return response
+
+
+    try:
+        agent_output = await asyncio.wait_for(
+            agent_decision(mcp_data),
+            timeout=AGENT_RUN_TIMEOUT
         )
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Agent run timed out")
+    except AgentRunError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+    with span("output_expand"):
+        response = {
+            "status": "success",
+            **expand_agent_output(mcp_data, agent_output),
+            "decision_source": "agent"
+        }
+
+    if await seat_holds_enabled():
+        response = await secure_seat(mcp_data, response)
+
+    return response
+
+
+async def recover_passenger_shape() -> dict:
+    """
+    recover_passenger arguments asking only for what the rules, the prompt
+    and seat holds read, and at most as many candidates as the prompt sends.
+    Only arguments the server's recover_passenger accepts are sent, so an
+    older server still gets a plain (pnr, last_name) call.
+    """
+    if not LEAN_PAYLOAD:
+        return {}
+
+    shape = {
+        "fields": {
+            "passenger": list(PASSENGER_FIELDS),
+            "original_flight": list(ORIGINAL_FIELDS),
+            "flights": list(FLIGHT_FIELDS),
+            "seats": list(SEAT_FIELDS)
+        },
+        "max_flights": AGENT_PROMPT.get("max_flights", 10),
+        "max_seats": AGENT_PROMPT.get("max_seats", 15)
+    }
 
-        with client:
-            thread = client.agents.threads.create()
+    accepted = (await advertised_tools()).get("recover_passenger", {}).get("properties", {})
+    return {k: v for k, v in shape.items() if k in accepted}
 
-            client.agents.messages.create(
-                thread_id=thread.id,
-                role="user",
-                content = f"""
-You are a STRICT Flight & Seat Recovery Decision Engine.
-Passenger Profile:
---------------------------------
-INPUT DATA (ACTUAL MCP RESPONSE - THIS IS YOUR UNIVERSE)
---------------------------------
 
-Passenger Profile:
-{json.dumps(mcp_data.get('passenger', {}), indent=2)}
+def observe_snapshot(version):
+    """A snapshot version reported by the MCP server; a new one invalidates precomputed recoveries."""
+    recovery_store.check_version(version)
 
-Original Flight:
-{json.dumps(mcp_data.get('original_flight', {}), indent=2)}
 
-Available Flights (YOU MUST SELECT FROM THIS LIST):
-{json.dumps(recovery.get('available_flights', []), indent=2)}
+async def refresh_snapshot_version() -> bool:
+    """
+    Ask the MCP server for its snapshot version at most every
+    SNAPSHOT_CHECK_INTERVAL seconds. False when the check fails; True
+    without asking for servers that report no version (server_production.py).
+    """
+    global snapshot_checked_at
+    if "snapshot_version" not in await advertised_tools():
+        return True
 
-Available Seats (YOU MUST SELECT FROM THIS LIST):
-{json.dumps(recovery.get('available_seats', []), indent=2)}
-You are a STRICT Flight & Seat Optimization Engine.
+    now = time.monotonic()
+    if now - snapshot_checked_at >= SNAPSHOT_CHECK_INTERVAL:
+        try:
+            data = await execute_mcp_tool("snapshot_version", {})
+        except Exception as e:
+            logger.warning("⚠️ Could not check the MCP snapshot version: %s", e)
+            return False
+        observe_snapshot(data.get("snapshot_version"))
+        snapshot_checked_at = now
+    return True
 
-ABSOLUTE RULES (FAIL IF VIOLATED):
-1. You MUST ONLY use flights and seats provided in the input JSON.
-2. You MUST NOT invent flight_uid, flight_number, seat_number, or prices.
-3. If any identifier is not found in the input → FAIL.
---------------------------------
-ORIGINAL BOOKING CONSTRAINTS (MANDATORY)
---------------------------------
 
-The original_flight represents the passenger's contractual booking intent.
+async def fetch_recovery(pnr: str, last_name: str) -> dict:
+    mcp_data = await execute_mcp_tool(
+        "recover_passenger",
+        {"pnr": pnr, "last_name": last_name, **(await recover_passenger_shape())}
+    )
+    observe_snapshot(mcp_data.get("snapshot_version"))
+    return mcp_data
 
-MANDATORY RULES:
 
-1. Route Preservation:
-- selected_flight.origin MUST equal original_flight.origin
-- selected_flight.destination MUST equal original_flight.destination
-- If no such flight exists → FAIL
+async def recover(pnr: str, last_name: str) -> dict:
+    return await resolve_recovery(await fetch_recovery(pnr, last_name))
 
-2. Time Proximity:
-- Prefer flights whose utcDeparture is closest to original_flight.utc_scheduled_departure
-- Prefer earlier arrival over later arrival when possible
 
-3. Cabin Preservation:
-- If original_flight.cabin_class == "Business":
-  - Must preserve Business cabin in recovery
-  - Only downgrade if no business seats exist
-- If original_flight.cabin_class == "Economy":
-  - Economy acceptable, upgrade optional for highspender
-
-These rules apply BEFORE CDP logic.
-CDP rules apply only after these booking constraints are satisfied.
-
---------------------------------
-PRIORITY 0 (ORIGINAL BOOKING OVERRIDE)
---------------------------------
-
-If original_flight.cabin_class == "Business":
-- ALWAYS select a flight that has min_business_fare available
-- ALWAYS select a seat with travel_class == "C"
-- This rule OVERRIDES STUDENT logic
-- Only downgrade to Economy if NO business seats exist
-
-
-If student > 0 AND original_flight.cabin_class == "Economy":
-- MUST NOT select travel_class == "C"
-- MUST select economy class only
-- FAIL if only business seats are selected
-
-If original_flight.cabin_class == "Economy":
-- Proceed with CDP rules as defined
-
-
-
---------------------------------
-CDP PRIORITY ORDER (MANDATORY)
---------------------------------
-
-Evaluate booking_details[0] first.
-
-PRIORITY 1 (OVERRIDES EVERYTHING):
-- If STUDENT > 0:
-  - ALWAYS choose the CHEAPEST min_economy_fare flight
-  - NEVER choose business class
-  - Seat priority: cheapest economy seat, ignore comfort
-  - Comfort signals (LEGROOM, XL, AISLE) are SECONDARY
-
-- If HIGHSPENDERHIGHFREQ == true OR HIGHSPENDERLOWFREQ == true:
-  - Price is IRRELEVANT
-  - Prefer comfort, stretch, business class
-  - Prefer earlier arrival and non-stop
-
---------------------------------
-PRIORITY 2 (ONLY IF NOT STUDENT / HIGHSPENDER)
---------------------------------
-
-Journey Intent:
-- BUSINESS > LEISURE → time + comfort
-- LEISURE >= BUSINESS → cost + flexibility
-
---------------------------------
-FLIGHT SCORING (STRICT)
---------------------------------
-
-For EACH available flight:
-
-Start score = 0
-
-Base:
-+40 if NonStop
-+25 if utcArrival earlier than original flight
-+20 if utcDeparture closest to original flight
--15 if fillingFast == true
-
-STUDENT OVERRIDE:
-- score = -min_economy_fare
-- IGNORE all comfort bonuses
-
-HIGHSPENDER OVERRIDE:
-+40 if isStretch == true
-+30 if min_business_fare exists
-
---------------------------------
-SEAT SCORING (STRICT)
---------------------------------
-
-For EACH seat on SELECTED flight:
-
-Start score = 0
-
-STUDENT OVERRIDE:
-- Prefer travel_class == "Y"
-- Ignore LEGROOM, XL, WINDOW, AISLE
-- Pick seat with highest availability or lowest cost proxy
-
-HIGHSPENDER OVERRIDE:
-+40 if travel_class == "C"
-+25 if LEGROOM
-+20 if XL
-+15 if AISLE or WINDOW
-==============================
-OUTPUT MANDATORY (STRICT JSON ONLY)
-==============================
-You MUST return EXACTLY this JSON structure.
-{{
-    
-  "selected_flight": {{ ... }},
-  "selected_seat": {{ ... }},
-  "reasoning": {{
-    "flight_reason": "Explicitly reference STUDENT or HIGHSPENDER rule",
-    "seat_reason": "Explicitly reference STUDENT or HIGHSPENDER rule"
-  }}
-}}
-
-FAIL IF:
-- Cheapest flight is NOT selected for STUDENT
-- Business class is selected for STUDENT
-- Any invented ID appears
-"""
-)
+async def precompute_recovery(event: dict):
+    """Decide a fed cancellation now and keep the response for the passenger's request."""
+    pnr = event["pnr"]
+    last_name = event.get("user_info", {}).get("USR_LASTNAME", "")
+    trace_id = bind_trace_id()
 
-            run = client.agents.runs.create(
-                thread_id=thread.id,
-                agent_id=AGENT_ID
-            )
+    with span("precompute"):
+        mcp_data = await fetch_recovery(pnr, last_name)
+        response = await resolve_recovery(mcp_data)
 
-            while True:
-                run = client.agents.runs.get(thread.id, run.id)
-                if run.status == "completed":
-                    break
+    # the MCP server has not loaded this cancellation yet: retried by the ingestor
+    if response.get("reason") == "PNR_NOT_FOUND":
+        raise RecoveryNotReady(pnr)
 
-            messages = client.agents.messages.list(
-                thread_id=thread.id,
-                order=ListSortOrder.ASCENDING
-            )
+    # errors may clear up (a seat frees, the agent recovers); leave those to the live path
+    if response.get("status") != "error":
+        recovery_store.put(pnr, last_name, response, version=mcp_data.get("snapshot_version"))
+    logger.info("📥 Precomputed PNR %s: %s (trace=%s)", pnr, response.get("status"), trace_id)
+
+
+@app.post("/flight-recovery")
+async def flight_recovery(request: RecoveryRequest):
+    # a precomputed response is only served while the MCP data it came from is current
+    if len(recovery_store) and await refresh_snapshot_version():
+        precomputed = recovery_store.get(request.pnr, request.last_name)
+        if precomputed is not None:
+            return precomputed
+
+    try:
+        with span("recovery"):
+            return await recover(request.pnr, request.last_name)
 
-            for msg in reversed(list(messages)):
-                if msg.role == "assistant":
-                    agent_output = json.loads(msg.text_messages[0].text.value)
-                    return {
-                        "status": "success",
-                        **agent_output
-                    }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+class BulkRecoveryRequest(BaseModel):
+    flight_number: Optional[str] = None
+    pnrs: Optional[List[str]] = None
+
+
+def expand_bulk_payloads(bulk: dict) -> List[dict]:
+    """recover_flight results as recover_passenger-shaped payloads."""
+    recovery_sets = bulk.get("recovery_sets", {})
+    payloads = []
+
+    for result in bulk.get("results", []):
+        if "recovery_set" in result:
+            shared = recovery_sets.get(result["recovery_set"], {})
+            # own dict per PNR: restrict_student_seats replaces the seat list
+            result["recovery"] = {
+                "available_flights": shared.get("available_flights", []),
+                "available_seats": shared.get("available_seats", [])
+            }
+            result["snapshot_version"] = bulk.get("snapshot_version")
+        payloads.append(result)
+
+    return payloads
 
 
-        raise RuntimeError("Agent produced no output")
+def score_bulk_locally(payloads: List[dict]) -> Dict[int, dict]:
+    """
+    decide_recovery results for every decidable payload, scored as cohorts
+    that share a recovery set and seat filter.
+    """
+    cohorts: Dict[tuple, List[int]] = {}
 
+    for i, mcp_data in enumerate(payloads):
+        if precheck_recovery(mcp_data):
+            continue
+        student = restrict_student_seats(mcp_data)
+        cohorts.setdefault((mcp_data.get("recovery_set"), student), []).append(i)
+
+    decisions = {}
+
+    for members in cohorts.values():
+        recovery = payloads[members[0]]["recovery"]
+        results = score_cohort(
+            FlightColumns(recovery["available_flights"]),
+            SeatColumns(recovery["available_seats"]),
+            [
+                {
+                    "original_flight": payloads[i].get("original_flight", {}),
+                    "segment": passenger_segment(passenger_booking(payloads[i]))
+                }
+                for i in members
+            ]
+        )
+        decisions.update(zip(members, results))
+
+    return decisions
+
+
+async def assign_bulk_seats(payloads: List[dict], local: Dict[int, dict]):
+    """
+    Seats for every rule-decided passenger with one assign_seats call per
+    flight, so a cohort does not race itself for the same best seat.
+    """
+    by_flight: Dict[str, List[int]] = {}
+
+    for i, result in local.items():
+        if uses_local(result) and result["decision"] is not None:
+            flight_uid = result["decision"]["selected_flight"].get("flight_uid")
+            by_flight.setdefault(flight_uid, []).append(i)
+
+    for flight_uid, members in by_flight.items():
+        assigned = await execute_mcp_tool("assign_seats", {
+            "flight_uid": flight_uid,
+            "passengers": [
+                {
+                    "pnr": payloads[i].get("pnr"),
+                    "segment": local[i]["segment"],
+                    "cabin_class": payloads[i].get("original_flight", {}).get("cabin_class")
+                }
+                for i in members
+            ]
+        })
+        if assigned.get("status") != "success":
+            logger.warning("⚠️ assign_seats for flight %s failed: %s", flight_uid, assigned.get("reason"))
+        seats = assigned.get("assignments", {})
+
+        for i in members:
+            seat = seats.get(payloads[i].get("pnr"))
+            result = local[i]
+            if seat is None:
+                result["decision"] = None
+                continue
+
+            # decision dicts are shared within a cohort, so copy before changing the seat
+            decision = dict(result["decision"])
+            decision["selected_seat"] = seat
+            decision["reasoning"] = {
+                **decision["reasoning"],
+                "seat_reason": seat_reason(result["segment"], payloads[i].get("original_flight", {}), seat)
+            }
+            local[i] = {**result, "decision": decision, "seat_secured": True}
+
+
+def require_operator(key: Optional[str]):
+    """403 unless `key` is the configured OPERATOR_API_KEY; without one, the endpoint is off."""
+    if not OPERATOR_API_KEY:
+        raise HTTPException(status_code=403, detail="Bulk recovery is disabled (no OPERATOR_API_KEY)")
+    if not key or not hmac.compare_digest(key.encode(), OPERATOR_API_KEY.encode()):
+        raise HTTPException(status_code=403, detail="Operator key required")
+
+
+@app.post("/flight-recovery/bulk")
+async def bulk_flight_recovery(
+    request: BulkRecoveryRequest,
+    operator_key: Optional[str] = Header(None, alias=OPERATOR_HEADER)
+):
+    """
+    Recover every affected PNR of a cancelled flight (or a PNR list) with
+    one MCP call. Streams one NDJSON line per PNR as soon as it is decided:
+    rule-decided passengers first, agent runs as they complete. Operators
+    only: the x-operator-key header must carry OPERATOR_API_KEY.
+    """
+    require_operator(operator_key)
+
+    if not request.flight_number and not request.pnrs:
+        raise HTTPException(status_code=400, detail="flight_number or pnrs is required")
+
+    try:
+        bulk = await execute_mcp_tool(
+            "recover_flight",
+            {"flight_number": request.flight_number, "pnrs": request.pnrs}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    if bulk.get("status") != "success":
+        return {"status": bulk.get("status"), "reason": bulk.get("reason")}
+
+    payloads = expand_bulk_payloads(bulk)
+    local = score_bulk_locally(payloads) if DECISION_MODE in ("local", "auto") else {}
+
+    if local and SEAT_HOLDS and "assign_seats" in await advertised_tools():
+        try:
+            await assign_bulk_seats(payloads, local)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    limit = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def resolve(i: int, mcp_data: dict) -> dict:
+        try:
+            async with limit:
+                result = await resolve_recovery(mcp_data, local.get(i))
+        except HTTPException as e:
+            result = {"status": "error", "message": e.detail}
+        except Exception as e:
+            result = {"status": "error", "message": str(e)}
+        return {"pnr": mcp_data.get("pnr"), **result}
+
+    async def stream():
+        tasks = [asyncio.create_task(resolve(i, p)) for i, p in enumerate(payloads)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield dumps(await finished) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,9 +1,26 @@
-import json
 import logging
+import os
+from typing import Dict, List, Optional
+
 from fastmcp import FastMCP
+from fastmcp.server.dependencies import get_http_headers
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
 from tools.validator import validate_request
 from tools.profile import find_users
+from tools.profile_store import ProfileStore
+from tools.cancellation_index import CancellationIndex
+from tools.snapshots import SnapshotManager
+from tools.binary_snapshot import MappedSnapshot
+from tools.codec import load_file
+from tools.flight_catalog import FlightCatalog, extract_available_flights
+from tools.seat_inventory import SeatInventory
+from tools.seat_allocator import SeatAllocator, UnknownFlight
+from tools.scoring import passenger_booking, passenger_segment, score_flights, score_seats
+from tools.metrics import PROMETHEUS_CONTENT_TYPE, render
+from tools.pagination import CursorError, check_page_size, cursor_offset, page
+from tools.tracing import TRACE_HEADER, bind_trace_id, span
 from config.loader import load_config
 
 
@@ -18,125 +35,145 @@ mcp = FastMCP("flight_disruption_mcp")
 
 
 
-with open("data/cancell_trigger.json", "r", encoding="utf-8") as f:
-    CANCELLATIONS = json.load(f)
+FLIGHT_WINDOW_HOURS = config.get("recovery", {}).get("flight_window_hours", 48)
+SEAT_HOLD_TTL = config.get("recovery", {}).get("seat_hold_ttl", 120)
+PAGE_SIZE = config.get("recovery", {}).get("page_size", 50)
+DATA_SNAPSHOT = config.get("data", {}).get("snapshot", "")
 
-with open("data/available_seats.json", "r", encoding="utf-8") as f:
-    AVAILABLE_SEATS = json.load(f)
 
-with open("data/flights-dataa-extended.json", "r", encoding="utf-8") as f:
-    FLIGHTS_DATA = json.load(f)
 
+def find_cancellation(pnr: str, cancellations=None):
+    if cancellations is None:
+        cancellations = SNAPSHOTS.current()["cancellations"]
+    return cancellations.by_pnr(pnr)
 
 
-def find_cancellation(pnr: str):
-    for c in CANCELLATIONS:
-        if c.get("pnr") == pnr:
-            return c
-    return None
+def extract_available_seats_from_seatmap(seatmap_json: dict):
+    return SeatInventory.from_seatmap(seatmap_json).to_list()
 
 
-def extract_available_seats_from_seatmap(seatmap_json: dict):
-    seats = {}
-    seat_maps = seatmap_json.get("data", {}).get("seatMaps", [])
-
-    for sm in seat_maps:
-        seat_map = sm.get("seatMap", {})
-        decks = seat_map.get("decks", {})
-
-        for deck in decks.values():
-            compartments = deck.get("compartments", {})
-
-            for cabin in compartments.values():
-                for seat in cabin.get("units", []):
-                    if not (
-                        seat.get("assignable") is True
-                        and seat.get("availability", 0) > 0
-                    ):
-                        continue
-
-                    seat_number = seat.get("designator")
-                    travel_class = seat.get("travelClassCode")
-                    key = f"{seat_number}-{travel_class}"
-
-                    if key in seats:
-                        continue
-
-                    seat_types = [
-                        p.get("code")
-                        for p in seat.get("properties", [])
-                        if p.get("code") in {
-                            "WINDOW", "AISLE", "LEGROOM", "XL", "STRETCH"
-                        }
-                    ]
-
-                    seats[key] = {
-                        "seat_number": seat_number,
-                        "travel_class": travel_class,
-                        "availability": seat.get("availability"),
-                        "seat_type": seat_types
-                    }
-
-    return list(seats.values())
-
-
-def extract_available_flights(flights_json: dict):
-    flights = {}
-    trips = flights_json.get("data", {}).get("trips", [])
-
-    for trip in trips:
-        for journey in trip.get("journeysAvailable", []):
-            segments = journey.get("segments", [])
-            if not segments:
-                continue
-
-            segment = segments[0]
-            identifier = segment.get("identifier", {})
-            designator = segment.get("designator", {})
-
-            carrier = identifier.get("carrierCode")
-            flight_no = identifier.get("identifier")
-            utc_departure = designator.get("utcDeparture")
-
-            if not all([carrier, flight_no, utc_departure]):
-                continue
-
-            flight_uid = journey.get("journeyKey")
-            if flight_uid in flights:
-                continue
-
-            economy = []
-            business = []
-
-            for f in journey.get("passengerFares") or []:
-                if f.get("FareClass") == "Economy":
-                    economy.append(f.get("totalFareAmount"))
-                elif f.get("FareClass") == "Business":
-                    business.append(f.get("totalFareAmount"))
-
-            flights[flight_uid] = {
-                "flight_uid": flight_uid,
-                "flight_number": f"{carrier}{flight_no}",
-                "origin": designator.get("origin"),
-                "destination": designator.get("destination"),
-                "utcDeparture": utc_departure,
-                "utcArrival": designator.get("utcArrival"),
-                "stops": journey.get("stops"),
-                "flightType": journey.get("flightType"),
-                "isStretch": segment.get("isStretch", False),
-                "fillingFast": journey.get("fillingFast", False),
-                "min_economy_fare": min(economy) if economy else None,
-                "min_business_fare": min(business) if business else None
-            }
+def build_flight_catalog(path: str) -> FlightCatalog:
+    return FlightCatalog(extract_available_flights(load_file(path, "flights")))
+
+
+def build_seat_inventory(path: str) -> SeatInventory:
+    return SeatInventory.from_seatmap(load_file(path, "seatmap"))
+
+
+
+SNAPSHOTS = SnapshotManager(
+    poll_interval=config.get("data", {}).get("reload_interval", 2)
+)
+if DATA_SNAPSHOT and os.path.exists(DATA_SNAPSHOT):
+    # compiled by `python -m tools.snapshot_compiler`; recompiling swaps all four
+    logger.info("📦 Loading data from compiled snapshot %s", DATA_SNAPSHOT)
+    SNAPSHOTS.register("cdp", DATA_SNAPSHOT, lambda path: ProfileStore(MappedSnapshot(path).cdp()))
+    SNAPSHOTS.register("cancellations", DATA_SNAPSHOT, lambda path: CancellationIndex(MappedSnapshot(path).cancellations()))
+    SNAPSHOTS.register("seats", DATA_SNAPSHOT, lambda path: MappedSnapshot(path).seats())
+    SNAPSHOTS.register("flights", DATA_SNAPSHOT, lambda path: FlightCatalog(MappedSnapshot(path).flights()))
+else:
+    if DATA_SNAPSHOT:
+        logger.warning("⚠️ Data snapshot %s not found, loading JSON files", DATA_SNAPSHOT)
+    SNAPSHOTS.register("cdp", "data/cdp.json", ProfileStore.from_file)
+    SNAPSHOTS.register("cancellations", "data/cancell_trigger.json", CancellationIndex.from_file)
+    SNAPSHOTS.register("seats", "data/available_seats.json", build_seat_inventory)
+    SNAPSHOTS.register("flights", "data/flights-dataa-extended.json", build_flight_catalog)
+SNAPSHOTS.load()
+SNAPSHOTS.start()
+
+
+def flight_route(flight_uid: str):
+    """(origin, destination) of a flight in the current catalog, None if unknown."""
+    flight = SNAPSHOTS.current()["flights"].by_uid(flight_uid)
+    return (flight.get("origin"), flight.get("destination")) if flight else None
+
+
+# seat holds/assignments shared by every recovery in this process
+ALLOCATOR = SeatAllocator(SNAPSHOTS.current()["seats"], flight_route, hold_ttl=SEAT_HOLD_TTL)
+SNAPSHOTS.on_swap(lambda snapshot: ALLOCATOR.rebase(snapshot["seats"]))
+
+
+def recovery_candidates(snapshot, cancellation: dict, window_hours: Optional[float] = None,
+                        travel_class: Optional[str] = None):
+    """
+    Only the cancelled route's flights around the original departure, and
+    seats still free on at least one of them.
+    """
+    with span("flight_extraction"):
+        available_flights = snapshot["flights"].for_route(
+            cancellation.get("origin"),
+            cancellation.get("destination"),
+            around=cancellation.get("utc_scheduled_departure"),
+            window_hours=FLIGHT_WINDOW_HOURS if window_hours is None else window_hours
+        )
+    with span("seat_extraction"):
+        seats = snapshot["seats"].view(travel_class=travel_class) if travel_class else snapshot["seats"].view()
+        available_seats = ALLOCATOR.available(
+            seats,
+            [f["flight_uid"] for f in available_flights]
+        )
+    return available_flights, available_seats
 
-    return list(flights.values())
+
+def ranked_candidates(flights: list, seats: list, cancellation: dict, segment: Optional[str]):
+    """Eligible flights and seats, best first under the recovery rules."""
+    with span("candidate_ranking"):
+        return (
+            [f for _, f in score_flights(flights, cancellation, segment)],
+            [s for _, s in score_seats(seats, cancellation, segment)]
+        )
+
+
+def project(record: dict, fields: Optional[List[str]]) -> dict:
+    if fields is None:
+        return record
+    return {k: record[k] for k in fields if k in record}
+
+
+def project_profile(profile: list, fields: Optional[List[str]]) -> list:
+    """Past Data with booking_details reduced to `fields`."""
+    if fields is None:
+        return profile
+    return [
+        {**p, "booking_details": [project(b, fields) for b in p.get("booking_details", [])]}
+        for p in profile
+    ]
+
+
+def bind_request_trace() -> str:
+    """Continue the caller's trace (x-trace-id header) in this tool call."""
+    return bind_trace_id(get_http_headers().get(TRACE_HEADER))
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request):
+    return PlainTextResponse(render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 
 
 @mcp.tool()
-def recover_passenger(pnr: str, last_name: str):
-    logger.info("🚑 recover_passenger called")
+def recover_passenger(
+    pnr: str,
+    last_name: str,
+    fields: Optional[Dict[str, List[str]]] = None,
+    max_flights: Optional[int] = None,
+    max_seats: Optional[int] = None,
+    window_hours: Optional[float] = None,
+    travel_class: Optional[str] = None
+):
+    """
+    Recovery payload for one PNR.
+
+    Optional shaping: `fields` projects sections ("passenger" booking
+    columns, "original_flight", "flights", "seats") to the listed keys;
+    `window_hours` overrides the flight window; `travel_class` keeps seats
+    of one class. With max_flights/max_seats, candidates are limited to
+    rule-eligible ones, best first, and capped; totals are reported.
+    """
+    trace_id = bind_request_trace()
+    logger.info("🚑 recover_passenger called (trace=%s)", trace_id)
     logger.info("PNR=%s LAST_NAME=%s", pnr, last_name)
+    fields = fields or {}
 
     if not pnr or not last_name:
         return {"content": [{"type": "json", "json": {
@@ -145,7 +182,11 @@ def recover_passenger(pnr: str, last_name: str):
             "reason": "PNR_AND_LAST_NAME_REQUIRED"
         }}]}
 
-    cancellation = find_cancellation(pnr)
+    # one snapshot for the whole request, even if a reload swaps mid-way
+    snapshot = SNAPSHOTS.current()
+
+    with span("cancellation_lookup"):
+        cancellation = find_cancellation(pnr, snapshot["cancellations"])
     if not cancellation:
         return {"content": [{"type": "json", "json": {
             "final": True,
@@ -165,7 +206,12 @@ def recover_passenger(pnr: str, last_name: str):
     email = user_info.get("USR_EMAIL")
     phone = str(user_info.get("USR_MOBILE", ""))
 
-    eligibility = validate_request(last_name=last_name, email_or_phone=email or phone)
+    with span("validate_request"):
+        eligibility = validate_request(
+            last_name=last_name,
+            email_or_phone=email or phone,
+            store=snapshot["cdp"]
+        )
     if not eligibility or eligibility.get("eligible") is False:
         return {"content": [{"type": "json", "json": {
             "final": True,
@@ -173,10 +219,25 @@ def recover_passenger(pnr: str, last_name: str):
             "reason": "NOT_HIGHSPENDER_OR_STUDENT"
         }}]}
 
-    profile = find_users(last_name=last_name, email_or_phone=email or phone)
+    with span("find_users"):
+        profile = find_users(
+            last_name=last_name,
+            email_or_phone=email or phone,
+            store=snapshot["cdp"]
+        )
 
-    available_seats = extract_available_seats_from_seatmap(AVAILABLE_SEATS)
-    available_flights = extract_available_flights(FLIGHTS_DATA)
+    available_flights, available_seats = recovery_candidates(
+        snapshot, cancellation, window_hours=window_hours, travel_class=travel_class
+    )
+
+    if max_flights is not None or max_seats is not None:
+        segment = passenger_segment(passenger_booking({"passenger": {"Past Data": profile}}))
+        available_flights, available_seats = ranked_candidates(
+            available_flights, available_seats, cancellation, segment
+        )
+
+    flight_fields = fields.get("flights")
+    seat_fields = fields.get("seats")
 
     final_payload = {
         "final": True,
@@ -186,18 +247,336 @@ def recover_passenger(pnr: str, last_name: str):
             "last_name": last_name,
             "email": email,
             "phone": phone,
-            "Past Data": profile
+            "Past Data": project_profile(profile, fields.get("passenger"))
         },
-        "original_flight": cancellation,
+        "original_flight": project(cancellation, fields.get("original_flight")),
         "recovery": {
-            "available_flights": available_flights,
-            "available_seats": available_seats
-        }
+            "available_flights": [project(f, flight_fields) for f in available_flights[:max_flights]],
+            "available_seats": [project(s, seat_fields) for s in available_seats[:max_seats]],
+            "total_flights": len(available_flights),
+            "total_seats": len(available_seats)
+        },
+        "snapshot_version": snapshot.version
     }
 
     return {"content": [{"type": "json", "json": final_payload}]}
 
 
+@mcp.tool()
+def snapshot_version():
+    """Version of the data snapshot the tools currently answer from."""
+    return {"content": [{"type": "json", "json": {
+        "status": "success",
+        "snapshot_version": SNAPSHOTS.current().version
+    }}]}
+
+
+@mcp.tool()
+def list_recovery_candidates(
+    pnr: str,
+    last_name: str,
+    kind: str = "flights",
+    cursor: Optional[str] = None,
+    page_size: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    window_hours: Optional[float] = None,
+    travel_class: Optional[str] = None
+):
+    """
+    Page through a cancelled PNR's recovery flights or seats (`kind`), best
+    first. The caller's last name is checked against CDP as in
+    recover_passenger. Pass back `next_cursor` for the next page. A cursor
+    is only valid for the data snapshot it was issued on. Seats held in
+    between pages can shift later pages.
+    """
+    trace_id = bind_request_trace()
+    logger.info("📄 list_recovery_candidates PNR=%s KIND=%s (trace=%s)", pnr, kind, trace_id)
+
+    if not pnr or not last_name:
+        return {"content": [{"type": "json", "json": {
+            "status": "error",
+            "reason": "PNR_AND_LAST_NAME_REQUIRED"
+        }}]}
+
+    if kind not in ("flights", "seats"):
+        return {"content": [{"type": "json", "json": {
+            "status": "error",
+            "reason": "KIND_MUST_BE_FLIGHTS_OR_SEATS"
+        }}]}
+
+    snapshot = SNAPSHOTS.current()
+
+    try:
+        page_size = check_page_size(PAGE_SIZE if page_size is None else page_size)
+        offset = cursor_offset(cursor, snapshot.version, kind)
+    except CursorError as e:
+        return {"content": [{"type": "json", "json": {
+            "status": "error",
+            "reason": e.reason
+        }}]}
+
+    with span("cancellation_lookup"):
+        cancellation = find_cancellation(pnr, snapshot["cancellations"])
+    if not cancellation or cancellation.get("event_type") != "flight_cancelled":
+        return {"content": [{"type": "json", "json": {
+            "status": "error",
+            "reason": "PNR_NOT_FOUND" if not cancellation else "NO_FLIGHT_DISRUPTION"
+        }}]}
+
+    # the caller's last name plus the booking's contact, as validate_request matches them
+    user_info = cancellation.get("user_info", {})
+    with span("validate_request"):
+        entry = snapshot["cdp"].first(
+            last_name,
+            user_info.get("USR_EMAIL") or str(user_info.get("USR_MOBILE", ""))
+        )
+    if entry is None or not entry.eligible:
+        return {"content": [{"type": "json", "json": {
+            "status": "ineligible",
+            "reason": "NOT_HIGHSPENDER_OR_STUDENT"
+        }}]}
+
+    flights, seats = ranked_candidates(
+        *recovery_candidates(snapshot, cancellation, window_hours=window_hours, travel_class=travel_class),
+        cancellation,
+        passenger_segment(entry.booking_details[0] if entry.booking_details else {})
+    )
+    candidates = flights if kind == "flights" else seats
+    items, next_cursor = page(candidates, offset, page_size, snapshot.version, kind)
+
+    return {"content": [{"type": "json", "json": {
+        "status": "success",
+        "pnr": pnr,
+        "kind": kind,
+        "items": [project(c, fields) for c in items],
+        "total": len(candidates),
+        "next_cursor": next_cursor,
+        "snapshot_version": snapshot.version
+    }}]}
+
+
+@mcp.tool()
+def list_cancellations(
+    flight_number: Optional[str] = None,
+    origin: Optional[str] = None,
+    destination: Optional[str] = None,
+    date: Optional[str] = None,
+    event_type: Optional[str] = "flight_cancelled"
+):
+    """
+    PNRs of the cancellation events matching every given filter: flight
+    number, origin, destination, local departure date
+    (YYYY-MM-DD) and event_type (pass null for all events). Without a
+    flight number, `flights` also counts the matching PNRs per flight.
+    """
+    logger.info("📋 list_cancellations FLIGHT=%s ROUTE=%s-%s DATE=%s EVENT=%s",
+                flight_number, origin, destination, date, event_type)
+
+    snapshot = SNAPSHOTS.current()
+    with span("cancellation_lookup"):
+        matches = snapshot["cancellations"].find(
+            flight_number=flight_number, origin=origin, destination=destination,
+            date=date, event_type=event_type
+        )
+
+    payload = {
+        "status": "success",
+        "count": len(matches),
+        "cancellations": [
+            {k: c.get(k) for k in ("pnr", "ticket_number", "flight_number", "origin", "destination",
+                                   "scheduled_departure_time", "event_type")}
+            for c in matches
+        ],
+        "snapshot_version": snapshot.version
+    }
+    if flight_number is None:
+        flights: Dict[str, int] = {}
+        for c in matches:
+            flights[c.get("flight_number")] = flights.get(c.get("flight_number"), 0) + 1
+        payload["flights"] = flights
+
+    return {"content": [{"type": "json", "json": payload}]}
+
+
+@mcp.tool()
+def recover_flight(flight_number: Optional[str] = None, pnrs: Optional[List[str]] = None):
+    """
+    Bulk recovery for every cancelled PNR of `flight_number`, or for an
+    explicit list of `pnrs`. Each passenger is checked against the CDP
+    record on their cancellation. Flights and seats are extracted once per
+    (route, departure) and returned under `recovery_sets`; each successful
+    result names its set in `recovery_set` instead of repeating the lists.
+    """
+    trace_id = bind_request_trace()
+    logger.info("🚑 recover_flight called (trace=%s)", trace_id)
+    logger.info("FLIGHT=%s PNRS=%s", flight_number, len(pnrs or []))
+
+    if not flight_number and not pnrs:
+        return {"content": [{"type": "json", "json": {
+            "final": True,
+            "status": "error",
+            "reason": "FLIGHT_NUMBER_OR_PNRS_REQUIRED"
+        }}]}
+
+    snapshot = SNAPSHOTS.current()
+    store = snapshot["cdp"]
+
+    with span("cancellation_lookup"):
+        cancellations = snapshot["cancellations"]
+        if flight_number:
+            requested = [
+                (c.get("pnr"), c)
+                for c in cancellations.find(flight_number=flight_number, event_type="flight_cancelled")
+            ]
+        else:
+            requested = [(pnr, cancellations.by_pnr(pnr)) for pnr in pnrs]
+
+    results = []
+    recovery_sets = {}
+
+    for pnr, cancellation in requested:
+        if not cancellation:
+            results.append({"pnr": pnr, "status": "error", "reason": "PNR_NOT_FOUND"})
+            continue
+
+        if cancellation.get("event_type") != "flight_cancelled":
+            results.append({"pnr": pnr, "status": "not_applicable", "reason": "NO_FLIGHT_DISRUPTION"})
+            continue
+
+        user_info = cancellation.get("user_info", {})
+        last_name = user_info.get("USR_LASTNAME", "")
+        email = user_info.get("USR_EMAIL")
+        phone = str(user_info.get("USR_MOBILE", ""))
+
+        entry = store.first(last_name, email or phone)
+        if entry is None or not entry.eligible:
+            results.append({"pnr": pnr, "status": "ineligible", "reason": "NOT_HIGHSPENDER_OR_STUDENT"})
+            continue
+
+        set_key = "{}-{}-{}".format(
+            cancellation.get("origin"),
+            cancellation.get("destination"),
+            cancellation.get("utc_scheduled_departure")
+        )
+        if set_key not in recovery_sets:
+            available_flights, available_seats = recovery_candidates(snapshot, cancellation)
+            recovery_sets[set_key] = {
+                "available_flights": available_flights,
+                "available_seats": available_seats
+            }
+
+        profile = [e.as_profile() for e in store.lookup(last_name, email or phone)]
+
+        results.append({
+            "final": True,
+            "status": "success",
+            "pnr": pnr,
+            "passenger": {
+                "last_name": last_name,
+                "email": email,
+                "phone": phone,
+                "Past Data": profile
+            },
+            "original_flight": cancellation,
+            "recovery_set": set_key
+        })
+
+    return {"content": [{"type": "json", "json": {
+        "final": True,
+        "status": "success",
+        "flight_number": flight_number,
+        "count": len(results),
+        "results": results,
+        "recovery_sets": recovery_sets,
+        "snapshot_version": snapshot.version
+    }}]}
+
+
+@mcp.tool()
+def hold_seat(pnr: str, flight_uid: str, seat_number: str, travel_class: str,
+              ttl_seconds: Optional[float] = None):
+    """
+    Hold a seat on a flight for a PNR until confirmed, released or expired.
+    Replaces the PNR's earlier seat on that flight. Flights outside the
+    catalogue are UNKNOWN_FLIGHT, seats not on the flight UNKNOWN_SEAT.
+    """
+    logger.info("🪑 hold_seat PNR=%s FLIGHT=%s SEAT=%s-%s", pnr, flight_uid, seat_number, travel_class)
+
+    try:
+        reservation = ALLOCATOR.hold(flight_uid, seat_number, travel_class, pnr, ttl=ttl_seconds)
+    except UnknownFlight:
+        return {"content": [{"type": "json", "json": {
+            "status": "error",
+            "reason": "UNKNOWN_FLIGHT"
+        }}]}
+    except ValueError:
+        return {"content": [{"type": "json", "json": {
+            "status": "error",
+            "reason": "UNKNOWN_SEAT"
+        }}]}
+    if reservation is None:
+        return {"content": [{"type": "json", "json": {
+            "status": "unavailable",
+            "reason": "SEAT_ALREADY_TAKEN",
+            "remaining": ALLOCATOR.remaining(flight_uid)
+        }}]}
+
+    return {"content": [{"type": "json", "json": {
+        "status": reservation.state,
+        "hold_id": reservation.hold_id,
+        "remaining": ALLOCATOR.remaining(flight_uid)
+    }}]}
+
+
+@mcp.tool()
+def confirm_seat(hold_id: str):
+    reservation = ALLOCATOR.confirm(hold_id)
+    if reservation is None:
+        return {"content": [{"type": "json", "json": {
+            "status": "error",
+            "reason": "HOLD_NOT_FOUND_OR_EXPIRED"
+        }}]}
+
+    return {"content": [{"type": "json", "json": {
+        "status": "confirmed",
+        "hold_id": hold_id
+    }}]}
+
+
+@mcp.tool()
+def release_seat(hold_id: str):
+    released = ALLOCATOR.release(hold_id)
+    return {"content": [{"type": "json", "json": {
+        "status": "released" if released else "error",
+        "hold_id": hold_id
+    }}]}
+
+
+@mcp.tool()
+def assign_seats(flight_uid: str, passengers: List[dict]):
+    """
+    Assign seats on one flight to a whole cohort at once. `passengers` are
+    {"pnr", "segment", "cabin_class"}; high-spenders pick first, then students.
+    Flights outside the catalogue are UNKNOWN_FLIGHT.
+    """
+    logger.info("🪑 assign_seats FLIGHT=%s PASSENGERS=%s", flight_uid, len(passengers))
+
+    try:
+        assignments = ALLOCATOR.assign_cohort(flight_uid, passengers)
+    except UnknownFlight:
+        return {"content": [{"type": "json", "json": {
+            "status": "error",
+            "reason": "UNKNOWN_FLIGHT"
+        }}]}
+
+    return {"content": [{"type": "json", "json": {
+        "status": "success",
+        "flight_uid": flight_uid,
+        "assignments": assignments,
+        "remaining": ALLOCATOR.remaining(flight_uid)
+    }}]}
+
+
 # -------------------------------------------------
 # Run MCP
 # -------------------------------------------------
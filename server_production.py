@@ -1,10 +1,29 @@
-import json
+import asyncio
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
 import requests
+from requests.adapters import HTTPAdapter
 from fastmcp import FastMCP
+from fastmcp.server.dependencies import get_http_headers
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
 from tools.validator import validate_request
 from tools.profile import find_users
+from tools.profile_store import ProfileStore
+from tools.cancellation_index import CancellationIndex
+from tools.snapshots import SnapshotManager
+from tools.binary_snapshot import MappedSnapshot
+from tools.seat_inventory import SeatInventory
+from tools.stream_extract import HAS_IJSON, iter_available_seats, iter_journeys
+from tools.upstream_cache import UpstreamCache
+from tools.metrics import PROMETHEUS_CONTENT_TYPE, render
+from tools.tracing import TRACE_HEADER, bind_trace_id, span
+from tools.scoring import passenger_booking, passenger_segment, score_flights, score_seats
+from tools.codec import loads
 from config.loader import load_config
 
 
@@ -16,6 +35,9 @@ config, secrets = load_config()
 INDIGO_FLIGHT_SEARCH_URL = config["indigo"]["flight_search_url"]
 INDIGO_SEAT_MAP_URL = config["indigo"]["seat_map_url"]
 REQUEST_TIMEOUT = config.get("indigo", {}).get("timeout", 30)
+STREAM_RESPONSES = config.get("indigo", {}).get("stream_responses", True) and HAS_IJSON
+MAX_CONNECTIONS = config.get("indigo", {}).get("max_connections", 32)
+UPSTREAM_CACHE = config.get("indigo", {}).get("cache", {})
 
 INDIGO_USER_KEY = secrets["INDIGO_USER_KEY"]
 INDIGO_AUTH_TOKEN = secrets["INDIGO_AUTH_TOKEN"]
@@ -35,20 +57,74 @@ mcp = FastMCP("flight_disruption_mcp")
 
 
 # -------------------------------------------------
-# Static Data
+# Data Snapshots (hot-reloaded)
 # -------------------------------------------------
-with open("data/cancell_trigger.json", "r", encoding="utf-8") as f:
-    CANCELLATIONS = json.load(f)
+SNAPSHOTS = SnapshotManager(
+    poll_interval=config.get("data", {}).get("reload_interval", 2)
+)
+DATA_SNAPSHOT = config.get("data", {}).get("snapshot", "")
+
+if DATA_SNAPSHOT and os.path.exists(DATA_SNAPSHOT):
+    logger.info("📦 Loading data from compiled snapshot %s", DATA_SNAPSHOT)
+    SNAPSHOTS.register("cdp", DATA_SNAPSHOT, lambda path: ProfileStore(MappedSnapshot(path).cdp()))
+    SNAPSHOTS.register("cancellations", DATA_SNAPSHOT, lambda path: CancellationIndex(MappedSnapshot(path).cancellations()))
+else:
+    if DATA_SNAPSHOT:
+        logger.warning("⚠️ Data snapshot %s not found, loading JSON files", DATA_SNAPSHOT)
+    SNAPSHOTS.register("cdp", "data/cdp.json", ProfileStore.from_file)
+    SNAPSHOTS.register("cancellations", "data/cancell_trigger.json", CancellationIndex.from_file)
+SNAPSHOTS.load()
+SNAPSHOTS.start()
 
 
 # -------------------------------------------------
 # Helpers
 # -------------------------------------------------
-def find_cancellation(pnr: str):
-    for c in CANCELLATIONS:
-        if c.get("pnr") == pnr:
-            return c
-    return None
+def bind_request_trace() -> str:
+    """Continue the caller's trace (x-trace-id header) in this tool call."""
+    return bind_trace_id(get_http_headers().get(TRACE_HEADER))
+
+
+def find_cancellation(pnr: str, cancellations=None):
+    if cancellations is None:
+        cancellations = SNAPSHOTS.current()["cancellations"]
+    return cancellations.by_pnr(pnr)
+
+
+# -------------------------------------------------
+# Upstream HTTP (shared keep-alive pool)
+# -------------------------------------------------
+# at most MAX_CONNECTIONS connections per Indigo host; the worker pool is
+# the same size, so a call never waits on a connection while holding a thread
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_maxsize=MAX_CONNECTIONS, pool_block=True))
+SESSION.mount("http://", HTTPAdapter(pool_maxsize=MAX_CONNECTIONS, pool_block=True))
+
+UPSTREAM_POOL = ThreadPoolExecutor(max_workers=MAX_CONNECTIONS, thread_name_prefix="indigo")
+
+
+async def run_upstream(stage: str, fn, *args):
+    """
+    Run a blocking Indigo call on the upstream pool without blocking the
+    event loop, timed as `stage` (including any wait for a pool thread).
+    """
+    with span(stage):
+        return await asyncio.get_running_loop().run_in_executor(UPSTREAM_POOL, fn, *args)
+
+
+# a disruption sends every passenger of a flight after the same search and seat map
+FLIGHT_SEARCH_CACHE = UpstreamCache(
+    "flight_search",
+    ttl=UPSTREAM_CACHE.get("flight_search_ttl", 30),
+    stale=UPSTREAM_CACHE.get("stale", 60),
+    max_entries=UPSTREAM_CACHE.get("max_entries", 1024)
+)
+SEAT_MAP_CACHE = UpstreamCache(
+    "seat_map",
+    ttl=UPSTREAM_CACHE.get("seat_map_ttl", 10),
+    stale=UPSTREAM_CACHE.get("stale", 60),
+    max_entries=UPSTREAM_CACHE.get("max_entries", 1024)
+)
 
 
 # -------------------------------------------------
@@ -86,20 +162,26 @@ def call_indigo_flight_search(origin, destination, date):
         "isRedeemTransaction": False
     }
 
-    response = requests.post(
+    response = SESSION.post(
         INDIGO_FLIGHT_SEARCH_URL,
         json=body,
         headers=headers,
-        timeout=REQUEST_TIMEOUT
+        timeout=REQUEST_TIMEOUT,
+        stream=STREAM_RESPONSES
     )
 
-    logger.info("✈️ Indigo Flight API status: %s", response.status_code)
+    with response:
+        logger.info("✈️ Indigo Flight API status: %s", response.status_code)
+
+        if response.status_code != 200:
+            logger.error("❌ Indigo flight search failed")
+            return None
 
-    if response.status_code != 200:
-        logger.error("❌ Indigo flight search failed")
-        return {}
+        if STREAM_RESPONSES:
+            response.raw.decode_content = True
+            return list(normalize_flights(iter_journeys(response.raw)))
 
-    return response.json()
+        return extract_available_flights(loads(response.content, "flights"))
 
 
 def call_indigo_seat_map():
@@ -113,19 +195,29 @@ def call_indigo_seat_map():
     }
 
     try:
-        response = requests.get(
+        response = SESSION.get(
             INDIGO_SEAT_MAP_URL,
             headers=headers,
-            timeout=REQUEST_TIMEOUT
+            timeout=REQUEST_TIMEOUT,
+            stream=STREAM_RESPONSES
         )
 
-        logger.info("🪑 Indigo Seat API status: %s", response.status_code)
+        with response:
+            logger.info("🪑 Indigo Seat API status: %s", response.status_code)
 
-        if response.status_code != 200 or not response.content:
-            logger.warning("⚠️ Seat API returned empty / error response")
-            return None
+            if response.status_code != 200:
+                logger.warning("⚠️ Seat API returned empty / error response")
+                return None
+
+            if STREAM_RESPONSES:
+                response.raw.decode_content = True
+                return list(iter_available_seats(response.raw, default_class="Y"))
+
+            if not response.content:
+                logger.warning("⚠️ Seat API returned empty / error response")
+                return None
 
-        return response.json()
+            return extract_available_seats_from_seatmap(loads(response.content, "seatmap"))
 
     except Exception as e:
         logger.error("❌ Seat API call failed: %s", e)
@@ -133,84 +225,110 @@ def call_indigo_seat_map():
 
 
 # -------------------------------------------------
-# Extractors (UNCHANGED LOGIC)
+# Extractors
 # -------------------------------------------------
-def extract_available_flights(flights_json: dict):
-    flights = {}
-    trips = flights_json.get("data", {}).get("trips", [])
-
-    for trip in trips:
-        for journey in trip.get("journeysAvailable", []):
-            segments = journey.get("segments", [])
-            if not segments:
-                continue
-
-            segment = segments[0]
-            identifier = segment.get("identifier", {})
-            designator = segment.get("designator", {})
-
-            carrier = identifier.get("carrierCode")
-            flight_no = identifier.get("identifier")
-            utc_departure = designator.get("utcDeparture")
-
-            if not all([carrier, flight_no, utc_departure]):
-                continue
-
-            flight_uid = journey.get("journeyKey")
-            if flight_uid in flights:
-                continue
-
-            flights[flight_uid] = {
-                "flight_uid": flight_uid,
-                "flight_number": f"{carrier}{flight_no}",
-                "origin": designator.get("origin"),
-                "destination": designator.get("destination"),
-                "utcDeparture": utc_departure,
-                "utcArrival": designator.get("utcArrival"),
-                "stops": journey.get("stops"),
-                "flightType": journey.get("flightType"),
-                "isStretch": segment.get("isStretch", False),
-                "fillingFast": journey.get("fillingFast", False)
-            }
+# Flights are normalized as before. Seats now go through SeatInventory:
+# only seats with `assignable is True` (not merely truthy) are offered, and
+# seat_type keeps just the WINDOW/AISLE/LEGROOM/XL/STRETCH codes, in
+# seat-map order and without duplicates.
+def normalize_flights(journeys):
+    """Yield one flight per distinct journeyKey, from any iterable of journeys."""
+    seen = set()
+
+    for journey in journeys:
+        segments = journey.get("segments", [])
+        if not segments:
+            continue
+
+        segment = segments[0]
+        identifier = segment.get("identifier", {})
+        designator = segment.get("designator", {})
+
+        carrier = identifier.get("carrierCode")
+        flight_no = identifier.get("identifier")
+        utc_departure = designator.get("utcDeparture")
+
+        if not all([carrier, flight_no, utc_departure]):
+            continue
+
+        flight_uid = journey.get("journeyKey")
+        if flight_uid in seen:
+            continue
+        seen.add(flight_uid)
+
+        yield {
+            "flight_uid": flight_uid,
+            "flight_number": f"{carrier}{flight_no}",
+            "origin": designator.get("origin"),
+            "destination": designator.get("destination"),
+            "utcDeparture": utc_departure,
+            "utcArrival": designator.get("utcArrival"),
+            "stops": journey.get("stops"),
+            "flightType": journey.get("flightType"),
+            "isStretch": segment.get("isStretch", False),
+            "fillingFast": journey.get("fillingFast", False)
+        }
 
-    return list(flights.values())
+
+def extract_available_flights(flights_json: dict):
+    journeys = (
+        journey
+        for trip in flights_json.get("data", {}).get("trips", [])
+        for journey in trip.get("journeysAvailable", [])
+    )
+    return list(normalize_flights(journeys))
 
 
 def extract_available_seats_from_seatmap(seatmap_json: dict):
-    if not seatmap_json or "data" not in seatmap_json:
-        return []
-
-    seats = []
-    data = seatmap_json["data"]
-
-    for sm in data.get("seatMaps", []):
-        seat_map = sm.get("seatMap", {})
-        for deck in seat_map.get("decks", {}).values():
-            for cabin in deck.get("compartments", {}).values():
-                for seat in cabin.get("units", []):
-                    if seat.get("assignable") and seat.get("availability", 0) > 0:
-                        seats.append({
-                            "seat_number": seat.get("designator"),
-                            "travel_class": seat.get("travelClassCode", "Y"),
-                            "availability": seat.get("availability"),
-                            "seat_type": [p.get("code") for p in seat.get("properties", [])]
-                        })
-    return seats
+    return SeatInventory.from_seatmap(seatmap_json, default_class="Y").to_list(dedupe=False)
+
+
+def project(record: dict, fields: Optional[List[str]]) -> dict:
+    if fields is None:
+        return record
+    return {k: record[k] for k in fields if k in record}
+
+
+def project_profile(profile: list, fields: Optional[List[str]]) -> list:
+    """past_data with booking_details reduced to `fields`."""
+    if fields is None:
+        return profile
+    return [
+        {**p, "booking_details": [project(b, fields) for b in p.get("booking_details", [])]}
+        for p in profile
+    ]
 
 
 # -------------------------------------------------
 # MCP Tool
 # -------------------------------------------------
 @mcp.tool()
-def recover_passenger(pnr: str, last_name: str):
-    logger.info("🚑 recover_passenger called")
+async def recover_passenger(
+    pnr: str,
+    last_name: str,
+    fields: Optional[Dict[str, List[str]]] = None,
+    max_flights: Optional[int] = None,
+    max_seats: Optional[int] = None
+):
+    """
+    Recovery payload for one PNR from the live Indigo APIs. `fields`,
+    `max_flights` and `max_seats` shape it as in server.py: flights and
+    seats projected to the listed keys, and with a cap, only rule-eligible
+    candidates, best first.
+    """
+    fields = fields or {}
+    trace_id = bind_request_trace()
+    logger.info("🚑 recover_passenger called (trace=%s)", trace_id)
 
     if not pnr or not last_name:
         return {"content": [{"type": "json", "json": {
             "final": True, "status": "error", "reason": "PNR_AND_LAST_NAME_REQUIRED"
         }}]}
 
-    cancellation = find_cancellation(pnr)
+    snapshot = SNAPSHOTS.current()
+
+    with span("cancellation_lookup"):
+        cancellation = find_cancellation(pnr, snapshot["cancellations"])
     if not cancellation:
         return {"content": [{"type": "json", "json": {
             "final": True, "status": "error", "reason": "PNR_NOT_FOUND"
@@ -225,25 +343,41 @@ def recover_passenger(pnr: str, last_name: str):
     email = user_info.get("USR_EMAIL")
     phone = str(user_info.get("USR_MOBILE", ""))
 
-    eligibility = validate_request(last_name, email or phone)
-    if not eligibility or not eligibility.get("eligible"):
+    with span("validate_request"):
+        eligibility = validate_request(last_name, email or phone, store=snapshot["cdp"])
+    if not eligibility or eligibility.get("eligible") is False:
         return {"content": [{"type": "json", "json": {
             "final": True, "status": "ineligible"
         }}]}
 
-    profile = find_users(last_name, email or phone)
+    with span("find_users"):
+        profile = find_users(last_name, email or phone, store=snapshot["cdp"])
 
     origin = cancellation["origin"]
     destination = cancellation["destination"]
     date = cancellation["scheduled_departure_time"][:10]
 
-    flights = extract_available_flights(
-        call_indigo_flight_search(origin, destination, date)
+    # both upstream calls at once: latency is the slower of the two, not the sum
+    flights, seats = await asyncio.gather(
+        FLIGHT_SEARCH_CACHE.get(
+            (origin, destination, date),
+            lambda: run_upstream("indigo_flight_search", call_indigo_flight_search, origin, destination, date)
+        ),
+        SEAT_MAP_CACHE.get(
+            INDIGO_SEAT_MAP_URL,
+            lambda: run_upstream("indigo_seat_map", call_indigo_seat_map)
+        )
     )
 
-    seats = extract_available_seats_from_seatmap(
-        call_indigo_seat_map()
-    )
+    flights = flights or []
+    seats = seats or []
+
+    if max_flights is not None or max_seats is not None:
+        # live flights carry no fares: for STUDENT passengers they rank by departure, none are dropped
+        segment = passenger_segment(passenger_booking({"passenger": {"past_data": profile}}))
+        with span("candidate_ranking"):
+            flights = [f for _, f in score_flights(flights, cancellation, segment)]
+            seats = [s for _, s in score_seats(seats, cancellation, segment)]
 
     return {"content": [{"type": "json", "json": {
         "final": True,
@@ -253,16 +387,26 @@ def recover_passenger(pnr: str, last_name: str):
             "last_name": last_name,
             "email": email,
             "phone": phone,
-            "past_data": profile
+            "past_data": project_profile(profile, fields.get("passenger"))
         },
-        "original_flight": cancellation,
+        "original_flight": project(cancellation, fields.get("original_flight")),
         "recovery": {
-            "available_flights": flights,
-            "available_seats": seats
+            "available_flights": [project(f, fields.get("flights")) for f in flights[:max_flights]],
+            "available_seats": [project(s, fields.get("seats")) for s in seats[:max_seats]],
+            "total_flights": len(flights),
+            "total_seats": len(seats)
         }
     }}]}
 
 
+# -------------------------------------------------
+# Metrics
+# -------------------------------------------------
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request):
+    return PlainTextResponse(render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # -------------------------------------------------
 # Run MCP
 # -------------------------------------------------
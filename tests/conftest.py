@@ -0,0 +1,44 @@
+import pytest
+
+
+def seat_unit(designator, travel_class="Y", codes=(), availability=5, assignable=True):
+    return {
+        "designator": designator,
+        "travelClassCode": travel_class,
+        "assignable": assignable,
+        "availability": availability,
+        "properties": [{"code": c, "value": "true"} for c in codes],
+    }
+
+
+def seat_map(origin, destination, units, name=None):
+    return {
+        "seatMap": {
+            "name": name or f"{origin}-{destination}",
+            "equipmentType": "320",
+            "departureStation": origin,
+            "arrivalStation": destination,
+            "decks": {"1": {"compartments": {"Y": {"units": units}}}},
+        }
+    }
+
+
+def seatmap_response(*maps):
+    """A seat-map response in the Indigo shape the extractors read."""
+    return {"data": {"seatMaps": list(maps)}}
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
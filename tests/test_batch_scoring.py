@@ -0,0 +1,121 @@
+import random
+
+import pytest
+
+from tools.batch_scoring import FlightColumns, SeatColumns, score_cohort
+from tools.scoring import HIGHSPENDER, STUDENT, decide_recovery, passenger_segment, passenger_booking
+
+
+STATIONS = ["DEL", "BOM", "BLR"]
+BOOKINGS = [{}, {"STUDENT": 1}, {"HIGHSPENDERHIGHFREQ": True}, {"STUDENT": "2", "HIGHSPENDERLOWFREQ": 1}]
+SEAT_TYPES = ["WINDOW", "AISLE", "LEGROOM", "XL", "STRETCH"]
+
+
+def timestamp(rng, hour_range=(0, 24)):
+    if rng.random() < 0.1:
+        return None
+    # a coarse grid so departure gaps and arrival times tie often
+    hour = rng.randrange(*hour_range)
+    return f"2025-12-27T{hour:02d}:{rng.choice(['00', '30'])}:00Z"
+
+
+def random_flight(rng, i):
+    departure = timestamp(rng, (0, 12))
+    arrival = timestamp(rng, (12, 24))
+    return {
+        "flight_uid": f"F{i}",
+        "flight_number": f"6E{100 + i}",
+        "origin": rng.choice(STATIONS[:2]),
+        "destination": rng.choice(STATIONS[1:]),
+        "utcDeparture": departure,
+        "utcArrival": arrival,
+        "stops": rng.choice([0, 1, None]),
+        "flightType": rng.choice(["NonStop", "Connect", None]),
+        "isStretch": rng.random() < 0.3,
+        "fillingFast": rng.random() < 0.3,
+        "min_economy_fare": rng.choice([None, 4000, 4500, 5000, 5820.5]),
+        "min_business_fare": rng.choice([None, None, 18000, 20000]),
+    }
+
+
+def random_seat(rng, i):
+    return {
+        "seat_number": f"{i}{rng.choice('ABCDEF')}",
+        "travel_class": rng.choice(["C", "Y", "Y"]),
+        "availability": rng.randrange(0, 4),
+        "seat_type": rng.sample(SEAT_TYPES, rng.randrange(0, 3)),
+    }
+
+
+def random_payload(rng, flights, seats):
+    return {
+        "status": "success",
+        "original_flight": {
+            "origin": rng.choice(STATIONS[:2]),
+            "destination": rng.choice(STATIONS[1:]),
+            "cabin_class": rng.choice(["Economy", "Business"]),
+            "utc_scheduled_departure": timestamp(rng, (0, 12)),
+            "utc_scheduled_arrival": timestamp(rng, (12, 24)),
+        },
+        "passenger": {"Past Data": [{"booking_details": [rng.choice(BOOKINGS)]}]},
+        "recovery": {"available_flights": flights, "available_seats": seats},
+    }
+
+
+def cohort(payloads):
+    return [
+        {"original_flight": p["original_flight"], "segment": passenger_segment(passenger_booking(p))}
+        for p in payloads
+    ]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_decide_recovery(seed):
+    rng = random.Random(seed)
+
+    # 40 seeds x 50 passengers: 2,000 randomised decisions
+    for _ in range(5):
+        flights = [random_flight(rng, i) for i in range(rng.randrange(0, 8))]
+        seats = [random_seat(rng, i) for i in range(rng.randrange(0, 6))]
+        payloads = [random_payload(rng, flights, seats) for _ in range(10)]
+
+        results = score_cohort(FlightColumns(flights), SeatColumns(seats), cohort(payloads))
+
+        assert results == [decide_recovery(p) for p in payloads]
+
+
+def test_epoch_zero_is_a_real_time():
+    flights = [
+        {"flight_uid": "A", "flight_number": "A", "origin": "DEL", "destination": "BOM",
+         "utcDeparture": "1970-01-01T00:00:00Z", "utcArrival": "1970-01-01T02:00:00Z", "stops": 1},
+        {"flight_uid": "B", "flight_number": "B", "origin": "DEL", "destination": "BOM",
+         "utcDeparture": "1970-01-01T01:00:00Z", "utcArrival": "1970-01-01T02:30:00Z", "stops": 1},
+    ]
+    seats = [{"seat_number": "1A", "travel_class": "Y", "availability": 1, "seat_type": []}]
+    # scheduled at epoch 0: both arrive earlier, only A gets the closest-departure points
+    payload = {
+        "original_flight": {"origin": "DEL", "destination": "BOM", "cabin_class": "Economy",
+                            "utc_scheduled_departure": "1970-01-01T00:00:00Z",
+                            "utc_scheduled_arrival": "1970-01-01T03:00:00Z"},
+        "passenger": {"Past Data": [{"booking_details": [{"HIGHSPENDERHIGHFREQ": True}]}]},
+        "recovery": {"available_flights": flights, "available_seats": seats},
+    }
+
+    [result] = score_cohort(FlightColumns(flights), SeatColumns(seats),
+                            [{"original_flight": payload["original_flight"], "segment": HIGHSPENDER}])
+
+    assert result == decide_recovery(payload)
+    assert result["decided"]
+    assert result["decision"]["selected_flight"]["flight_uid"] == "A"
+
+
+def test_empty_cohort():
+    assert score_cohort(FlightColumns([]), SeatColumns([]), []) == []
+
+
+def test_no_flights_or_seats():
+    original = {"origin": "DEL", "destination": "BOM", "cabin_class": "Economy"}
+
+    assert score_cohort(FlightColumns([]), SeatColumns([]), [{"original_flight": original, "segment": STUDENT}]) == [
+        {"decided": False, "segment": STUDENT, "decision": None}
+    ]
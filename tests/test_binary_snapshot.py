@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from conftest import seat_map, seat_unit, seatmap_response
+from tools.binary_snapshot import MappedSnapshot, write_snapshot
+from tools.seat_inventory import SeatInventory
+
+
+FLIGHTS = [
+    {
+        "flight_uid": "6E101-2025-12-27", "flight_number": "6E101",
+        "origin": "DEL", "destination": "BOM",
+        "utcDeparture": "2025-12-27T03:00:00Z", "utcArrival": "2025-12-27T05:15:00Z",
+        "stops": 0, "flightType": "NonStop", "isStretch": True, "fillingFast": False,
+        "min_economy_fare": 5820, "min_business_fare": 18450.5,
+    },
+    {
+        "flight_uid": "6E202-2025-12-27", "flight_number": "6E202",
+        "origin": "DEL", "destination": "BOM",
+        "utcDeparture": None, "utcArrival": None,
+        "stops": None, "flightType": None, "isStretch": False, "fillingFast": True,
+        "min_economy_fare": None, "min_business_fare": None,
+    },
+]
+
+
+@pytest.fixture
+def seats():
+    return SeatInventory.from_seatmap(seatmap_response(
+        seat_map("DEL", "BOM", [
+            seat_unit("1A", "C", ["LEGROOM", "WINDOW"]),
+            seat_unit("1C", "C", ["AISLE", "LEGROOM"]),
+            seat_unit("10A", "Y", ["WINDOW"], availability=3),
+            seat_unit("10B", "Y"),
+        ]),
+        seat_map("BLR", "HYD", [seat_unit("10B", "Y", ["XL", "AISLE"])]),
+    ))
+
+
+@pytest.fixture
+def snapshot(tmp_path, seats):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, seats, FLIGHTS, [{"pnr": "P1"}], [{"pnr": "P1", "gate": "12"}])
+    return MappedSnapshot(path)
+
+
+def test_seats_round_trip(snapshot, seats):
+    mapped = snapshot.seats()
+
+    assert mapped.to_list(dedupe=False) == seats.to_list(dedupe=False)
+    assert mapped.to_list() == seats.to_list()
+    assert mapped.to_list(route=("BLR", "HYD")) == [
+        {"seat_number": "10B", "travel_class": "Y", "availability": 5, "seat_type": ["XL", "AISLE"]}
+    ]
+
+
+def test_flights_round_trip(snapshot):
+    assert snapshot.flights() == FLIGHTS
+
+
+def test_json_sections_round_trip(snapshot):
+    assert snapshot.cdp() == [{"pnr": "P1"}]
+    assert snapshot.cancellations() == [{"pnr": "P1", "gate": "12"}]
+
+
+def test_write_replaces_the_file_atomically(tmp_path, seats):
+    path = str(tmp_path / "snapshot.bin")
+    write_snapshot(path, seats, FLIGHTS, [], [])
+    before = MappedSnapshot(path)
+
+    write_snapshot(path, seats, FLIGHTS[:1], [], [])
+
+    assert len(before.flights()) == 2
+    assert len(MappedSnapshot(path).flights()) == 1
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-snapshot.bin"
+    path.write_bytes(b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        MappedSnapshot(str(path))
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from tools.cancellation_index import CancellationIndex
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+def record(pnr, flight_number, origin, destination, departure, event_type="flight_cancelled", **extra):
+    return {
+        "pnr": pnr,
+        "ticket_number": f"TKT{pnr}",
+        "flight_number": flight_number,
+        "origin": origin,
+        "destination": destination,
+        "scheduled_departure_time": departure,
+        "event_type": event_type,
+        **extra,
+    }
+
+
+@pytest.fixture
+def index():
+    return CancellationIndex([
+        record("P1", "6E101", "DEL", "BOM", "2025-12-27T00:30:00"),
+        record("P2", "6E202", "DEL", "BLR", "2025-12-27T09:00:00"),
+        record("P3", "6E101", "DEL", "BOM", "2025-12-28T00:30:00", event_type="no_disruption"),
+        record("P4", "6E303", "BLR", "BOM", "2025-12-27T12:00:00"),
+        record("P1", "6E404", "HYD", "DEL", "2025-12-29T06:00:00"),
+    ])
+
+
+def pnrs(records):
+    return [r["pnr"] for r in records]
+
+
+def test_lookup_by_pnr_and_ticket_keeps_the_first_record(index):
+    assert index.by_pnr("P1")["flight_number"] == "6E101"
+    assert index.by_ticket("TKTP4")["pnr"] == "P4"
+    assert index.by_pnr("missing") is None
+
+
+def test_no_keys_returns_every_record(index):
+    assert pnrs(index.find()) == ["P1", "P2", "P3", "P4", "P1"]
+
+
+def test_find_by_flight_number(index):
+    assert pnrs(index.find(flight_number="6E101")) == ["P1", "P3"]
+
+
+def test_find_by_route(index):
+    assert pnrs(index.find(origin="DEL", destination="BOM")) == ["P1", "P3"]
+    assert index.find(origin="BOM", destination="DEL") == []
+
+
+def test_find_by_origin_alone(index):
+    assert pnrs(index.find(origin="DEL")) == ["P1", "P2", "P3"]
+
+
+def test_find_by_destination_alone(index):
+    assert pnrs(index.find(destination="BOM")) == ["P1", "P3", "P4"]
+
+
+def test_find_by_date(index):
+    assert pnrs(index.find(date="2025-12-27")) == ["P1", "P2", "P4"]
+
+
+def test_find_combines_every_key(index):
+    assert pnrs(index.find(origin="DEL", date="2025-12-27")) == ["P1", "P2"]
+    assert pnrs(index.find(flight_number="6E101", event_type="flight_cancelled")) == ["P1"]
+    assert pnrs(index.find(destination="BOM", event_type="no_disruption")) == ["P3"]
+    assert index.find(flight_number="6E101", date="2025-12-29") == []
+
+
+def test_records_keep_unknown_keys():
+    index = CancellationIndex([record("P1", "6E101", "DEL", "BOM", "2025-12-27T00:30:00", gate="12")])
+
+    assert index.by_pnr("P1")["gate"] == "12"
+
+
+def test_fixture_file():
+    index = CancellationIndex.from_file(os.path.join(DATA_DIR, "cancell_trigger.json"))
+
+    assert len(index) == len(list(index))
+    for origin in {r["origin"] for r in index}:
+        assert index.find(origin=origin) == [r for r in index if r["origin"] == origin]
@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+from tools.decision_cache import DecisionCache, canonical_key
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_canonical_key_ignores_key_order():
+    assert canonical_key({"a": 1, "b": 2}) == canonical_key({"b": 2, "a": 1})
+    assert canonical_key({"a": 1}) != canonical_key({"a": 2})
+
+
+def test_concurrent_misses_share_one_compute():
+    cache = DecisionCache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"flight": "6E101"}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(10)))
+
+    results = run(main())
+
+    assert calls == 1
+    assert all(r == {"flight": "6E101"} for r in results)
+    # every caller gets its own copy
+    assert len({id(r) for r in results}) == 10
+
+
+def test_hit_returns_a_copy(clock):
+    cache = DecisionCache(clock=clock)
+
+    async def compute():
+        return {"seats": ["1A"]}
+
+    first = run(cache.get_or_compute("k", compute))
+    first["seats"].append("1C")
+
+    assert run(cache.get_or_compute("k", compute)) == {"seats": ["1A"]}
+
+
+def test_failures_are_not_cached():
+    cache = DecisionCache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("upstream down")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            run(cache.get_or_compute("k", compute))
+
+    assert calls == 2
+    assert len(cache) == 0
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = DecisionCache(ttl=10, clock=clock)
+    cache.put("k", "v")
+
+    clock.advance(9)
+    assert cache.get("k") == "v"
+    clock.advance(1)
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = DecisionCache(max_entries=2, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_new_version_drops_every_entry():
+    cache = DecisionCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert run(cache.get_or_compute("k", compute, version="v1")) == 1
+    assert run(cache.get_or_compute("k", compute, version="v1")) == 1
+    # lookups without a version do not touch the cache's version
+    assert run(cache.get_or_compute("k", compute)) == 1
+    assert run(cache.get_or_compute("k", compute, version="v2")) == 2
+    assert cache.version == "v2"
+
+
+def test_result_of_an_older_version_is_not_stored():
+    cache = DecisionCache()
+
+    async def main():
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.01)
+            return "old"
+
+        async def fast():
+            return "new"
+
+        pending = asyncio.ensure_future(cache.get_or_compute("k", slow, version="v1"))
+        await started.wait()
+        await cache.get_or_compute("other", fast, version="v2")
+        return await pending
+
+    assert run(main()) == "old"
+    assert cache.get("k") is None
+
+
+def test_compute_is_cancelled_when_every_waiter_leaves():
+    cache = DecisionCache()
+    cancelled = False
+
+    async def compute():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def main():
+        waiter = asyncio.ensure_future(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    run(main())
+
+    assert cancelled
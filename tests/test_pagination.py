@@ -0,0 +1,75 @@
+import base64
+import json
+
+import pytest
+
+from tools.pagination import CursorError, check_page_size, cursor_offset, encode_cursor, page
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+def reason(call, *args):
+    with pytest.raises(CursorError) as e:
+        call(*args)
+    return e.value.reason
+
+
+def test_pages_walk_every_item_once():
+    items = list(range(7))
+    seen = []
+    cursor = None
+
+    while True:
+        offset = cursor_offset(cursor, "v1", "flights")
+        chunk, cursor = page(items, offset, 3, "v1", "flights")
+        seen.append(chunk)
+        if cursor is None:
+            break
+
+    assert seen == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_last_full_page_has_no_next_cursor():
+    assert page(list(range(4)), 2, 2, "v1", "seats") == ([2, 3], None)
+    assert page([], 0, 5, "v1", "seats") == ([], None)
+
+
+def test_no_cursor_starts_at_the_beginning():
+    assert cursor_offset(None, "v1", "flights") == 0
+    assert cursor_offset("", "v1", "flights") == 0
+
+
+def test_cursor_from_another_snapshot_or_kind_is_expired():
+    cursor = encode_cursor(3, "v1", "flights")
+
+    assert cursor_offset(cursor, "v1", "flights") == 3
+    assert reason(cursor_offset, cursor, "v2", "flights") == "CURSOR_EXPIRED"
+    assert reason(cursor_offset, cursor, "v1", "seats") == "CURSOR_EXPIRED"
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    raw_cursor([3, "v1", "flights"]),
+    raw_cursor("o"),
+    raw_cursor({"o": "3", "v": "v1", "k": "flights"}),
+    raw_cursor({"o": 1.5, "v": "v1", "k": "flights"}),
+    raw_cursor({"o": True, "v": "v1", "k": "flights"}),
+    raw_cursor({"o": -1, "v": "v1", "k": "flights"}),
+    raw_cursor({"v": "v1", "k": "flights"}),
+])
+def test_malformed_cursor_is_invalid(cursor):
+    assert reason(cursor_offset, cursor, "v1", "flights") == "CURSOR_INVALID"
+
+
+@pytest.mark.parametrize("page_size", [0, -1, 2.5, "10", True])
+def test_page_size_must_be_a_positive_int(page_size):
+    assert reason(check_page_size, page_size) == "PAGE_SIZE_INVALID"
+
+
+def test_valid_page_size():
+    assert check_page_size(1) == 1
+    assert check_page_size(50) == 50
@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from tools.profile import find_users
+from tools.profile_store import ProfileStore
+from tools.validator import check_user_autorecovery_eligibility
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+def user(first, last, mobile, email, **flags):
+    return {
+        "user_info": {
+            "USR_FIRSTNAME": first,
+            "USR_LASTNAME": last,
+            "USR_MOBILE": mobile,
+            "USR_EMAIL": email,
+            "USR_GUID": f"guid-{first.lower()}",
+        },
+        "booking_details": [{"HIGHSPENDERHIGHFREQ": False, "HIGHSPENDERLOWFREQ": False, "STUDENT": 0, **flags}],
+    }
+
+
+@pytest.fixture
+def store():
+    return ProfileStore([
+        user("Karan", "Mehta", "9000000001", "karan@mail.com", HIGHSPENDERHIGHFREQ=True),
+        # shares Karan's email as its phone field, so one contact matches both indexes
+        user("Asha", "Mehta", "karan@mail.com", "asha@mail.com", STUDENT="2"),
+        user("Ravi", "Rao", "9000000003", "ravi@mail.com"),
+        user("Neha", "Mehta", "9000000004", "karan@mail.com", HIGHSPENDERLOWFREQ="yes"),
+        user("Dev", "Mehta", "9000000001", "dev@mail.com", STUDENT=1),
+    ])
+
+
+def first_names(entries):
+    return [e.user_info["USR_FIRSTNAME"] for e in entries]
+
+
+def test_lookup_by_phone(store):
+    assert first_names(store.lookup("Mehta", "9000000001")) == ["Karan", "Dev"]
+
+
+def test_lookup_by_email(store):
+    assert first_names(store.lookup("Rao", "ravi@mail.com")) == ["Ravi"]
+
+
+def test_phone_and_email_matches_merge_in_file_order(store):
+    # Karan and Neha match by email, Asha by phone
+    assert first_names(store.lookup("Mehta", "karan@mail.com")) == ["Karan", "Asha", "Neha"]
+
+
+def test_last_name_must_match(store):
+    assert store.lookup("Rao", "9000000001") == []
+    assert store.lookup("Sharma", "karan@mail.com") == []
+
+
+def test_lookup_ignores_case_and_whitespace(store):
+    assert first_names(store.lookup("  mEHTA ", " KARAN@Mail.com  ")) == ["Karan", "Asha", "Neha"]
+
+
+def test_first_returns_the_first_match(store):
+    assert store.first("Mehta", "karan@mail.com").user_info["USR_FIRSTNAME"] == "Karan"
+    assert store.first("Mehta", "nobody@mail.com") is None
+
+
+def test_segment_flags(store):
+    karan, asha, ravi, neha, dev = store.entries
+
+    assert (karan.is_highspender, karan.is_student) == (True, False)
+    assert (asha.is_highspender, asha.is_student) == (False, True)
+    assert (neha.is_highspender, neha.is_student) == (True, False)
+    assert (dev.is_highspender, dev.is_student) == (False, True)
+    assert not ravi.eligible
+    assert all(e.eligible for e in (karan, asha, neha, dev))
+
+
+def test_flags_from_any_booking():
+    entry = ProfileStore([{
+        "user_info": {"USR_LASTNAME": "Rao"},
+        "booking_details": [{"STUDENT": "0"}, {"HIGHSPENDERLOWFREQ": 1}, {"STUDENT": "abc"}],
+    }]).entries[0]
+
+    assert entry.is_highspender
+    assert not entry.is_student
+
+
+def test_find_users_and_eligibility(store):
+    assert find_users("Rao", "ravi@mail.com", store=store) == [store.entries[2].as_profile()]
+    assert find_users("Rao", "nobody@mail.com", store=store) == {"status": "not_found"}
+
+    assert check_user_autorecovery_eligibility("Mehta", "9000000004", store=store)["user_info"]["USR_FIRSTNAME"] == "Neha"
+    assert check_user_autorecovery_eligibility("Rao", "ravi@mail.com", store=store) == {"eligible": False}
+    assert check_user_autorecovery_eligibility("Rao", "x", store=store) == {
+        "eligible": False, "reason": "invalid_user_info"
+    }
+
+
+def test_fixture_file():
+    store = ProfileStore.from_file(os.path.join(DATA_DIR, "cdp.json"))
+
+    for entry in store.entries:
+        info = entry.user_info
+        assert entry in store.lookup(info["USR_LASTNAME"], str(info["USR_MOBILE"]))
+        assert entry in store.lookup(info["USR_LASTNAME"], info["USR_EMAIL"])
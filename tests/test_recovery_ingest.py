@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from tools.recovery_ingest import CancellationFeed, CancellationIngestor, RecoveryNotReady, RecoveryStore
+
+
+def test_store_answers_only_the_matching_last_name(clock):
+    store = RecoveryStore(clock=clock)
+    store.put("P1", " Mehta ", {"flight": "6E101"})
+
+    assert store.get("P1", "mehta") == {"flight": "6E101"}
+    assert store.get("P1", "Sharma") is None
+    assert store.get("P2", "Mehta") is None
+
+
+def test_store_entries_expire(clock):
+    store = RecoveryStore(ttl=10, clock=clock)
+    store.put("P1", "Mehta", {})
+
+    assert "P1" in store
+    clock.advance(10)
+    assert "P1" not in store
+    assert store.get("P1", "Mehta") is None
+
+
+def test_store_is_dropped_on_a_new_version(clock):
+    store = RecoveryStore(clock=clock)
+    store.put("P1", "Mehta", {}, version="v1")
+
+    store.check_version("v1")
+    assert len(store) == 1
+
+    # a response computed on the old version after the switch is not kept
+    store.check_version("v2")
+    store.put("P2", "Rao", {}, version="v1")
+    assert len(store) == 0
+
+    store.put("P2", "Rao", {}, version="v2")
+    assert "P2" in store
+
+
+def test_ingestor_retries_unknown_pnrs(tmp_path):
+    path = tmp_path / "feed.jsonl"
+    path.write_text("".join(json.dumps(e) + "\n" for e in [
+        {"pnr": "P1", "event_type": "flight_cancelled"},
+        {"pnr": "P2", "event_type": "no_disruption"},
+        {"pnr": "P3", "event_type": "flight_cancelled"},
+    ]))
+    store = RecoveryStore()
+    attempts = {}
+
+    async def recover(event):
+        pnr = event["pnr"]
+        attempts[pnr] = attempts.get(pnr, 0) + 1
+        if pnr == "P3" or attempts[pnr] < 3:
+            raise RecoveryNotReady(pnr)
+        store.put(pnr, "", {})
+
+    async def main():
+        ingestor = CancellationIngestor(
+            CancellationFeed(str(path), poll_interval=0.01, from_start=True),
+            recover, store, workers=2, retries=3, retry_delay=0.001
+        )
+        ingestor.start()
+        for _ in range(500):
+            if "P1" in store and attempts.get("P3") == 4 and not ingestor._pending:
+                break
+            await asyncio.sleep(0.01)
+        await ingestor.close()
+
+    asyncio.run(main())
+
+    assert attempts == {"P1": 3, "P3": 4}
+    assert "P1" in store
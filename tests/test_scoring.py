@@ -0,0 +1,169 @@
+from tools.scoring import (
+    HIGHSPENDER,
+    STUDENT,
+    decide_recovery,
+    eligible_flights,
+    passenger_segment,
+    score_flights,
+    score_seats,
+)
+
+
+ORIGINAL = {
+    "origin": "DEL",
+    "destination": "BOM",
+    "cabin_class": "Economy",
+    "utc_scheduled_departure": "2025-12-27T06:00:00Z",
+    "utc_scheduled_arrival": "2025-12-27T08:00:00Z",
+}
+
+
+def flight(uid, departure, arrival, origin="DEL", destination="BOM", economy=5000, business=None, **extra):
+    return {
+        "flight_uid": uid,
+        "flight_number": uid,
+        "origin": origin,
+        "destination": destination,
+        "utcDeparture": departure,
+        "utcArrival": arrival,
+        "stops": 0,
+        "flightType": "NonStop",
+        "isStretch": False,
+        "fillingFast": False,
+        "min_economy_fare": economy,
+        "min_business_fare": business,
+        **extra,
+    }
+
+
+def seat(number, travel_class="Y", seat_type=(), availability=5):
+    return {"seat_number": number, "travel_class": travel_class, "availability": availability,
+            "seat_type": list(seat_type)}
+
+
+def payload(flights, seats, booking=None, **original):
+    return {
+        "status": "success",
+        "original_flight": {**ORIGINAL, **original},
+        "passenger": {"Past Data": [{"booking_details": [booking or {}]}]},
+        "recovery": {"available_flights": flights, "available_seats": seats},
+    }
+
+
+def uids(scored):
+    return [f["flight_uid"] for _, f in scored]
+
+
+def test_student_outranks_highspender():
+    assert passenger_segment({"STUDENT": 1, "HIGHSPENDERHIGHFREQ": True}) == STUDENT
+    assert passenger_segment({"HIGHSPENDERLOWFREQ": "true"}) == HIGHSPENDER
+    assert passenger_segment({"STUDENT": "0", "HIGHSPENDERHIGHFREQ": 0}) is None
+
+
+def test_only_flights_on_the_original_route_are_eligible():
+    flights = [
+        flight("A", "2025-12-27T07:00:00Z", "2025-12-27T09:00:00Z"),
+        flight("B", "2025-12-27T07:00:00Z", "2025-12-27T09:00:00Z", destination="BLR"),
+    ]
+
+    assert [f["flight_uid"] for f in eligible_flights(flights, ORIGINAL)] == ["A"]
+
+
+def test_business_bookings_keep_business_fares_when_any_exist():
+    flights = [
+        flight("A", "2025-12-27T07:00:00Z", "2025-12-27T09:00:00Z"),
+        flight("B", "2025-12-27T09:00:00Z", "2025-12-27T11:00:00Z", business=20000),
+    ]
+    business = {**ORIGINAL, "cabin_class": "Business"}
+
+    assert [f["flight_uid"] for f in eligible_flights(flights, business)] == ["B"]
+    assert [f["flight_uid"] for f in eligible_flights(flights[:1], business)] == ["A"]
+
+
+def test_base_score():
+    flights = [
+        # closest departure and earlier arrival: 40 + 25 + 20
+        flight("A", "2025-12-27T06:30:00Z", "2025-12-27T07:55:00Z"),
+        # one stop, filling fast: 0 + 25 - 15
+        flight("B", "2025-12-27T05:00:00Z", "2025-12-27T07:00:00Z", stops=1, flightType="Connect", fillingFast=True),
+        # non-stop, later arrival: 40
+        flight("C", "2025-12-27T09:00:00Z", "2025-12-27T11:00:00Z"),
+    ]
+
+    assert [score for score, _ in score_flights(flights, ORIGINAL, None)] == [85, 40, 10]
+
+
+def test_highspender_bonus_for_stretch_and_business_fares():
+    flights = [
+        flight("A", "2025-12-27T06:00:00Z", "2025-12-27T08:00:00Z"),
+        flight("B", "2025-12-27T10:00:00Z", "2025-12-27T12:00:00Z", isStretch=True, business=18000),
+    ]
+
+    assert score_flights(flights, ORIGINAL, HIGHSPENDER)[0] == (110, flights[1])
+    assert uids(score_flights(flights, ORIGINAL, None)) == ["A", "B"]
+
+
+def test_student_takes_the_cheapest_economy_fare_and_fareless_flights_last():
+    flights = [
+        flight("A", "2025-12-27T06:00:00Z", "2025-12-27T08:00:00Z", economy=6000),
+        flight("B", "2025-12-27T11:00:00Z", "2025-12-27T13:00:00Z", economy=None),
+        flight("C", "2025-12-27T14:00:00Z", "2025-12-27T16:00:00Z", economy=4500),
+        flight("D", "2025-12-27T10:00:00Z", "2025-12-27T12:00:00Z", economy=None),
+    ]
+
+    assert uids(score_flights(flights, ORIGINAL, STUDENT)) == ["C", "A", "D", "B"]
+
+
+def test_ties_go_to_the_earliest_departure():
+    flights = [
+        flight("B", "2025-12-27T09:00:00Z", "2025-12-27T11:00:00Z"),
+        flight("A", "2025-12-27T08:00:00Z", "2025-12-27T10:00:00Z"),
+    ]
+
+    assert uids(score_flights(flights, ORIGINAL, None)) == ["A", "B"]
+
+
+def test_seat_rules():
+    seats = [
+        seat("30B", availability=9),
+        seat("12A", seat_type=["LEGROOM", "WINDOW"], availability=2),
+        seat("1C", "C", ["AISLE"], availability=1),
+    ]
+
+    assert score_seats(seats, ORIGINAL, None)[0][1]["seat_number"] == "1C"
+    assert score_seats(seats, ORIGINAL, STUDENT)[0][1]["seat_number"] == "30B"
+    assert [s["travel_class"] for _, s in score_seats(seats, ORIGINAL, STUDENT)] == ["Y", "Y"]
+    business = {**ORIGINAL, "cabin_class": "Business"}
+    assert [s["seat_number"] for _, s in score_seats(seats, business, STUDENT)] == ["1C"]
+
+
+def test_decided_only_for_a_segment_with_a_strict_winner():
+    flights = [
+        flight("A", "2025-12-27T06:00:00Z", "2025-12-27T07:30:00Z", economy=6000),
+        flight("B", "2025-12-27T09:00:00Z", "2025-12-27T11:00:00Z", economy=4500),
+    ]
+    seats = [seat("30B")]
+
+    student = decide_recovery(payload(flights, seats, {"STUDENT": 1}))
+    assert student["decided"] and student["segment"] == STUDENT
+    assert student["decision"]["selected_flight"]["flight_uid"] == "B"
+    assert "cheapest economy option" in student["decision"]["reasoning"]["flight_reason"]
+
+    # no segment: the agent decides, but the rules' pick is still offered
+    plain = decide_recovery(payload(flights, seats))
+    assert not plain["decided"] and plain["segment"] is None
+    assert plain["decision"]["selected_flight"]["flight_uid"] == "A"
+
+    tied = [flight("A", "2025-12-27T08:00:00Z", "2025-12-27T10:00:00Z", economy=5000),
+            flight("B", "2025-12-27T09:00:00Z", "2025-12-27T11:00:00Z", economy=5000)]
+    assert not decide_recovery(payload(tied, seats, {"STUDENT": 1}))["decided"]
+
+
+def test_no_decision_without_an_eligible_flight_or_seat():
+    flights = [flight("A", "2025-12-27T06:00:00Z", "2025-12-27T08:00:00Z", destination="BLR")]
+
+    assert decide_recovery(payload(flights, [seat("30B")], {"STUDENT": 1})) == {
+        "decided": False, "segment": STUDENT, "decision": None
+    }
+    on_route = [flight("A", "2025-12-27T06:00:00Z", "2025-12-27T08:00:00Z")]
+    assert decide_recovery(payload(on_route, [seat("1C", "C")], {"STUDENT": 1}))["decision"] is None
@@ -0,0 +1,176 @@
+import pytest
+
+from conftest import seat_map, seat_unit, seatmap_response
+from tools.scoring import HIGHSPENDER, STUDENT
+from tools.seat_allocator import CONFIRMED, HELD, SeatAllocator, UnknownFlight
+from tools.seat_inventory import SeatInventory
+
+
+# F4's route has no seat map of its own
+ROUTES = {"F1": ("DEL", "BOM"), "F2": ("DEL", "BOM"), "F3": ("BLR", "HYD"), "F4": ("HYD", "GOI")}
+
+
+@pytest.fixture
+def inventory():
+    return SeatInventory.from_seatmap(seatmap_response(
+        seat_map("DEL", "BOM", [
+            seat_unit("1A", "C", ["WINDOW", "LEGROOM"]),
+            seat_unit("1C", "C", ["AISLE"]),
+            seat_unit("10A", "Y", ["WINDOW"], availability=3),
+            seat_unit("10B", "Y", availability=9),
+            seat_unit("10C", "Y", ["AISLE"], availability=1),
+        ]),
+        seat_map("BLR", "HYD", [
+            seat_unit("2A", "C"),
+            seat_unit("20A", "Y"),
+        ]),
+    ))
+
+
+@pytest.fixture
+def allocator(inventory, clock):
+    return SeatAllocator(inventory, ROUTES.get, hold_ttl=60, clock=clock)
+
+
+def test_hold_is_exclusive_and_idempotent(allocator):
+    held = allocator.hold("F1", "10A", "Y", "PNR1")
+
+    assert held.state == HELD
+    assert allocator.hold("F1", "10A", "Y", "PNR2") is None
+    assert allocator.hold("F1", "10A", "Y", "PNR1") is held
+
+
+def test_same_seat_on_another_flight_is_separate(allocator):
+    allocator.hold("F1", "10A", "Y", "PNR1")
+
+    assert allocator.hold("F2", "10A", "Y", "PNR2") is not None
+
+
+def test_unknown_seat_is_rejected(allocator):
+    with pytest.raises(ValueError):
+        allocator.hold("F1", "99Z", "Y", "PNR1")
+    # 20A is only on the BLR-HYD seat map
+    with pytest.raises(ValueError):
+        allocator.hold("F1", "20A", "Y", "PNR1")
+
+
+def test_unknown_flight_is_rejected(allocator):
+    with pytest.raises(UnknownFlight):
+        allocator.hold("NO-SUCH-FLIGHT", "1A", "C", "PNR1")
+    with pytest.raises(UnknownFlight):
+        allocator.remaining("NO-SUCH-FLIGHT")
+    with pytest.raises(UnknownFlight):
+        allocator.assign_cohort("NO-SUCH-FLIGHT", [{"pnr": "PNR1", "segment": None, "cabin_class": "Economy"}])
+
+
+def test_flight_without_a_seat_map_uses_every_seat_map(allocator):
+    assert allocator.hold("F4", "20A", "Y", "PNR1") is not None
+    assert allocator.remaining("F4") == {"C": 3, "Y": 3}
+
+
+def test_hold_expires_after_ttl(allocator, clock):
+    held = allocator.hold("F1", "10A", "Y", "PNR1")
+
+    clock.advance(59)
+    assert allocator.hold("F1", "10A", "Y", "PNR2") is None
+
+    clock.advance(1)
+    assert allocator.confirm(held.hold_id) is None
+    assert allocator.hold("F1", "10A", "Y", "PNR2").pnr == "PNR2"
+
+
+def test_sweep_frees_every_expired_hold(allocator, clock):
+    short = allocator.hold("F1", "10A", "Y", "PNR1", ttl=10)
+    allocator.hold("F1", "10B", "Y", "PNR2", ttl=30)
+    long = allocator.hold("F1", "10C", "Y", "PNR3", ttl=120)
+
+    clock.advance(45)
+
+    assert allocator.remaining("F1") == {"C": 2, "Y": 2}
+    assert allocator.release(short.hold_id) is False
+    assert allocator.confirm(long.hold_id).state == CONFIRMED
+
+
+def test_confirmed_seat_never_expires(allocator, clock):
+    held = allocator.hold("F1", "10A", "Y", "PNR1")
+    allocator.confirm(held.hold_id)
+
+    clock.advance(3600)
+
+    assert allocator.hold("F1", "10A", "Y", "PNR2") is None
+
+
+def test_release_frees_the_seat(allocator):
+    held = allocator.hold("F1", "10A", "Y", "PNR1")
+
+    assert allocator.release(held.hold_id) is True
+    assert allocator.release(held.hold_id) is False
+    assert allocator.hold("F1", "10A", "Y", "PNR2") is not None
+
+
+def test_new_hold_replaces_the_pnrs_seat_on_that_flight(allocator):
+    first = allocator.hold("F1", "10A", "Y", "PNR1")
+    second = allocator.hold("F1", "10B", "Y", "PNR1")
+    other_flight = allocator.hold("F2", "10C", "Y", "PNR1")
+
+    assert allocator.confirm(first.hold_id) is None
+    assert allocator.hold("F1", "10A", "Y", "PNR2") is not None
+    assert allocator.confirm(second.hold_id) is not None
+    assert allocator.confirm(other_flight.hold_id) is not None
+    assert allocator.remaining("F1") == {"C": 2, "Y": 1}
+
+
+def test_remaining_counts_the_flights_own_seats(allocator):
+    allocator.hold("F1", "1A", "C", "PNR1")
+    allocator.hold("F3", "20A", "Y", "PNR2")
+
+    assert allocator.remaining("F1") == {"C": 1, "Y": 3}
+    assert allocator.remaining("F2") == {"C": 2, "Y": 3}
+    assert allocator.remaining("F3") == {"C": 1, "Y": 0}
+
+
+def test_available_keeps_seats_free_on_any_flight(allocator, inventory):
+    seats = inventory.view(route=("DEL", "BOM"))
+    allocator.hold("F1", "10A", "Y", "PNR1")
+
+    on_f1 = [s["seat_number"] for s in allocator.available(seats, ["F1"])]
+    on_either = [s["seat_number"] for s in allocator.available(seats, ["F1", "F2"])]
+
+    assert "10A" not in on_f1
+    assert "10A" in on_either
+
+    allocator.hold("F2", "10A", "Y", "PNR2")
+    assert "10A" not in [s["seat_number"] for s in allocator.available(seats, ["F1", "F2"])]
+
+
+def test_assign_cohort_gives_distinct_seats_in_priority_order(allocator):
+    assignments = allocator.assign_cohort("F1", [
+        {"pnr": "P1", "segment": None, "cabin_class": "Economy"},
+        {"pnr": "P2", "segment": STUDENT, "cabin_class": "Economy"},
+        {"pnr": "P3", "segment": HIGHSPENDER, "cabin_class": "Business"},
+    ])
+
+    # high-spender picks first, the student gets the economy seat with most
+    # availability, and the rest go by comfort over whatever is left
+    assert assignments["P3"]["seat_number"] == "1A"
+    assert assignments["P2"]["seat_number"] == "10B"
+    assert assignments["P1"]["seat_number"] == "1C"
+    assert allocator.remaining("F1") == {"C": 0, "Y": 2}
+
+
+def test_assign_cohort_keeps_an_existing_seat(allocator, clock):
+    allocator.hold("F1", "10C", "Y", "P1")
+
+    assignments = allocator.assign_cohort("F1", [{"pnr": "P1", "segment": None, "cabin_class": "Economy"}])
+
+    assert assignments["P1"]["seat_number"] == "10C"
+    clock.advance(3600)
+    assert allocator.hold("F1", "10C", "Y", "P2") is None
+
+
+def test_assign_cohort_runs_out_of_seats(allocator):
+    students = [{"pnr": f"S{i}", "segment": STUDENT, "cabin_class": "Economy"} for i in range(4)]
+
+    assignments = allocator.assign_cohort("F1", students)
+
+    assert [a is None for a in assignments.values()] == [False, False, False, True]
@@ -0,0 +1,72 @@
+import io
+import json
+import os
+
+import pytest
+
+from conftest import seat_map, seat_unit, seatmap_response
+from tools.seat_inventory import SeatInventory
+from tools.stream_extract import HAS_IJSON, iter_available_seats
+
+
+pytestmark = pytest.mark.skipif(not HAS_IJSON, reason="ijson is not installed")
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "data")
+
+
+def extract_available_seats_from_seatmap(seatmap_json):
+    # server_production.extract_available_seats_from_seatmap, which needs fastmcp to import
+    return SeatInventory.from_seatmap(seatmap_json, default_class="Y").to_list(dedupe=False)
+
+
+def streamed(seatmap_json):
+    return list(iter_available_seats(io.BytesIO(json.dumps(seatmap_json).encode()), default_class="Y"))
+
+
+def test_matches_the_full_parse_on_the_fixture():
+    with open(os.path.join(DATA_DIR, "available_seats.json"), "rb") as f:
+        seats = list(iter_available_seats(f, default_class="Y"))
+    with open(os.path.join(DATA_DIR, "available_seats.json")) as f:
+        expected = extract_available_seats_from_seatmap(json.load(f))
+
+    assert seats
+    assert seats == expected
+
+
+def test_skips_unavailable_seats_and_defaults_the_class():
+    unit = seat_unit("3C", codes=["AISLE"])
+    del unit["travelClassCode"]
+    response = seatmap_response(seat_map("DEL", "BOM", [
+        seat_unit("1A", "C", ["WINDOW"]),
+        seat_unit("1B", "C", assignable=False),
+        seat_unit("2A", availability=0),
+        unit,
+    ]))
+
+    seats = streamed(response)
+
+    assert [s["seat_number"] for s in seats] == ["1A", "3C"]
+    assert seats[1]["travel_class"] == "Y"
+    assert seats == extract_available_seats_from_seatmap(response)
+
+
+def test_seat_type_keeps_the_seat_map_order():
+    response = seatmap_response(seat_map("DEL", "BOM", [
+        seat_unit("1A", "C", ["LEGROOM", "BASSINET", "WINDOW", "LEGROOM"]),
+    ]))
+
+    seats = streamed(response)
+
+    assert seats[0]["seat_type"] == ["LEGROOM", "WINDOW"]
+    assert seats == extract_available_seats_from_seatmap(response)
+
+
+def test_reads_every_seat_map_and_deck():
+    first = seat_map("DEL", "BOM", [seat_unit("1A")])
+    first["seatMap"]["decks"]["2"] = {"compartments": {"C": {"units": [seat_unit("50A", "C")]}}}
+    response = seatmap_response(first, seat_map("BLR", "HYD", [seat_unit("1A")]))
+
+    seats = streamed(response)
+
+    assert [s["seat_number"] for s in seats] == ["1A", "50A", "1A"]
+    assert seats == extract_available_seats_from_seatmap(response)
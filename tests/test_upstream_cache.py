@@ -0,0 +1,121 @@
+import asyncio
+
+from tools.upstream_cache import UpstreamCache
+
+
+def test_concurrent_misses_make_one_fetch(clock):
+    cache = UpstreamCache("test", clock=clock)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"journeys": 3}
+
+    async def main():
+        return await asyncio.gather(*(cache.get("k", fetch) for _ in range(10)))
+
+    results = asyncio.run(main())
+
+    assert calls == 1
+    assert results == [{"journeys": 3}] * 10
+
+
+def test_fresh_then_stale_then_expired(clock):
+    cache = UpstreamCache("test", ttl=10, stale=20, clock=clock)
+    values = iter(["v1", "v2", "v3"])
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return next(values)
+
+    async def main():
+        assert await cache.get("k", fetch) == "v1"
+
+        clock.advance(5)
+        assert await cache.get("k", fetch) == "v1"
+        assert calls == 1
+
+        # stale: the old value comes back at once and one refresh runs behind it
+        clock.advance(10)
+        assert await cache.get("k", fetch) == "v1"
+        await asyncio.gather(*cache._background)
+        assert calls == 2
+        assert await cache.get("k", fetch) == "v2"
+
+        # past fresh + stale: the caller waits for a new fetch
+        clock.advance(31)
+        assert await cache.get("k", fetch) == "v3"
+        assert calls == 3
+
+    asyncio.run(main())
+
+
+def test_stale_reads_start_one_refresh(clock):
+    cache = UpstreamCache("test", ttl=1, stale=60, clock=clock)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def main():
+        await cache.get("k", fetch)
+        clock.advance(2)
+        results = await asyncio.gather(*(cache.get("k", fetch) for _ in range(5)))
+        await asyncio.gather(*cache._background)
+        return results
+
+    assert asyncio.run(main()) == [1] * 5
+    assert calls == 2
+
+
+def test_failed_fetch_is_not_cached_and_keeps_the_stale_value(clock):
+    cache = UpstreamCache("test", ttl=1, stale=60, clock=clock)
+    responses = iter(["v1", None, "v3"])
+
+    async def fetch():
+        value = next(responses)
+        if value is None:
+            raise RuntimeError("upstream down")
+        return value
+
+    async def main():
+        await cache.get("k", fetch)
+        clock.advance(2)
+        assert await cache.get("k", fetch) == "v1"
+        await asyncio.gather(*cache._background)
+        assert await cache.get("k", fetch) == "v1"
+        await asyncio.gather(*cache._background)
+        assert await cache.get("k", fetch) == "v3"
+
+    asyncio.run(main())
+
+
+def test_miss_that_fails_returns_none(clock):
+    cache = UpstreamCache("test", clock=clock)
+
+    async def fetch():
+        raise RuntimeError("upstream down")
+
+    assert asyncio.run(cache.get("k", fetch)) is None
+    assert len(cache) == 0
+
+
+def test_oldest_entry_is_evicted(clock):
+    cache = UpstreamCache("test", max_entries=2, clock=clock)
+
+    async def main():
+        for key in ("a", "b", "c"):
+            async def fetch(key=key):
+                return key
+            await cache.get(key, fetch)
+
+    asyncio.run(main())
+
+    assert list(cache._entries) == ["b", "c"]
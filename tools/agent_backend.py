@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import random
+from typing import Optional, Set
+
+from azure.ai.agents.models import ListSortOrder
+from azure.ai.projects.aio import AIProjectClient
+from azure.identity.aio import DefaultAzureCredential
+
+from tools.codec import loads
+from tools.agent_runs import AgentRunWaiter, RUN_FAILED_STATES, run_status
+from tools.scoring import decide_recovery
+from tools.tracing import span
+
+
+logger = logging.getLogger("flight-recovery-agent")
+
+
+TOKEN_SCOPE = "https://ai.azure.com/.default"
+
+
+class AzureAgentBackend:
+    """
+    One AIProjectClient and credential for the whole process. The client's
+    bearer-token policy caches the token and refreshes it before expiry, so
+    the credential chain is walked once at start() instead of per request.
+
+    Threads: with pool_size > 0, fresh threads are created ahead of time
+    and topped up in the background, so a request only adds its message.
+    A thread is never reused (it would carry the previous conversation);
+    with cleanup == "delete" it is deleted in the background after use.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        agent_id: str,
+        run_mode: str = "poll",
+        run_timeout: Optional[float] = None,
+        poll: Optional[dict] = None,
+        pool_size: int = 0,
+        cleanup: str = "delete"
+    ):
+        self.endpoint = endpoint
+        self.agent_id = agent_id
+        self.run_mode = run_mode
+        self.run_timeout = run_timeout
+        self.poll = poll or {}
+        self.pool_size = pool_size
+        self.cleanup = cleanup
+        self.credential: Optional[DefaultAzureCredential] = None
+        self.client: Optional[AIProjectClient] = None
+        self._threads: "asyncio.Queue[str]" = asyncio.Queue()
+        self._background: Set[asyncio.Task] = set()
+
+    async def start(self):
+        self.credential = DefaultAzureCredential()
+        self.client = AIProjectClient(endpoint=self.endpoint, credential=self.credential)
+
+        try:
+            # pay the credential chain once, at startup
+            await self.credential.get_token(TOKEN_SCOPE)
+        except Exception as e:
+            logger.warning("⚠️ Could not pre-fetch an Azure token: %s", e)
+
+        for _ in range(self.pool_size):
+            self._spawn(self._add_thread())
+
+    async def close(self):
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+
+        while not self._threads.empty():
+            thread_id = self._threads.get_nowait()
+            try:
+                await self.client.agents.threads.delete(thread_id)
+            except Exception:
+                pass
+
+        if self.client is not None:
+            await self.client.close()
+        if self.credential is not None:
+            await self.credential.close()
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _add_thread(self):
+        try:
+            thread = await self.client.agents.threads.create()
+            self._threads.put_nowait(thread.id)
+        except Exception as e:
+            logger.warning("⚠️ Could not pre-create agent thread: %s", e)
+
+    async def _acquire_thread(self) -> str:
+        try:
+            thread_id = self._threads.get_nowait()
+        except asyncio.QueueEmpty:
+            thread = await self.client.agents.threads.create()
+            return thread.id
+
+        self._spawn(self._add_thread())
+        return thread_id
+
+    async def _retire_thread(self, thread_id: str):
+        try:
+            await self.client.agents.threads.delete(thread_id)
+        except Exception as e:
+            logger.warning("⚠️ Could not delete agent thread %s: %s", thread_id, e)
+
+    async def sync_instructions(self, instructions: str):
+        """Make the agent's instructions `instructions` if they differ."""
+        agent = await self.client.agents.get_agent(self.agent_id)
+        if agent.instructions != instructions:
+            await self.client.agents.update_agent(self.agent_id, instructions=instructions)
+            logger.info("📝 Updated instructions of agent %s", self.agent_id)
+
+    async def run(self, prompt: str) -> dict:
+        agents = self.client.agents
+        thread_id = await self._acquire_thread()
+
+        try:
+            await agents.messages.create(
+                thread_id=thread_id,
+                role="user",
+                content=prompt
+            )
+
+            waiter = AgentRunWaiter(
+                agents,
+                timeout=self.run_timeout,
+                initial_delay=self.poll.get("initial_delay", 0.25),
+                max_delay=self.poll.get("max_delay", 2.0),
+                multiplier=self.poll.get("multiplier", 2.0),
+                jitter=self.poll.get("jitter", 0.2)
+            )
+
+            try:
+                if self.run_mode == "stream":
+                    await waiter.stream(thread_id, self.agent_id)
+                else:
+                    run = await agents.runs.create(
+                        thread_id=thread_id,
+                        agent_id=self.agent_id
+                    )
+                    await waiter.poll(thread_id, run)
+            except (Exception, asyncio.CancelledError):
+                # timeout, failure or client gone: stop the run instead of letting it burn tokens
+                status = run_status(waiter.run)
+                if waiter.run is not None and status != "completed" and status not in RUN_FAILED_STATES:
+                    try:
+                        await asyncio.shield(agents.runs.cancel(thread_id, waiter.run.id))
+                    except Exception as e:
+                        logger.warning("Failed to cancel agent run %s: %s", waiter.run.id, e)
+                raise
+
+            messages = [
+                msg async for msg in agents.messages.list(
+                    thread_id=thread_id,
+                    order=ListSortOrder.ASCENDING
+                )
+            ]
+        finally:
+            if self.cleanup == "delete":
+                self._spawn(self._retire_thread(thread_id))
+
+        for msg in reversed(messages):
+            if msg.role == "assistant":
+                with span("output_parse"):
+                    return loads(msg.text_messages[0].text.value)
+
+        raise RuntimeError("Agent produced no output")
+
+
+class FakeAgentBackend:
+    """
+    Offline stand-in for load tests: answers a tools.prompt_builder message
+    with the local rules scorer after a simulated run latency.
+    """
+
+    def __init__(self, latency: float = 1.5, jitter: float = 0.5):
+        self.latency = latency
+        self.jitter = jitter
+
+    async def start(self):
+        logger.info("🧪 Using fake agent backend (latency %.2fs ± %.2fs)", self.latency, self.jitter)
+
+    async def close(self):
+        pass
+
+    async def sync_instructions(self, instructions: str):
+        pass
+
+    async def run(self, prompt: str) -> dict:
+        message = loads(prompt)
+        await asyncio.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+        local = decide_recovery({
+            "passenger": {"Past Data": [{"booking_details": [message.get("passenger", {})]}]},
+            "original_flight": message.get("original_flight", {}),
+            "recovery": {
+                "available_flights": message.get("available_flights", []),
+                "available_seats": message.get("available_seats", [])
+            }
+        })
+
+        if local["decision"] is None:
+            raise RuntimeError("Agent produced no output")
+        return local["decision"]
+
+
+def create_agent_backend(azure_config: dict):
+    """Backend for the `azure` config section: backend azure (default) or fake."""
+    if azure_config.get("backend", "azure") == "fake":
+        fake = azure_config.get("fake", {})
+        return FakeAgentBackend(
+            latency=fake.get("latency", 1.5),
+            jitter=fake.get("jitter", 0.5)
+        )
+
+    threads = azure_config.get("threads", {})
+    return AzureAgentBackend(
+        endpoint=azure_config["project_endpoint"],
+        agent_id=azure_config["agent_id"],
+        run_mode=azure_config.get("run_mode", "poll"),
+        run_timeout=azure_config.get("run_timeout", 120),
+        poll=azure_config.get("poll", {}),
+        pool_size=threads.get("pool_size", 0),
+        cleanup=threads.get("cleanup", "delete")
+    )
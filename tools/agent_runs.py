@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Optional
+
+from azure.ai.agents.models import AgentStreamEvent, ThreadRun
+
+from tools.metrics import counter, histogram
+
+
+logger = logging.getLogger("flight-recovery-agent")
+
+
+RUN_FAILED_STATES = {"failed", "cancelled", "expired", "incomplete"}
+
+RUN_POLLS = counter(
+    "agent_run_polls_total",
+    "runs.get calls made while waiting for agent runs"
+)
+RUN_WAIT_SECONDS = histogram(
+    "agent_run_wait_seconds",
+    "Time from run start to a terminal state",
+    buckets=(0.5, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 120)
+)
+
+
+def run_status(run) -> str:
+    status = getattr(run, "status", None)
+    return getattr(status, "value", status)
+
+
+class AgentRunError(RuntimeError):
+    """The agent run ended in a non-completed terminal state."""
+
+    def __init__(self, run: ThreadRun):
+        self.run = run
+        self.status = run_status(run) or "unknown"
+        last_error = getattr(run, "last_error", None)
+        detail = f": {getattr(last_error, 'message', last_error)}" if last_error else ""
+        super().__init__(f"Agent run {run.id} ended with status '{self.status}'{detail}")
+
+
+class AgentRunWaiter:
+    """
+    Waits for one agent run to finish, either by polling runs.get with
+    exponential backoff + jitter, or by consuming the run's event stream.
+
+    `run` always holds the latest known ThreadRun so the caller can cancel
+    it if the wait is abandoned. Poll counts and wait time are recorded in
+    the agent_run_* metrics.
+    """
+
+    def __init__(
+        self,
+        agents,
+        timeout: Optional[float] = None,
+        initial_delay: float = 0.25,
+        max_delay: float = 2.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.2
+    ):
+        self.agents = agents
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.run: Optional[ThreadRun] = None
+        self.polls = 0
+
+    def _finish(self, mode: str, started: float, outcome: str):
+        elapsed = time.monotonic() - started
+        RUN_WAIT_SECONDS.observe(elapsed, mode=mode, outcome=outcome)
+        logger.info("Agent run %s %s after %.2fs (%s, %d polls)",
+                    getattr(self.run, "id", "?"), outcome, elapsed, mode, self.polls)
+
+    def _check_terminal(self) -> bool:
+        status = run_status(self.run)
+        if status == "completed":
+            return True
+        if status in RUN_FAILED_STATES or status == "requires_action":
+            # requires_action: this agent has no client-side tools to satisfy it
+            raise AgentRunError(self.run)
+        return False
+
+    async def poll(self, thread_id: str, run: ThreadRun) -> ThreadRun:
+        self.run = run
+        started = time.monotonic()
+        deadline = started + self.timeout if self.timeout else None
+        delay = self.initial_delay
+        outcome = "error"
+
+        try:
+            while True:
+                self.run = await self.agents.runs.get(thread_id, run.id)
+                self.polls += 1
+                RUN_POLLS.inc(mode="poll")
+
+                if self._check_terminal():
+                    outcome = "completed"
+                    return self.run
+
+                sleep_for = delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        outcome = "timeout"
+                        raise asyncio.TimeoutError(f"Agent run {run.id} still '{run_status(self.run)}'")
+                    sleep_for = min(sleep_for, remaining)
+
+                await asyncio.sleep(sleep_for)
+                delay = min(delay * self.multiplier, self.max_delay)
+        except AgentRunError:
+            outcome = "failed"
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            self._finish("poll", started, outcome)
+
+    async def stream(self, thread_id: str, agent_id: str) -> ThreadRun:
+        """Create the run with streaming and return once a terminal run event arrives."""
+        started = time.monotonic()
+        outcome = "error"
+
+        async def consume():
+            async with await self.agents.runs.stream(thread_id=thread_id, agent_id=agent_id) as events:
+                async for event_type, event_data, _ in events:
+                    if isinstance(event_data, ThreadRun):
+                        self.run = event_data
+                        if self._check_terminal():
+                            return self.run
+                    elif event_type == AgentStreamEvent.ERROR:
+                        raise RuntimeError(f"Agent stream error: {event_data}")
+                    elif event_type == AgentStreamEvent.DONE:
+                        break
+            raise RuntimeError("Agent stream ended without a terminal run event")
+
+        try:
+            result = await asyncio.wait_for(consume(), self.timeout)
+            outcome = "completed"
+            return result
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        except AgentRunError:
+            outcome = "failed"
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            self._finish("stream", started, outcome)
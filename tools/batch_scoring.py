@@ -0,0 +1,217 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from tools.flight_catalog import utc_epoch
+from tools.scoring import (
+    HIGHSPENDER,
+    STUDENT,
+    flight_reason,
+    seat_reason,
+)
+from tools.seat_inventory import AISLE, LEGROOM, WINDOW, XL, property_mask
+
+
+# finite stand-in for tools.scoring.NO_FARE_SCORE: -inf already marks ineligible flights
+STUDENT_NO_FARE = np.finfo(np.float64).min
+
+
+def epoch(value: Optional[str]) -> float:
+    """utc_epoch(value), with NaN for missing/bad values."""
+    e = utc_epoch(value)
+    return np.nan if e is None else e
+
+
+class FlightColumns:
+    """
+    Flights as columnar NumPy arrays. Rows are ordered by (utcDeparture,
+    flight_uid), the scalar scorer's tie-break, so argmax over a score row
+    picks the same flight the scalar scorer would.
+    """
+
+    def __init__(self, flights: Sequence[Dict[str, Any]]):
+        order = sorted(
+            range(len(flights)),
+            key=lambda i: (flights[i].get("utcDeparture") or "", str(flights[i].get("flight_uid")))
+        )
+        self.flights = [flights[i] for i in order]
+        rows = self.flights
+
+        stations = sorted({f.get("origin") for f in rows} | {f.get("destination") for f in rows}, key=str)
+        self.station_codes = {s: i for i, s in enumerate(stations)}
+
+        def fare(value):
+            return np.nan if value is None else value
+
+        self.origin = np.array([self.station_codes[f.get("origin")] for f in rows], dtype=np.int32)
+        self.destination = np.array([self.station_codes[f.get("destination")] for f in rows], dtype=np.int32)
+        self.departure = np.array([epoch(f.get("utcDeparture")) for f in rows], dtype=np.float64)
+        self.arrival = np.array([epoch(f.get("utcArrival")) for f in rows], dtype=np.float64)
+        self.stops = np.array([f.get("stops") if f.get("stops") is not None else -1 for f in rows], dtype=np.int16)
+        self.nonstop = np.array([f.get("flightType") == "NonStop" or f.get("stops") == 0 for f in rows], dtype=bool)
+        self.economy_fare = np.array([fare(f.get("min_economy_fare")) for f in rows], dtype=np.float64)
+        self.business_fare = np.array([fare(f.get("min_business_fare")) for f in rows], dtype=np.float64)
+        self.stretch = np.array([bool(f.get("isStretch")) for f in rows], dtype=bool)
+        self.filling_fast = np.array([bool(f.get("fillingFast")) for f in rows], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+
+class SeatColumns:
+    """Seats as columnar arrays: travel class code, property bitmask, availability."""
+
+    def __init__(self, seats: Sequence[Dict[str, Any]]):
+        self.seats = list(seats)
+        classes = sorted({s.get("travel_class") for s in self.seats}, key=str)
+        self.class_codes = {c: i for i, c in enumerate(classes)}
+
+        self.travel_class = np.array([self.class_codes[s.get("travel_class")] for s in self.seats], dtype=np.uint8)
+        self.properties = np.array([property_mask(s.get("seat_type") or []) for s in self.seats], dtype=np.uint8)
+        self.availability = np.array([s.get("availability") or 0 for s in self.seats], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.seats)
+
+    def class_mask(self, travel_class: str) -> np.ndarray:
+        code = self.class_codes.get(travel_class)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.travel_class == code
+
+    def comfort_scores(self) -> np.ndarray:
+        props = self.properties
+        return (
+            40 * self.class_mask("C")
+            + 25 * ((props & LEGROOM) != 0)
+            + 20 * ((props & XL) != 0)
+            + 15 * ((props & (AISLE | WINDOW)) != 0)
+        ).astype(np.int64)
+
+
+def _best(scores: np.ndarray, mask: np.ndarray) -> int:
+    """Index of the first maximum among masked entries, -1 if none."""
+    if not mask.any():
+        return -1
+    masked = np.where(mask, scores, -np.inf)
+    return int(np.argmax(masked))
+
+
+def _best_seat(seats: SeatColumns, business_cabin: bool, segment: Optional[str]) -> int:
+    if not len(seats):
+        return -1
+
+    mask = np.ones(len(seats), dtype=bool)
+    if business_cabin:
+        business = seats.class_mask("C")
+        if business.any():
+            mask = business
+    elif segment == STUDENT:
+        return _best(seats.availability.astype(np.float64), seats.class_mask("Y"))
+
+    return _best(seats.comfort_scores().astype(np.float64), mask)
+
+
+def score_cohort(
+    flights: FlightColumns,
+    seats: SeatColumns,
+    passengers: Sequence[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Score every passenger of a cohort against the same flights and seats in
+    one pass.
+
+    `passengers` are {"original_flight": <cancellation>, "segment": STUDENT |
+    HIGHSPENDER | None} dicts. The result per passenger has the same
+    {"decided", "segment", "decision"} shape as tools.scoring.decide_recovery,
+    with the same outcome. Flight scores are computed as one
+    (passengers x flights) matrix. Seat choice depends only on cabin and
+    segment, so it is computed once per distinct combination.
+    """
+    P, F = len(passengers), len(flights)
+    originals = [p.get("original_flight", {}) for p in passengers]
+    segments = [p.get("segment") for p in passengers]
+
+    if P == 0:
+        return []
+
+    unknown = -1
+    codes = flights.station_codes
+    p_origin = np.array([codes.get(o.get("origin"), unknown) for o in originals], dtype=np.int32)
+    p_dest = np.array([codes.get(o.get("destination"), unknown) for o in originals], dtype=np.int32)
+    p_dep = np.array([epoch(o.get("utc_scheduled_departure")) for o in originals], dtype=np.float64)
+    p_arr = np.array([epoch(o.get("utc_scheduled_arrival")) for o in originals], dtype=np.float64)
+    business_cabin = np.array([o.get("cabin_class") == "Business" for o in originals], dtype=bool)
+    is_student = np.array([s == STUDENT for s in segments], dtype=bool)
+    is_high = np.array([s == HIGHSPENDER for s in segments], dtype=bool)
+
+    # (P, F) eligibility: route preservation, then business fares for Business bookings
+    on_route = (flights.origin[None, :] == p_origin[:, None]) & (flights.destination[None, :] == p_dest[:, None])
+    has_business = ~np.isnan(flights.business_fare)[None, :]
+    business_ok = on_route & has_business
+    use_business = business_cabin & business_ok.any(axis=1)
+    eligible = np.where(use_business[:, None], business_ok, on_route)
+
+    # base scoring
+    with np.errstate(invalid="ignore"):
+        gap = np.abs(flights.departure[None, :] - p_dep[:, None])
+    gap = np.where(eligible & ~np.isnan(gap), gap, np.inf)
+    closest_gap = gap.min(axis=1, initial=np.inf) if F else np.full(P, np.inf)
+    closest = np.isfinite(gap) & (gap == closest_gap[:, None])
+
+    with np.errstate(invalid="ignore"):
+        earlier_arrival = flights.arrival[None, :] < p_arr[:, None]
+
+    base = (
+        40 * flights.nonstop[None, :]
+        + 25 * earlier_arrival
+        + 20 * closest
+        - 15 * flights.filling_fast[None, :]
+    ).astype(np.float64)
+    high_bonus = (40 * flights.stretch + 30 * ~np.isnan(flights.business_fare)).astype(np.float64)
+    scores = base + np.where(is_high[:, None], high_bonus[None, :], 0.0)
+
+    # STUDENT override (not for Business bookings): cheapest economy fare
+    student_rule = is_student & ~business_cabin
+    # flights without an economy fare rank below every priced one
+    student_scores = np.where(np.isnan(flights.economy_fare), STUDENT_NO_FARE, -flights.economy_fare)[None, :]
+    scores = np.where(student_rule[:, None], student_scores, scores)
+
+    masked = np.where(eligible, scores, -np.inf)
+    best = np.argmax(masked, axis=1) if F else np.zeros(P, dtype=np.int64)
+    best_score = masked[np.arange(P), best] if F else np.full(P, -np.inf)
+    candidates = eligible.sum(axis=1)
+    ties = (masked == best_score[:, None]).sum(axis=1) if F else np.zeros(P, dtype=np.int64)
+
+    seat_choice: Dict[tuple, int] = {}
+    results = []
+
+    for p in range(P):
+        segment = segments[p]
+        original = originals[p]
+        key = (bool(business_cabin[p]), segment)
+        if key not in seat_choice:
+            seat_choice[key] = _best_seat(seats, *key)
+        seat_index = seat_choice[key]
+
+        if candidates[p] == 0 or seat_index < 0:
+            results.append({"decided": False, "segment": segment, "decision": None})
+            continue
+
+        flight = flights.flights[int(best[p])]
+        seat = seats.seats[seat_index]
+
+        results.append({
+            "decided": segment is not None and bool(ties[p] == 1),
+            "segment": segment,
+            "decision": {
+                "selected_flight": flight,
+                "selected_seat": seat,
+                "reasoning": {
+                    "flight_reason": flight_reason(segment, original, flight),
+                    "seat_reason": seat_reason(segment, original, seat)
+                }
+            }
+        })
+
+    return results
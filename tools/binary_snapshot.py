@@ -0,0 +1,271 @@
+"""
+Compiled data snapshot: one file holding the seat inventory and flights as
+fixed-width columns over a shared string table, plus the CDP profiles and
+cancellations as JSON blobs (their consumers need the full records).
+
+    header   magic "FDSNAP02", section count (u32), byte order (u32, 1 = little)
+    entries  name (16 bytes), offset (u64), length (u64) per section
+    sections 8-byte aligned
+
+Readers memory-map the file read-only and cast sections to typed
+memoryviews, so loading copies nothing and worker processes share pages.
+Writers replace the file atomically, so mapped readers keep the old inode.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from math import isnan, nan
+from typing import Any, Dict, List, Optional
+
+from tools.codec import dumps_bytes, loads
+from tools.seat_inventory import SeatInventory, SeatMapInventory
+
+
+MAGIC = b"FDSNAP02"
+HEADER = struct.Struct("<8sII")
+ENTRY = struct.Struct("<16sQQ")
+LITTLE_ENDIAN = 1
+ALIGN = 8
+
+NONE = 0xFFFFFFFF      # string index for None
+INT_NONE = -2 ** 31    # int column value for None
+
+MAP_FIELDS = 6         # name, equipment, departure, arrival, first seat, end seat
+FLIGHT_STRINGS = ("flight_uid", "flight_number", "origin", "destination", "utcDeparture", "utcArrival", "flightType")
+STRETCH_FLAG = 1
+FILLING_FAST_FLAG = 2
+
+
+class StringTableBuilder:
+    def __init__(self):
+        self._index: Dict[str, int] = {}
+        self.offsets = array("I", [0])
+        self.data = bytearray()
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.offsets) - 1
+            self.data += value.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return index
+
+
+class StringTable:
+    """Decoded on access and cached per index."""
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+        self._cache: Dict[int, str] = {}
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if index == NONE:
+            return None
+        value = self._cache.get(index)
+        if value is None:
+            value = self._cache[index] = str(self.data[self.offsets[index]:self.offsets[index + 1]], "utf-8")
+        return value
+
+
+class StringColumn:
+    """A column of string-table indexes that reads as a sequence of str."""
+
+    __slots__ = ("table", "indexes")
+
+    def __init__(self, table: StringTable, indexes: memoryview):
+        self.table = table
+        self.indexes = indexes
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        return self.table[self.indexes[i]]
+
+
+def write_snapshot(
+    path: str,
+    seats: SeatInventory,
+    flights: List[Dict[str, Any]],
+    cdp: List[Dict[str, Any]],
+    cancellations: List[Dict[str, Any]]
+):
+    strings = StringTableBuilder()
+
+    seat_maps = array("I")
+    designators = array("I")
+    class_codes = array("B")
+    properties = array("B")
+    seat_types = array("H")
+    availability = array("I")
+
+    for seat_map in seats.maps:
+        start = len(designators)
+        designators.extend(strings.add(d) for d in seat_map.designators)
+        class_codes.extend(seat_map.class_codes)
+        properties.extend(seat_map.properties)
+        seat_types.extend(seat_map.seat_types)
+        availability.extend(seat_map.availability)
+        seat_maps.extend((
+            strings.add(seat_map.name),
+            strings.add(seat_map.equipment_type),
+            strings.add(seat_map.departure_station),
+            strings.add(seat_map.arrival_station),
+            start,
+            len(designators)
+        ))
+
+    flight_strings = array("I")
+    stops = array("i")
+    flags = array("B")
+    fares = array("d")
+
+    for f in flights:
+        flight_strings.extend(strings.add(f.get(k)) for k in FLIGHT_STRINGS)
+        stops.append(INT_NONE if f.get("stops") is None else f["stops"])
+        flags.append(
+            (STRETCH_FLAG if f.get("isStretch") else 0)
+            | (FILLING_FAST_FLAG if f.get("fillingFast") else 0)
+        )
+        for key in ("min_economy_fare", "min_business_fare"):
+            fares.append(nan if f.get(key) is None else f[key])
+
+    seat_classes = array("I", (strings.add(c) for c in seats.classes))
+    # each distinct seat_type as its comma-joined codes, in seat-map order
+    seat_type_table = array("I", (strings.add(",".join(t)) for t in seats.seat_types))
+
+    sections = {
+        "str_offsets": strings.offsets.tobytes(),
+        "str_data": bytes(strings.data),
+        "seat_maps": seat_maps.tobytes(),
+        "seat_classes": seat_classes.tobytes(),
+        "seat_designator": designators.tobytes(),
+        "seat_class": class_codes.tobytes(),
+        "seat_props": properties.tobytes(),
+        "seat_type": seat_types.tobytes(),
+        "seat_types": seat_type_table.tobytes(),
+        "seat_avail": availability.tobytes(),
+        "flight_strings": flight_strings.tobytes(),
+        "flight_stops": stops.tobytes(),
+        "flight_flags": flags.tobytes(),
+        "flight_fares": fares.tobytes(),
+        "cdp": dumps_bytes(cdp),
+        "cancellations": dumps_bytes(cancellations),
+    }
+
+    offset = HEADER.size + ENTRY.size * len(sections)
+    entries = []
+    for name, blob in sections.items():
+        offset += -offset % ALIGN
+        entries.append((name, offset, len(blob)))
+        offset += len(blob)
+
+    if sys.byteorder != "little":
+        raise RuntimeError("Snapshots are written on little-endian hosts only")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(sections), LITTLE_ENDIAN))
+        for name, start, length in entries:
+            f.write(ENTRY.pack(name.encode(), start, length))
+        for (name, start, _), blob in zip(entries, sections.values()):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+class MappedSnapshot:
+    """Read-only memory map of a compiled snapshot."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, byte_order = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a compiled data snapshot")
+        if byte_order != LITTLE_ENDIAN or sys.byteorder != "little":
+            raise ValueError(f"{path} byte order does not match this host")
+
+        view = memoryview(self._mm)
+        self._sections: Dict[str, memoryview] = {}
+        for i in range(count):
+            name, start, length = ENTRY.unpack_from(self._mm, HEADER.size + i * ENTRY.size)
+            self._sections[name.rstrip(b"\0").decode()] = view[start:start + length]
+
+        self.strings = StringTable(self._column("str_offsets", "I"), self._sections["str_data"])
+
+    def _column(self, name: str, typecode: str) -> memoryview:
+        return self._sections[name].cast(typecode)
+
+    def seats(self) -> SeatInventory:
+        maps = self._column("seat_maps", "I")
+        designators = self._column("seat_designator", "I")
+        class_codes = self._column("seat_class", "B")
+        properties = self._column("seat_props", "B")
+        seat_types = self._column("seat_type", "H")
+        availability = self._column("seat_avail", "I")
+
+        seat_maps = []
+        for m in range(len(maps) // MAP_FIELDS):
+            name, equipment, departure, arrival, start, end = maps[m * MAP_FIELDS:(m + 1) * MAP_FIELDS]
+            seat_maps.append(SeatMapInventory.from_columns(
+                self.strings[name],
+                self.strings[equipment],
+                self.strings[departure],
+                self.strings[arrival],
+                StringColumn(self.strings, designators[start:end]),
+                class_codes[start:end],
+                properties[start:end],
+                seat_types[start:end],
+                availability[start:end]
+            ))
+
+        classes = [self.strings[c] for c in self._column("seat_classes", "I")]
+        type_table = [self.strings[t] for t in self._column("seat_types", "I")]
+        return SeatInventory(seat_maps, classes, [tuple(t.split(",")) if t else () for t in type_table])
+
+    def flights(self) -> List[Dict[str, Any]]:
+        strings = self._column("flight_strings", "I")
+        stops = self._column("flight_stops", "i")
+        flags = self._column("flight_flags", "B")
+        fares = self._column("flight_fares", "d")
+        width = len(FLIGHT_STRINGS)
+
+        def fare(value: float):
+            if isnan(value):
+                return None
+            return int(value) if value.is_integer() else value
+
+        flights = []
+        for i in range(len(stops)):
+            uid, number, origin, destination, departure, arrival, flight_type = (
+                self.strings[s] for s in strings[i * width:(i + 1) * width]
+            )
+            flights.append({
+                "flight_uid": uid,
+                "flight_number": number,
+                "origin": origin,
+                "destination": destination,
+                "utcDeparture": departure,
+                "utcArrival": arrival,
+                "stops": None if stops[i] == INT_NONE else stops[i],
+                "flightType": flight_type,
+                "isStretch": bool(flags[i] & STRETCH_FLAG),
+                "fillingFast": bool(flags[i] & FILLING_FAST_FLAG),
+                "min_economy_fare": fare(fares[2 * i]),
+                "min_business_fare": fare(fares[2 * i + 1])
+            })
+        return flights
+
+    def cdp(self) -> List[Dict[str, Any]]:
+        return loads(bytes(self._sections["cdp"]))
+
+    def cancellations(self) -> List[Dict[str, Any]]:
+        return loads(bytes(self._sections["cancellations"]))
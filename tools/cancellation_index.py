@@ -0,0 +1,103 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from tools.codec import load_file
+
+
+Cancellation = Dict[str, Any]
+
+
+def departure_date(cancellation: Cancellation) -> str:
+    """Local departure date (YYYY-MM-DD), the date the Indigo search takes."""
+    return (cancellation.get("scheduled_departure_time") or "")[:10]
+
+
+class CancellationIndex:
+    """
+    Cancellation events indexed once at load time.
+
+    PNR and ticket number lookups are dict hits (the first record wins, as
+    with the old scan of cancell_trigger.json). Records are also grouped by
+    flight number, origin, destination, route and departure date, each
+    group in file order, and any group can be narrowed to one event_type.
+    """
+
+    def __init__(self, records: List[Cancellation]):
+        self.records = records
+        self._by_pnr: Dict[str, Cancellation] = {}
+        self._by_ticket: Dict[str, Cancellation] = {}
+        self._by_flight: Dict[str, List[Cancellation]] = {}
+        self._by_origin: Dict[str, List[Cancellation]] = {}
+        self._by_destination: Dict[str, List[Cancellation]] = {}
+        self._by_route: Dict[Tuple[str, str], List[Cancellation]] = {}
+        self._by_date: Dict[str, List[Cancellation]] = {}
+        self._by_event: Dict[str, List[Cancellation]] = {}
+
+        for c in records:
+            self._by_pnr.setdefault(c.get("pnr"), c)
+            self._by_ticket.setdefault(c.get("ticket_number"), c)
+            self._by_flight.setdefault(c.get("flight_number"), []).append(c)
+            self._by_origin.setdefault(c.get("origin"), []).append(c)
+            self._by_destination.setdefault(c.get("destination"), []).append(c)
+            self._by_route.setdefault((c.get("origin"), c.get("destination")), []).append(c)
+            self._by_date.setdefault(departure_date(c), []).append(c)
+            self._by_event.setdefault(c.get("event_type"), []).append(c)
+
+    @classmethod
+    def from_file(cls, path: str) -> "CancellationIndex":
+        return cls(load_file(path, "cancellations"))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Cancellation]:
+        return iter(self.records)
+
+    def by_pnr(self, pnr: str) -> Optional[Cancellation]:
+        return self._by_pnr.get(pnr)
+
+    def by_ticket(self, ticket_number: str) -> Optional[Cancellation]:
+        return self._by_ticket.get(ticket_number)
+
+    def find(
+        self,
+        flight_number: Optional[str] = None,
+        origin: Optional[str] = None,
+        destination: Optional[str] = None,
+        date: Optional[str] = None,
+        event_type: Optional[str] = None
+    ) -> List[Cancellation]:
+        """
+        Records matching every given key, in file order. Origin and
+        destination filter on their own or together as a route; with no
+        keys, every record is returned.
+        """
+        keys = {}
+        groups = []
+        if flight_number is not None:
+            keys["flight_number"] = flight_number
+            groups.append(self._by_flight.get(flight_number, []))
+        if origin is not None and destination is not None:
+            keys.update(origin=origin, destination=destination)
+            groups.append(self._by_route.get((origin, destination), []))
+        elif origin is not None:
+            keys["origin"] = origin
+            groups.append(self._by_origin.get(origin, []))
+        elif destination is not None:
+            keys["destination"] = destination
+            groups.append(self._by_destination.get(destination, []))
+        if event_type is not None:
+            keys["event_type"] = event_type
+            groups.append(self._by_event.get(event_type, []))
+        if date is not None:
+            groups.append(self._by_date.get(date, []))
+
+        if not groups:
+            return list(self.records)
+
+        # scan the smallest group and check the other keys on each record
+        smallest = min(groups, key=len)
+        return [
+            c for c in smallest
+            if all(c.get(k) == v for k, v in keys.items())
+            and (date is None or departure_date(c) == date)
+        ]
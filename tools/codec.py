@@ -0,0 +1,63 @@
+import json
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+    from tools.schemas import SCHEMAS
+except ImportError:
+    msgspec = None
+    SCHEMAS = {}
+
+
+HAS_ORJSON = orjson is not None
+HAS_MSGSPEC = msgspec is not None
+
+_decoders = {}
+
+
+def _decoder(schema: str):
+    decoder = _decoders.get(schema)
+    if decoder is None:
+        decoder = _decoders[schema] = msgspec.json.Decoder(SCHEMAS[schema])
+    return decoder
+
+
+def loads(data: Union[bytes, str], schema: Optional[str] = None) -> Any:
+    """
+    Parse JSON. With a schema name from tools.schemas and msgspec installed,
+    only the schema's keys are decoded; the result is still plain dicts and
+    lists. Without msgspec, or if the document doesn't fit the schema's
+    types, the full document is parsed.
+    """
+    if schema is not None and msgspec is not None:
+        try:
+            return msgspec.to_builtins(_decoder(schema).decode(data))
+        except msgspec.ValidationError:
+            pass
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(path: str, schema: Optional[str] = None) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read(), schema)
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """Compact UTF-8 JSON; values JSON can't represent are str()-ed."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, default=str, option=option)
+    return dumps(obj, sort_keys).encode("utf-8")
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> str:
+    if orjson is not None:
+        return dumps_bytes(obj, sort_keys).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys, default=str)
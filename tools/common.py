@@ -2,6 +2,8 @@ import json
 import copy
 from typing import Dict, Any, List, Optional
 
+from tools.profile_store import ProfileStore, normalize_bool, normalize_student
+
 
 class UserServiceWrapper:
     
@@ -9,6 +11,7 @@ class UserServiceWrapper:
         self.cdp_file = cdp_file
         self.seat_data_file = seat_data_file
         self.users_data = None
+        self.profiles = None
         self.seat_data = None
         self._load_cdp_data()
     
@@ -19,6 +22,7 @@ class UserServiceWrapper:
         except FileNotFoundError:
             print(f"Warning: CDP file '{self.cdp_file}' not found")
             self.users_data = []
+        self.profiles = ProfileStore(self.users_data)
     
     def _load_seat_data(self):
         if self.seat_data is None and self.seat_data_file:
@@ -29,25 +33,8 @@ class UserServiceWrapper:
                 print(f"Warning: Seat data file '{self.seat_data_file}' not found")
                 self.seat_data = {}
     
-    @staticmethod
-    def _normalize_bool(v):
-        if isinstance(v, bool):
-            return v
-        if isinstance(v, int):
-            return v == 1
-        if isinstance(v, str):
-            return v.strip().lower() in ["true", "1", "yes"]
-        return False
-    
-    @staticmethod
-    def _normalize_student(v):
-        if isinstance(v, bool):
-            return v
-        if isinstance(v, int):
-            return v > 0
-        if isinstance(v, str):
-            return v.strip().isdigit() and int(v) > 0
-        return False
+    _normalize_bool = staticmethod(normalize_bool)
+    _normalize_student = staticmethod(normalize_student)
     
     def check_autorecovery_eligibility(self, last_name: str, email_or_phone: str) -> Dict[str, Any]:
         if not self.users_data:
@@ -56,67 +43,37 @@ class UserServiceWrapper:
                 "message": "CDP data not loaded"
             }
         
-        last_name = last_name.strip().lower()
-        email_or_phone = email_or_phone.strip().lower()
+        entry = self.profiles.first(last_name, email_or_phone)
         
-        for user in self.users_data:
-            user_info = user.get("user_info", {})
-            
-            ln = user_info.get("USR_LASTNAME", "").strip().lower()
-            ph = str(user_info.get("USR_MOBILE", "")).strip().lower()
-            em = user_info.get("USR_EMAIL", "").strip().lower()
-            
-            if ln != last_name:
-                continue
-            
-            if not (email_or_phone == ph or email_or_phone == em):
-                continue
-            
-            guid = user_info.get("USR_GUID", "")
-            bookings = user.get("booking_details", [])
-            
-            is_highspender = False
-            is_student = False
-            
-            for b in bookings:
-                h_high = self._normalize_bool(b.get("HIGHSPENDERHIGHFREQ", False))
-                h_low = self._normalize_bool(b.get("HIGHSPENDERLOWFREQ", False))
-                student = self._normalize_student(b.get("STUDENT", 0))
-                
-                if h_high or h_low:
-                    is_highspender = True
-                if student:
-                    is_student = True
-            
-            eligible = is_highspender or is_student
-            
-            if eligible:
-                return {
-                    "status": "eligible",
-                    "eligible": True,
-                    "user_info": {
-                        "USR_FIRSTNAME": user_info.get("USR_FIRSTNAME", ""),
-                        "USR_LASTNAME": user_info.get("USR_LASTNAME", ""),
-                        "USR_MOBILE": user_info.get("USR_MOBILE", ""),
-                        "USR_EMAIL": user_info.get("USR_EMAIL", ""),
-                        "USR_GUID": guid
-                    },
-                    "criteria": {
-                        "is_highspender": is_highspender,
-                        "is_student": is_student
-                    }
-                }
-            
+        if entry is None:
             return {
-                "status": "not_eligible",
+                "status": "not_found",
                 "eligible": False,
-                "message": "User is not eligible for Autorecovery"
+                "message": "Invalid user info or user not found"
+            }
+        
+        if entry.eligible:
+            user_info = entry.user_info
+            return {
+                "status": "eligible",
+                "eligible": True,
+                "user_info": {
+                    "USR_FIRSTNAME": user_info.get("USR_FIRSTNAME", ""),
+                    "USR_LASTNAME": user_info.get("USR_LASTNAME", ""),
+                    "USR_MOBILE": user_info.get("USR_MOBILE", ""),
+                    "USR_EMAIL": user_info.get("USR_EMAIL", ""),
+                    "USR_GUID": user_info.get("USR_GUID", "")
+                },
+                "criteria": {
+                    "is_highspender": entry.is_highspender,
+                    "is_student": entry.is_student
+                }
             }
         
         return {
-            "status": "not_found",
+            "status": "not_eligible",
             "eligible": False,
-            "message": "Invalid user info or user not found"
+            "message": "User is not eligible for Autorecovery"
         }
     
     def find_user_profile(self, last_name: str, email_or_phone: str) -> Dict[str, Any]:
@@ -126,28 +83,10 @@ class UserServiceWrapper:
                 "message": "CDP data not loaded"
             }
         
-        last_name = last_name.strip().lower()
-        email_or_phone = email_or_phone.strip().lower()
-        
-        matches = []
-        
-        for user in self.users_data:
-            user_info = user.get("user_info", {})
-            
-            ln = user_info.get("USR_LASTNAME", "").strip().lower()
-            ph = str(user_info.get("USR_MOBILE", "")).strip().lower()
-            em = user_info.get("USR_EMAIL", "").strip().lower()
-            
-            if ln != last_name:
-                continue
-            
-            if not (email_or_phone == ph or email_or_phone == em):
-                continue
-            
-            matches.append({
-                "user_info": user_info,
-                "booking_details": user.get("booking_details", [])
-            })
+        matches = [
+            entry.as_profile()
+            for entry in self.profiles.lookup(last_name, email_or_phone)
+        ]
         
         if not matches:
             return {
@@ -0,0 +1,111 @@
+import asyncio
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from tools.codec import dumps_bytes
+from tools.metrics import counter
+
+
+CACHE_REQUESTS = counter(
+    "decision_cache_requests_total",
+    "Recovery decision lookups by outcome (hit, miss, shared)"
+)
+
+
+def canonical_key(*parts: Any) -> str:
+    """sha256 of the parts as canonical JSON (sorted keys, no whitespace)."""
+    return hashlib.sha256(dumps_bytes(parts, sort_keys=True)).hexdigest()
+
+
+class DecisionCache:
+    """
+    LRU + TTL cache of recovery decisions with single-flight.
+
+    Entries belong to one data snapshot version (a digest of the MCP
+    server's data files, so a restart on edited data is a new version):
+    the first lookup that carries a different version drops everything.
+    Concurrent lookups for a key that is being computed wait on the same
+    task instead of starting their own; the task is cancelled only when
+    every waiter has gone. Failures are not cached. Callers get a deep
+    copy, so they may change it.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[asyncio.Task, list]] = {}
+        self.version: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _check_version(self, version: Optional[str]):
+        if version is not None and version != self.version:
+            if self.version is not None:
+                self.clear()
+            self.version = version
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any):
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]],
+                             version: Optional[str] = None) -> Any:
+        """Cached value for key, else the result of one shared compute() call."""
+        self._check_version(version)
+
+        value = self.get(key)
+        if value is not None:
+            CACHE_REQUESTS.inc(outcome="hit")
+            return copy.deepcopy(value)
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            CACHE_REQUESTS.inc(outcome="miss")
+            task = asyncio.ensure_future(self._compute(key, compute, version))
+            inflight = self._inflight[key] = (task, [0])
+        else:
+            CACHE_REQUESTS.inc(outcome="shared")
+
+        task, waiters = inflight
+        waiters[0] += 1
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            waiters[0] -= 1
+            if waiters[0] == 0 and not task.done():
+                task.cancel()
+
+        return copy.deepcopy(value)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Any]], version: Optional[str]):
+        try:
+            value = await compute()
+            # a reload during the run makes the result stale for the new version
+            if version is None or version == self.version:
+                self.put(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
@@ -0,0 +1,129 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def utc_epoch(value: Optional[str]) -> Optional[float]:
+    """'2025-12-27T19:30:00Z' -> POSIX seconds; None for missing/bad values."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def extract_available_flights(flights_json: dict):
+    flights = {}
+    trips = flights_json.get("data", {}).get("trips", [])
+
+    for trip in trips:
+        for journey in trip.get("journeysAvailable", []):
+            segments = journey.get("segments", [])
+            if not segments:
+                continue
+
+            segment = segments[0]
+            identifier = segment.get("identifier", {})
+            designator = segment.get("designator", {})
+
+            carrier = identifier.get("carrierCode")
+            flight_no = identifier.get("identifier")
+            utc_departure = designator.get("utcDeparture")
+
+            if not all([carrier, flight_no, utc_departure]):
+                continue
+
+            flight_uid = journey.get("journeyKey")
+            if flight_uid in flights:
+                continue
+
+            economy = []
+            business = []
+
+            for f in journey.get("passengerFares") or []:
+                if f.get("FareClass") == "Economy":
+                    economy.append(f.get("totalFareAmount"))
+                elif f.get("FareClass") == "Business":
+                    business.append(f.get("totalFareAmount"))
+
+            flights[flight_uid] = {
+                "flight_uid": flight_uid,
+                "flight_number": f"{carrier}{flight_no}",
+                "origin": designator.get("origin"),
+                "destination": designator.get("destination"),
+                "utcDeparture": utc_departure,
+                "utcArrival": designator.get("utcArrival"),
+                "stops": journey.get("stops"),
+                "flightType": journey.get("flightType"),
+                "isStretch": segment.get("isStretch", False),
+                "fillingFast": journey.get("fillingFast", False),
+                "min_economy_fare": min(economy) if economy else None,
+                "min_business_fare": min(business) if business else None
+            }
+
+    return list(flights.values())
+
+
+class FlightCatalog:
+    """
+    Normalized flights (as produced by extract_available_flights) built once
+    per data snapshot and partitioned by route.
+
+    Each (origin, destination) partition is sorted by utcDeparture with a
+    parallel list of departure epochs, so a time-window query is two bisects
+    plus a slice.
+    """
+
+    def __init__(self, flights: List[Dict[str, Any]]):
+        self.flights = flights
+        self._by_uid: Dict[str, Dict[str, Any]] = {}
+        self._routes: Dict[Tuple[str, str], Tuple[List[float], List[Dict[str, Any]]]] = {}
+
+        partitions: Dict[Tuple[str, str], List[Tuple[float, Dict[str, Any]]]] = {}
+
+        for flight in flights:
+            self._by_uid.setdefault(flight.get("flight_uid"), flight)
+            departure = utc_epoch(flight.get("utcDeparture"))
+            if departure is None:
+                continue
+
+            route = (flight.get("origin"), flight.get("destination"))
+            partitions.setdefault(route, []).append((departure, flight))
+
+        for route, rows in partitions.items():
+            rows.sort(key=lambda row: row[0])
+            self._routes[route] = ([d for d, _ in rows], [f for _, f in rows])
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+    def by_uid(self, flight_uid: str) -> Optional[Dict[str, Any]]:
+        return self._by_uid.get(flight_uid)
+
+    def for_route(
+        self,
+        origin: str,
+        destination: str,
+        around: Optional[str] = None,
+        window_hours: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Flights on origin -> destination ordered by utcDeparture. With `around`
+        (a UTC timestamp) and `window_hours`, only flights departing within
+        +/- window_hours of it are returned.
+        """
+        partition = self._routes.get((origin, destination))
+        if partition is None:
+            return []
+
+        departures, flights = partition
+
+        center = utc_epoch(around)
+        if center is None or window_hours is None:
+            return list(flights)
+
+        window = window_hours * 3600
+        lo = bisect_left(departures, center - window)
+        hi = bisect_right(departures, center + window)
+        return flights[lo:hi]
@@ -0,0 +1,152 @@
+import itertools
+from typing import Any, Dict, Optional
+
+import httpx
+
+from tools.codec import dumps_bytes, loads
+from tools.tracing import TRACE_HEADER, current_trace_id
+
+
+class MCPError(RuntimeError):
+    """JSON-RPC error, tool error or unusable response from the MCP server."""
+
+
+def tool_payload(result: Dict[str, Any]) -> Any:
+    """
+    The JSON our tools return ({"content": [{"type": "json", "json": ...}]}),
+    read straight from structuredContent. Servers that only send text content
+    are parsed once as a fallback.
+    """
+    structured = result.get("structuredContent")
+    if structured is None:
+        for item in result.get("content", []):
+            if item.get("type") == "text":
+                try:
+                    structured = loads(item["text"])
+                except ValueError:
+                    continue
+                break
+
+    if isinstance(structured, dict):
+        for item in structured.get("content") or []:
+            if item.get("type") == "json":
+                return item["json"]
+        return structured
+
+    raise MCPError("No MCP JSON response found")
+
+
+class MCPClient:
+    """
+    tools/call and tools/list client for a stateless streamable-HTTP MCP server.
+
+    One keep-alive connection pool is shared by every call. Each request
+    gets a unique JSON-RPC id, so concurrent calls over the pool can never
+    be matched to another call's response; on HTTP/1.1 loopback each
+    in-flight call holds one pooled connection. SSE responses are parsed
+    incrementally; once the event answering our id arrives, the rest of the
+    stream is only drained, never parsed.
+    """
+
+    HEADERS = {
+        "Accept": "application/json, text/event-stream",
+        "Content-Type": "application/json"
+    }
+
+    def __init__(self, url: str, timeout: float = 30, max_connections: int = 100):
+        self.url = url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.http: Optional[httpx.AsyncClient] = None
+        self._ids = itertools.count(1)
+
+    async def start(self):
+        self.http = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections
+            )
+        )
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+
+    async def _rpc(self, method: str, params: dict) -> Dict[str, Any]:
+        """Result of one JSON-RPC request; errors raise MCPError."""
+        request_id = next(self._ids)
+        payload = {
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+            "id": request_id
+        }
+
+        headers = self.HEADERS
+        trace_id = current_trace_id()
+        if trace_id:
+            headers = {**headers, TRACE_HEADER: trace_id}
+
+        async with self.http.stream("POST", self.url, content=dumps_bytes(payload), headers=headers) as response:
+            if response.status_code != 200:
+                raise MCPError((await response.aread()).decode(errors="replace"))
+
+            if response.headers.get("content-type", "").startswith("application/json"):
+                message = loads(await response.aread())
+            else:
+                message = await self._read_sse(response, request_id)
+
+        if message.get("error"):
+            raise MCPError(message["error"].get("message", str(message["error"])))
+
+        return message.get("result", {})
+
+    async def call_tool(self, name: str, arguments: dict) -> Any:
+        result = await self._rpc("tools/call", {"name": name, "arguments": arguments})
+        if result.get("isError"):
+            text = " ".join(i.get("text", "") for i in result.get("content", []) if i.get("type") == "text")
+            raise MCPError(text or f"Tool {name} failed")
+
+        return tool_payload(result)
+
+    async def list_tools(self) -> Dict[str, Dict[str, Any]]:
+        """Tools the server advertises: name -> input schema."""
+        tools: Dict[str, Dict[str, Any]] = {}
+        cursor = None
+        while True:
+            result = await self._rpc("tools/list", {"cursor": cursor} if cursor else {})
+            for tool in result.get("tools", []):
+                tools[tool["name"]] = tool.get("inputSchema") or {}
+            cursor = result.get("nextCursor")
+            if not cursor:
+                return tools
+
+    @staticmethod
+    async def _read_sse(response: httpx.Response, request_id: int) -> Dict[str, Any]:
+        found = None
+        data = []
+        async for line in response.aiter_lines():
+            if found is not None:
+                # only drain the stream's tail, so the connection goes back to the pool
+                continue
+            if line.startswith("data:"):
+                data.append(line[5:].lstrip())
+                continue
+            if line or not data:
+                continue
+
+            # blank line: end of one event
+            message = loads("\n".join(data))
+            data = []
+            if message.get("id") == request_id:
+                found = message
+
+        if found is None and data:
+            message = loads("\n".join(data))
+            if message.get("id") == request_id:
+                found = message
+
+        if found is None:
+            raise MCPError("No MCP JSON response found")
+        return found
@@ -0,0 +1,58 @@
+"""
+Opaque page cursors for list_recovery_candidates.
+
+A cursor is base64 JSON {"o": offset, "v": snapshot version, "k": kind}.
+It only resumes the listing it came from: a cursor issued on another data
+snapshot or for the other kind is CURSOR_EXPIRED, anything that does not
+decode to that shape is CURSOR_INVALID. Page sizes below 1 are
+PAGE_SIZE_INVALID.
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+class CursorError(ValueError):
+    """A cursor or page size the tool rejects; `reason` is the error reason it returns."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def encode_cursor(offset: int, version: str, kind: str) -> str:
+    raw = json.dumps({"o": offset, "v": version, "k": kind}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def cursor_offset(cursor: Optional[str], version: str, kind: str) -> int:
+    """The offset `cursor` resumes at, 0 without one; CursorError if it cannot be used."""
+    if not cursor:
+        return 0
+
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise CursorError("CURSOR_INVALID")
+
+    offset = state.get("o") if isinstance(state, dict) else None
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise CursorError("CURSOR_INVALID")
+    if state.get("v") != version or state.get("k") != kind:
+        raise CursorError("CURSOR_EXPIRED")
+    return offset
+
+
+def check_page_size(page_size: Any) -> int:
+    """`page_size` if it is an int of at least 1, else CursorError."""
+    if not isinstance(page_size, int) or isinstance(page_size, bool) or page_size < 1:
+        raise CursorError("PAGE_SIZE_INVALID")
+    return page_size
+
+
+def page(items: Sequence[Any], offset: int, page_size: int, version: str, kind: str) -> Tuple[List[Any], Optional[str]]:
+    """items[offset:offset + page_size] and the cursor of the next page (None on the last)."""
+    end = offset + page_size
+    next_cursor = encode_cursor(end, version, kind) if end < len(items) else None
+    return list(items[offset:end]), next_cursor
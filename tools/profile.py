@@ -1,50 +1,29 @@
 import json
+import logging
 
-CDP_FILE = "/Users/rishabhraizada/Desktop/AIonOS Uniform/Dashboard UI - MCP/data/cdp.json"
+from tools.profile_store import get_profile_store
 
 
-def find_users(last_name, email_or_phone):
+logger = logging.getLogger("flight-disruption-profiles")
 
-    try:
-        with open(CDP_FILE, "r", encoding="utf-8") as f:
-            users = json.load(f)
-    except FileNotFoundError:
-        print(json.dumps({
-            "status": "error",
-            "message": "CDP data file 'cdp.json' not found in knowledge base"
-        }, indent=2))
-        return {"status": "error"}
 
-    last_name = last_name.strip().lower()
-    email_or_phone = email_or_phone.strip().lower()
+def find_users(last_name, email_or_phone, store=None):
 
-    matches = []
+    if store is None:
+        try:
+            store = get_profile_store()
+        except FileNotFoundError:
+            logger.error("❌ CDP data file 'cdp.json' not found in knowledge base")
+            return {"status": "error"}
 
-    for user in users:
-        user_info = user.get("user_info", {})
-
-        ln = user_info.get("USR_LASTNAME", "").strip().lower()
-        ph = str(user_info.get("USR_MOBILE", "")).strip().lower()
-        em = user_info.get("USR_EMAIL", "").strip().lower()
-
-        # last name must match
-        if ln != last_name:
-            continue
-
-        # must match phone OR email
-        if not (email_or_phone == ph or email_or_phone == em):
-            continue
-
-        matches.append({
-            "user_info": user_info,
-            "booking_details": user.get("booking_details", [])
-        })
+    # last name must match, plus phone OR email
+    matches = [entry.as_profile() for entry in store.lookup(last_name, email_or_phone)]
 
     if not matches:
-        print("Invalid user info or user not found")
+        logger.debug("Invalid user info or user not found")
         return {"status": "not_found"}
 
-    print(json.dumps(matches, indent=2))
+    logger.debug("Matched %s CDP profiles", len(matches))
     return matches
 
 
@@ -56,7 +35,7 @@ def main():
         print("Both fields are required")
         return
 
-    find_users(last_name, email_or_phone)
+    print(json.dumps(find_users(last_name, email_or_phone), indent=2))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.codec import load_file
+
+
+CDP_FILE = "/Users/rishabhraizada/Desktop/AIonOS Uniform/Dashboard UI - MCP/data/cdp.json"
+
+
+def normalize_bool(v):
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, int):
+        return v == 1
+    if isinstance(v, str):
+        return v.strip().lower() in ["true", "1", "yes"]
+    return False
+
+
+def normalize_student(v):
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, int):
+        return v > 0
+    if isinstance(v, str):
+        return v.strip().isdigit() and int(v) > 0
+    return False
+
+
+def _norm(v) -> str:
+    return str(v if v is not None else "").strip().lower()
+
+
+class ProfileEntry:
+    """One CDP user with its eligibility flags computed at load time."""
+
+    __slots__ = ("position", "user_info", "booking_details", "is_highspender", "is_student")
+
+    def __init__(self, position: int, user: Dict[str, Any]):
+        self.position = position
+        self.user_info = user.get("user_info", {})
+        self.booking_details = user.get("booking_details", [])
+
+        is_highspender = False
+        is_student = False
+
+        for b in self.booking_details:
+            h_high = normalize_bool(b.get("HIGHSPENDERHIGHFREQ", False))
+            h_low = normalize_bool(b.get("HIGHSPENDERLOWFREQ", False))
+
+            if h_high or h_low:
+                is_highspender = True
+            if normalize_student(b.get("STUDENT", 0)):
+                is_student = True
+
+        self.is_highspender = is_highspender
+        self.is_student = is_student
+
+    @property
+    def eligible(self) -> bool:
+        return self.is_highspender or self.is_student
+
+    def as_profile(self) -> Dict[str, Any]:
+        return {
+            "user_info": self.user_info,
+            "booking_details": self.booking_details
+        }
+
+
+class ProfileStore:
+    """
+    In-memory CDP profile store.
+
+    Users are indexed once by (last name, phone) and (last name, email),
+    both lower-cased, so lookups are dict hits instead of a scan of cdp.json.
+    """
+
+    def __init__(self, users: List[Dict[str, Any]]):
+        self.users = users
+        self.entries: List[ProfileEntry] = []
+        self._by_phone: Dict[Tuple[str, str], List[ProfileEntry]] = {}
+        self._by_email: Dict[Tuple[str, str], List[ProfileEntry]] = {}
+
+        for position, user in enumerate(users):
+            entry = ProfileEntry(position, user)
+            self.entries.append(entry)
+
+            ln = _norm(entry.user_info.get("USR_LASTNAME", ""))
+            ph = _norm(entry.user_info.get("USR_MOBILE", ""))
+            em = _norm(entry.user_info.get("USR_EMAIL", ""))
+
+            self._by_phone.setdefault((ln, ph), []).append(entry)
+            self._by_email.setdefault((ln, em), []).append(entry)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ProfileStore":
+        return cls(load_file(path, "cdp"))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, last_name: str, email_or_phone: str) -> List[ProfileEntry]:
+        """All users matching last name and phone OR email, in cdp.json order."""
+        key = (_norm(last_name), _norm(email_or_phone))
+
+        by_phone = self._by_phone.get(key, [])
+        by_email = self._by_email.get(key, [])
+
+        if not by_email:
+            return list(by_phone)
+        if not by_phone:
+            return list(by_email)
+
+        merged = {e.position: e for e in by_phone}
+        merged.update((e.position, e) for e in by_email)
+        return [merged[p] for p in sorted(merged)]
+
+    def first(self, last_name: str, email_or_phone: str) -> Optional[ProfileEntry]:
+        matches = self.lookup(last_name, email_or_phone)
+        return matches[0] if matches else None
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    """
+    Process-wide store for CDP_FILE, loaded on first use.
+    Raises FileNotFoundError (and retries next call) if the file is missing.
+    """
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore.from_file(CDP_FILE)
+    return _store
@@ -0,0 +1,207 @@
+from typing import Any, Dict, Optional
+
+from tools.codec import dumps
+
+from tools.scoring import passenger_booking, passenger_segment, score_flights, score_seats
+
+
+# static decision rules: live in the agent's instructions, or in the message when those are not synced
+AGENT_INSTRUCTIONS = """
+You are a STRICT Flight & Seat Recovery Decision Engine.
+
+Each message is one compact JSON object:
+- passenger: booking_details[0] CDP flags (STUDENT, HIGHSPENDERHIGHFREQ, HIGHSPENDERLOWFREQ, BUSINESS, LEISURE)
+- original_flight: the cancelled booking
+- available_flights / available_seats: the ONLY options, best pre-scored first
+- instructions (optional): these rules, when they are not set on the agent itself
+
+ABSOLUTE RULES (FAIL IF VIOLATED):
+1. You MUST ONLY use flights and seats provided in the message.
+2. You MUST NOT invent flight_uid, flight_number, seat_number, or prices.
+3. If any identifier is not found in the input → FAIL.
+
+--------------------------------
+ORIGINAL BOOKING CONSTRAINTS (MANDATORY)
+--------------------------------
+
+1. Route Preservation:
+- selected_flight.origin MUST equal original_flight.origin
+- selected_flight.destination MUST equal original_flight.destination
+- If no such flight exists → FAIL
+
+2. Time Proximity:
+- Prefer flights whose utcDeparture is closest to original_flight.utc_scheduled_departure
+- Prefer earlier arrival over later arrival when possible
+
+3. Cabin Preservation:
+- If original_flight.cabin_class == "Business":
+  - Must preserve Business cabin in recovery
+  - Only downgrade if no business seats exist
+- If original_flight.cabin_class == "Economy":
+  - Economy acceptable, upgrade optional for highspender
+
+These rules apply BEFORE CDP logic.
+
+--------------------------------
+PRIORITY 0 (ORIGINAL BOOKING OVERRIDE)
+--------------------------------
+
+If original_flight.cabin_class == "Business":
+- ALWAYS select a flight that has min_business_fare available
+- ALWAYS select a seat with travel_class == "C"
+- This rule OVERRIDES STUDENT logic
+- Only downgrade to Economy if NO business seats exist
+
+If STUDENT > 0 AND original_flight.cabin_class == "Economy":
+- MUST NOT select travel_class == "C"
+- MUST select economy class only
+
+--------------------------------
+CDP PRIORITY ORDER (MANDATORY)
+--------------------------------
+
+PRIORITY 1 (OVERRIDES EVERYTHING):
+- If STUDENT > 0:
+  - ALWAYS choose the CHEAPEST min_economy_fare flight
+  - NEVER choose business class
+  - Seat priority: cheapest economy seat, ignore comfort
+
+- If HIGHSPENDERHIGHFREQ == true OR HIGHSPENDERLOWFREQ == true:
+  - Price is IRRELEVANT
+  - Prefer comfort, stretch, business class
+  - Prefer earlier arrival and non-stop
+
+PRIORITY 2 (ONLY IF NOT STUDENT / HIGHSPENDER):
+- BUSINESS > LEISURE → time + comfort
+- LEISURE >= BUSINESS → cost + flexibility
+
+--------------------------------
+FLIGHT SCORING (STRICT)
+--------------------------------
+
+Start score = 0
++40 if NonStop
++25 if utcArrival earlier than original flight
++20 if utcDeparture closest to original flight
+-15 if fillingFast == true
+
+STUDENT OVERRIDE:
+- score = -min_economy_fare
+- Flights without min_economy_fare rank below every priced flight; among them, earliest utcDeparture first
+- IGNORE all comfort bonuses
+
+HIGHSPENDER OVERRIDE:
++40 if isStretch == true
++30 if min_business_fare exists
+
+--------------------------------
+SEAT SCORING (STRICT)
+--------------------------------
+
+STUDENT OVERRIDE:
+- Prefer travel_class == "Y"
+- Ignore LEGROOM, XL, WINDOW, AISLE
+- Pick seat with highest availability
+
+HIGHSPENDER OVERRIDE:
++40 if travel_class == "C"
++25 if LEGROOM
++20 if XL
++15 if AISLE or WINDOW
+
+==============================
+OUTPUT MANDATORY (STRICT JSON ONLY)
+==============================
+{
+  "selected_flight": { ...one available_flights entry, unchanged... },
+  "selected_seat": { ...one available_seats entry, unchanged... },
+  "reasoning": {
+    "flight_reason": "Explicitly reference STUDENT or HIGHSPENDER rule",
+    "seat_reason": "Explicitly reference STUDENT or HIGHSPENDER rule"
+  }
+}
+
+FAIL IF:
+- Cheapest flight is NOT selected for STUDENT
+- Business class is selected for STUDENT
+- Any invented ID appears
+""".strip()
+
+
+PASSENGER_FIELDS = ("STUDENT", "HIGHSPENDERHIGHFREQ", "HIGHSPENDERLOWFREQ", "BUSINESS", "LEISURE")
+
+ORIGINAL_FIELDS = (
+    "flight_number", "origin", "destination",
+    "utc_scheduled_departure", "utc_scheduled_arrival", "cabin_class"
+)
+
+FLIGHT_FIELDS = (
+    "flight_uid", "flight_number", "origin", "destination", "utcDeparture", "utcArrival",
+    "flightType", "stops", "fillingFast", "isStretch", "min_economy_fare", "min_business_fare"
+)
+
+SEAT_FIELDS = ("seat_number", "travel_class", "seat_type", "availability")
+
+
+def project(record: Dict[str, Any], fields) -> Dict[str, Any]:
+    """Only `fields`, skipping missing and None values."""
+    return {k: record[k] for k in fields if record.get(k) is not None}
+
+
+def build_recovery_prompt(mcp_data: Dict[str, Any], max_flights: int = 10, max_seats: int = 15,
+                          instructions: Optional[str] = None) -> str:
+    """
+    Per-thread message for the agent: the fields the rules read, flights on
+    the original route and class-eligible seats only, each capped to the
+    top-K by the local pre-score, as compact JSON. Pass `instructions`
+    (AGENT_INSTRUCTIONS) when the agent does not carry the rules itself.
+    """
+    original = mcp_data.get("original_flight", {})
+    recovery = mcp_data.get("recovery", {})
+    booking = passenger_booking(mcp_data)
+    segment = passenger_segment(booking)
+
+    flights = score_flights(recovery.get("available_flights") or [], original, segment)
+    seats = score_seats(recovery.get("available_seats") or [], original, segment)
+
+    message = {
+        "passenger": project(booking, PASSENGER_FIELDS),
+        "original_flight": project(original, ORIGINAL_FIELDS),
+        "available_flights": [project(f, FLIGHT_FIELDS) for _, f in flights[:max_flights]],
+        "available_seats": [project(s, SEAT_FIELDS) for _, s in seats[:max_seats]]
+    }
+    if instructions:
+        message["instructions"] = instructions
+
+    return dumps(message)
+
+
+def expand_agent_output(mcp_data: Dict[str, Any], output: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Swap the agent's projected flight/seat for the full records they name,
+    so responses carry every field. Unknown identifiers are left as-is.
+    """
+    recovery = mcp_data.get("recovery", {})
+    flight = output.get("selected_flight") or {}
+    seat = output.get("selected_seat") or {}
+
+    full_flight = next(
+        (f for f in recovery.get("available_flights") or [] if f.get("flight_uid") == flight.get("flight_uid")),
+        None
+    )
+    full_seat = next(
+        (
+            s for s in recovery.get("available_seats") or []
+            if s.get("seat_number") == seat.get("seat_number")
+            and s.get("travel_class") == seat.get("travel_class", s.get("travel_class"))
+        ),
+        None
+    )
+
+    expanded = dict(output)
+    if full_flight is not None:
+        expanded["selected_flight"] = full_flight
+    if full_seat is not None:
+        expanded["selected_seat"] = full_seat
+    return expanded
+
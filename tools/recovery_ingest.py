@@ -0,0 +1,263 @@
+"""
+Proactive recovery: follow a feed of cancellation events and decide each
+affected PNR before the passenger asks.
+
+CancellationFeed tails a JSONL file of events shaped like the records of
+cancell_trigger.json. CancellationIngestor hands new flight_cancelled
+events to a fixed pool of workers through a bounded queue. A slow
+consumer therefore slows the tail down instead of growing memory. Results
+go to a RecoveryStore that /flight-recovery reads first.
+
+The feed only names the PNRs to recover: the MCP server still looks each
+one up in its own cancellation data, so feed events must also be written
+there. An event that arrives before the MCP server has reloaded that data
+is retried with exponential backoff.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from tools.codec import loads
+from tools.metrics import counter
+
+
+logger = logging.getLogger("flight-disruption-ingest")
+
+
+INGESTED_EVENTS = counter(
+    "ingested_cancellation_events_total",
+    "Feed events by outcome (queued, skipped, invalid, retried, done, failed)"
+)
+PRECOMPUTED_LOOKUPS = counter(
+    "precomputed_recovery_requests_total",
+    "/flight-recovery lookups in the precomputed store by outcome (hit, miss)"
+)
+
+
+class RecoveryNotReady(Exception):
+    """The MCP server does not know the event's PNR yet; raised by `recover` to retry later."""
+
+
+def _norm(v) -> str:
+    return str(v if v is not None else "").strip().lower()
+
+
+class RecoveryStore:
+    """
+    Precomputed /flight-recovery responses by PNR, with LRU + TTL.
+
+    A response is only returned to a caller whose last name matches the
+    one on the cancellation, so the store answers exactly the requests
+    the live path would. Like DecisionCache, entries belong to one data
+    snapshot version: check_version() with a different version drops
+    everything, and responses computed on an older version are not kept.
+    """
+
+    def __init__(self, max_entries: int = 100000, ttl: float = 900,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self.version: Optional[Any] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def check_version(self, version: Optional[Any]):
+        if version is not None and version != self.version:
+            if self.version is not None and self._entries:
+                logger.info("🔄 Data snapshot %s replaced %s, dropping %s precomputed recoveries",
+                            version, self.version, len(self._entries))
+                self.clear()
+            self.version = version
+
+    def __contains__(self, pnr: str) -> bool:
+        entry = self._entries.get(pnr)
+        return entry is not None and entry[0] > self._clock()
+
+    def put(self, pnr: str, last_name: str, response: Dict[str, Any], version: Optional[Any] = None):
+        if version is not None:
+            if self.version is None:
+                self.version = version
+            elif version != self.version:
+                return
+        self._entries[pnr] = (self._clock() + self.ttl, _norm(last_name), response)
+        self._entries.move_to_end(pnr)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, pnr: str, last_name: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(pnr)
+        if entry is not None and entry[0] <= self._clock():
+            del self._entries[pnr]
+            entry = None
+
+        if entry is None or entry[1] != _norm(last_name):
+            PRECOMPUTED_LOOKUPS.inc(outcome="miss")
+            return None
+
+        PRECOMPUTED_LOOKUPS.inc(outcome="hit")
+        return entry[2]
+
+
+class CancellationFeed:
+    """
+    Events appended to a JSONL file, one per line, as they are written.
+
+    Only complete lines are read; a partly written last line waits for the
+    next poll. Lines already in the file at the first poll are skipped
+    unless `from_start`. The file may not exist yet. If it shrinks
+    (truncated or replaced), it is read again from the start.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 1.0, from_start: bool = False):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+        self._offset: Optional[int] = None
+
+    def _read_new(self) -> List[bytes]:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            # everything in a file created later is new
+            self._offset = 0
+            return []
+
+        if self._offset is None:
+            self._offset = 0 if self.from_start else size
+        if size < self._offset:
+            logger.info("🔁 %s shrank, reading it from the start", self.path)
+            self._offset = 0
+        if size == self._offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+
+        end = chunk.rfind(b"\n") + 1
+        self._offset += end
+        return chunk[:end].splitlines()
+
+    async def events(self, stop: asyncio.Event) -> AsyncIterator[Dict[str, Any]]:
+        while not stop.is_set():
+            for line in await asyncio.to_thread(self._read_new):
+                if not line.strip():
+                    continue
+                try:
+                    event = loads(line)
+                except ValueError as e:
+                    event = None
+                    logger.warning("⚠️ Skipping malformed event in %s: %s", self.path, e)
+
+                if isinstance(event, dict):
+                    yield event
+                else:
+                    INGESTED_EVENTS.inc(outcome="invalid")
+
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+class CancellationIngestor:
+    """
+    Runs `recover(event)` for each new flight_cancelled event of a feed on
+    `workers` concurrent tasks. At most `queue_size` events wait. A PNR
+    already in the store, or being worked on, is skipped. When `recover`
+    raises RecoveryNotReady the event is queued again after
+    retry_delay * 2**attempt seconds, up to `retries` times. Failures are
+    logged and counted, and the PNR is left to the live path.
+    """
+
+    def __init__(self, feed: CancellationFeed, recover: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 store: RecoveryStore, workers: int = 4, queue_size: int = 1000,
+                 retries: int = 5, retry_delay: float = 2.0):
+        self.feed = feed
+        self.recover = recover
+        self.store = store
+        self.workers = workers
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+        self._pending: Set[str] = set()
+        self._attempts: Dict[str, int] = {}
+        self._stop = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._retrying: Set[asyncio.Task] = set()
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._tail())] + [
+            asyncio.create_task(self._work()) for _ in range(self.workers)
+        ]
+        logger.info("📥 Ingesting cancellations from %s with %s workers", self.feed.path, self.workers)
+
+    async def close(self):
+        self._stop.set()
+        tasks = self._tasks + list(self._retrying)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _tail(self):
+        async for event in self.feed.events(self._stop):
+            pnr = event.get("pnr")
+            if event.get("event_type") != "flight_cancelled" or not pnr \
+                    or pnr in self._pending or pnr in self.store:
+                INGESTED_EVENTS.inc(outcome="skipped")
+                continue
+
+            self._pending.add(pnr)
+            INGESTED_EVENTS.inc(outcome="queued")
+            await self._queue.put(event)
+
+    def _retry(self, event: Dict[str, Any]) -> bool:
+        """Queue the event again after its backoff; False once retries are used up."""
+        pnr = event.get("pnr")
+        attempt = self._attempts.get(pnr, 0)
+        if attempt >= self.retries:
+            return False
+        self._attempts[pnr] = attempt + 1
+
+        async def requeue():
+            await asyncio.sleep(self.retry_delay * 2 ** attempt)
+            await self._queue.put(event)
+
+        task = asyncio.create_task(requeue())
+        self._retrying.add(task)
+        task.add_done_callback(self._retrying.discard)
+        return True
+
+    async def _work(self):
+        while True:
+            event = await self._queue.get()
+            pnr = event.get("pnr")
+            retrying = False
+            try:
+                await self.recover(event)
+                INGESTED_EVENTS.inc(outcome="done")
+            except asyncio.CancelledError:
+                raise
+            except RecoveryNotReady as e:
+                retrying = self._retry(event)
+                INGESTED_EVENTS.inc(outcome="retried" if retrying else "failed")
+                if not retrying:
+                    logger.warning("⚠️ PNR %s still unknown after %s retries: %s", pnr, self.retries, e)
+            except Exception as e:
+                INGESTED_EVENTS.inc(outcome="failed")
+                logger.warning("⚠️ Precomputing recovery for PNR %s failed: %s", pnr, e)
+            finally:
+                if not retrying:
+                    self._pending.discard(pnr)
+                    self._attempts.pop(pnr, None)
+                self._queue.task_done()
@@ -0,0 +1,133 @@
+"""
+msgspec schemas for the data files and upstream responses.
+
+Only the keys the code reads are declared; msgspec skips everything else
+while decoding. Field names are the JSON keys and defaults are omitted
+when converting back to builtins, so the resulting dicts look like a
+json.load of the same file minus the unused keys, and existing .get()
+lookups behave the same. Records handed back to clients as they are
+(cancellation events) are decoded as plain objects and keep every key.
+Requires msgspec; tools.codec falls back to plain JSON without it.
+"""
+from typing import Any, Dict, List, Optional, Union
+
+import msgspec
+
+
+Number = Union[int, float]
+
+
+class _Schema(msgspec.Struct, omit_defaults=True, frozen=True):
+    pass
+
+
+# ---------- CDP profiles (data/cdp.json) ----------
+
+class CDPUser(_Schema):
+    user_info: Dict[str, Any] = {}
+    # every column is returned to callers as "Past Data", so keep them all
+    booking_details: List[Dict[str, Any]] = []
+
+
+# ---------- cancellation events (data/cancell_trigger.json) ----------
+
+# records go back to clients whole (original_flight), so every key is kept:
+# a Struct would silently drop fields added upstream
+CancellationEvent = Dict[str, Any]
+
+
+# ---------- flight search journeys ----------
+
+class SegmentIdentifier(_Schema):
+    carrierCode: Optional[str] = None
+    identifier: Optional[str] = None
+
+
+class SegmentDesignator(_Schema):
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    utcDeparture: Optional[str] = None
+    utcArrival: Optional[str] = None
+
+
+class JourneySegment(_Schema):
+    identifier: SegmentIdentifier = SegmentIdentifier()
+    designator: SegmentDesignator = SegmentDesignator()
+    isStretch: Optional[bool] = None
+
+
+class PassengerFare(_Schema):
+    FareClass: Optional[str] = None
+    totalFareAmount: Optional[Number] = None
+
+
+class Journey(_Schema):
+    journeyKey: Optional[str] = None
+    stops: Optional[int] = None
+    flightType: Optional[str] = None
+    fillingFast: Optional[bool] = None
+    segments: List[JourneySegment] = []
+    passengerFares: Optional[List[PassengerFare]] = None
+
+
+class Trip(_Schema):
+    journeysAvailable: List[Journey] = []
+
+
+class FlightSearchData(_Schema):
+    trips: List[Trip] = []
+
+
+class FlightSearchResponse(_Schema):
+    data: FlightSearchData = FlightSearchData()
+
+
+# ---------- seat maps ----------
+
+class SeatProperty(_Schema):
+    code: Optional[str] = None
+
+
+class SeatUnit(_Schema):
+    designator: Optional[str] = None
+    assignable: Optional[bool] = None
+    availability: Optional[int] = None
+    travelClassCode: Optional[str] = None
+    properties: List[SeatProperty] = []
+
+
+class Compartment(_Schema):
+    units: List[SeatUnit] = []
+
+
+class Deck(_Schema):
+    compartments: Dict[str, Compartment] = {}
+
+
+class SeatMap(_Schema):
+    name: Optional[str] = None
+    equipmentType: Optional[str] = None
+    departureStation: Optional[str] = None
+    arrivalStation: Optional[str] = None
+    decks: Dict[str, Deck] = {}
+
+
+class SeatMapEntry(_Schema):
+    seatMap: SeatMap = SeatMap()
+
+
+class SeatMapData(_Schema):
+    seatMaps: List[SeatMapEntry] = []
+
+
+class SeatMapResponse(_Schema):
+    data: SeatMapData = SeatMapData()
+
+
+SCHEMAS = {
+    "cdp": List[CDPUser],
+    "cancellations": List[CancellationEvent],
+    "cancellation": CancellationEvent,
+    "flights": FlightSearchResponse,
+    "seatmap": SeatMapResponse,
+}
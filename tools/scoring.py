@@ -0,0 +1,219 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from tools.flight_catalog import utc_epoch
+from tools.profile_store import normalize_bool, normalize_student
+
+
+STUDENT = "STUDENT"
+HIGHSPENDER = "HIGHSPENDER"
+
+# STUDENT score of a flight without min_economy_fare: below any priced flight
+NO_FARE_SCORE = float("-inf")
+
+
+def passenger_booking(mcp_data: Dict[str, Any]) -> Dict[str, Any]:
+    """booking_details[0] of the first CDP match, as the agent prompt evaluates it."""
+    passenger = mcp_data.get("passenger", {})
+    past = passenger.get("Past Data") or passenger.get("past_data") or [{}]
+    if not isinstance(past, list) or not past:
+        return {}
+    bookings = past[0].get("booking_details") or [{}]
+    return bookings[0]
+
+
+def passenger_segment(booking: Dict[str, Any]) -> Optional[str]:
+    """STUDENT outranks HIGHSPENDER (CDP priority 1); None when neither applies."""
+    if normalize_student(booking.get("STUDENT", 0)):
+        return STUDENT
+    if normalize_bool(booking.get("HIGHSPENDERHIGHFREQ", False)) or \
+            normalize_bool(booking.get("HIGHSPENDERLOWFREQ", False)):
+        return HIGHSPENDER
+    return None
+
+
+def _is_nonstop(flight: Dict[str, Any]) -> bool:
+    return flight.get("flightType") == "NonStop" or flight.get("stops") == 0
+
+
+def eligible_flights(flights: List[Dict[str, Any]], original: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Route preservation, then business-fare availability for Business bookings."""
+    candidates = [
+        f for f in flights
+        if f.get("origin") == original.get("origin")
+        and f.get("destination") == original.get("destination")
+    ]
+
+    if original.get("cabin_class") == "Business":
+        business = [f for f in candidates if f.get("min_business_fare") is not None]
+        if business:
+            candidates = business
+
+    return candidates
+
+
+def score_flights(
+    flights: List[Dict[str, Any]],
+    original: Dict[str, Any],
+    segment: Optional[str]
+) -> List[Tuple[float, Dict[str, Any]]]:
+    """(score, flight) for every eligible flight, best first."""
+    candidates = eligible_flights(flights, original)
+    business_cabin = original.get("cabin_class") == "Business"
+
+    if segment == STUDENT and not business_cabin:
+        # flights without a published economy fare stay eligible, after every priced one
+        scored = [
+            (-f["min_economy_fare"] if f.get("min_economy_fare") is not None else NO_FARE_SCORE, f)
+            for f in candidates
+        ]
+    else:
+        original_departure = utc_epoch(original.get("utc_scheduled_departure"))
+        original_arrival = utc_epoch(original.get("utc_scheduled_arrival"))
+
+        gaps = [
+            abs(utc_epoch(f.get("utcDeparture")) - original_departure)
+            if original_departure is not None and utc_epoch(f.get("utcDeparture")) is not None
+            else None
+            for f in candidates
+        ]
+        closest = min((g for g in gaps if g is not None), default=None)
+
+        scored = []
+        for f, gap in zip(candidates, gaps):
+            score = 0
+            if _is_nonstop(f):
+                score += 40
+            arrival = utc_epoch(f.get("utcArrival"))
+            if arrival is not None and original_arrival is not None and arrival < original_arrival:
+                score += 25
+            if gap is not None and gap == closest:
+                score += 20
+            if f.get("fillingFast"):
+                score -= 15
+
+            if segment == HIGHSPENDER:
+                if f.get("isStretch"):
+                    score += 40
+                if f.get("min_business_fare") is not None:
+                    score += 30
+
+            scored.append((score, f))
+
+    # ties: earliest departure first, then flight_uid for a stable answer
+    scored.sort(key=lambda sf: (-sf[0], sf[1].get("utcDeparture") or "", str(sf[1].get("flight_uid"))))
+    return scored
+
+
+def seat_class_filter(seats: List[Dict[str, Any]], original: Dict[str, Any],
+                      segment: Optional[str]) -> List[Dict[str, Any]]:
+    """Cabin preservation for Business bookings, economy-only for students."""
+    if original.get("cabin_class") == "Business":
+        business = [s for s in seats if s.get("travel_class") == "C"]
+        return business or seats
+    if segment == STUDENT:
+        return [s for s in seats if s.get("travel_class") == "Y"]
+    return seats
+
+
+def seat_comfort_score(seat: Dict[str, Any]) -> int:
+    seat_type = seat.get("seat_type") or []
+    score = 0
+    if seat.get("travel_class") == "C":
+        score += 40
+    if "LEGROOM" in seat_type:
+        score += 25
+    if "XL" in seat_type:
+        score += 20
+    if "AISLE" in seat_type or "WINDOW" in seat_type:
+        score += 15
+    return score
+
+
+def score_seats(
+    seats: List[Dict[str, Any]],
+    original: Dict[str, Any],
+    segment: Optional[str]
+) -> List[Tuple[float, Dict[str, Any]]]:
+    """(score, seat) for every class-eligible seat, best first."""
+    candidates = seat_class_filter(seats, original, segment)
+
+    if segment == STUDENT and original.get("cabin_class") != "Business":
+        # comfort ignored: highest availability wins
+        scored = [(s.get("availability") or 0, s) for s in candidates]
+    else:
+        scored = [(seat_comfort_score(s), s) for s in candidates]
+
+    # stable sort keeps seat-map order among equal seats
+    scored.sort(key=lambda ss: -ss[0])
+    return scored
+
+
+def flight_reason(segment: Optional[str], original: Dict[str, Any], flight: Dict[str, Any]) -> str:
+    if original.get("cabin_class") == "Business":
+        return (f"Original booking is Business: {flight.get('flight_number')} keeps the "
+                f"{original.get('origin')}-{original.get('destination')} route with a business fare available")
+    if segment == STUDENT:
+        if flight.get("min_economy_fare") is None:
+            return (f"STUDENT rule: no economy fare is published on the original route, "
+                    f"{flight.get('flight_number')} departs earliest")
+        return (f"STUDENT rule: {flight.get('flight_number')} is the cheapest economy option "
+                f"on the original route (min_economy_fare {flight.get('min_economy_fare')})")
+    if segment == HIGHSPENDER:
+        return (f"HIGHSPENDER rule: {flight.get('flight_number')} scores best on non-stop, "
+                f"arrival, departure proximity, stretch and business-fare availability")
+    return f"{flight.get('flight_number')} scores best on non-stop, arrival and departure proximity"
+
+
+def seat_reason(segment: Optional[str], original: Dict[str, Any], seat: Dict[str, Any]) -> str:
+    features = ", ".join(seat.get("seat_type") or []) or "standard"
+    if original.get("cabin_class") == "Business" and seat.get("travel_class") == "C":
+        return f"Business cabin preserved: seat {seat.get('seat_number')} ({features})"
+    if segment == STUDENT:
+        return (f"STUDENT rule: economy seat {seat.get('seat_number')} with the highest "
+                f"availability, comfort ignored")
+    if segment == HIGHSPENDER:
+        return (f"HIGHSPENDER rule: seat {seat.get('seat_number')} "
+                f"(class {seat.get('travel_class')}, {features}) has the highest comfort score")
+    return f"Seat {seat.get('seat_number')} (class {seat.get('travel_class')}, {features}) has the highest comfort score"
+
+
+def decide_recovery(mcp_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply the recovery agent's scoring rules locally to a recover_passenger
+    payload.
+
+    Returns {"decided", "segment", "decision"}. `decision` has the agent's
+    selected_flight/selected_seat/reasoning shape, or is None when there is
+    no eligible flight or seat. `decided` is True only when the rules pin
+    the outcome: the passenger is STUDENT or HIGHSPENDER and one flight
+    scores strictly best. Other cases need the agent's judgement (journey
+    intent, ties).
+    """
+    original = mcp_data.get("original_flight", {})
+    recovery = mcp_data.get("recovery", {})
+    segment = passenger_segment(passenger_booking(mcp_data))
+
+    flights = score_flights(recovery.get("available_flights") or [], original, segment)
+    seats = score_seats(recovery.get("available_seats") or [], original, segment)
+
+    if not flights or not seats:
+        return {"decided": False, "segment": segment, "decision": None}
+
+    flight_score, flight = flights[0]
+    _, seat = seats[0]
+
+    unambiguous = len(flights) == 1 or flights[1][0] < flight_score
+    decided = segment is not None and unambiguous
+
+    return {
+        "decided": decided,
+        "segment": segment,
+        "decision": {
+            "selected_flight": flight,
+            "selected_seat": seat,
+            "reasoning": {
+                "flight_reason": flight_reason(segment, original, flight),
+                "seat_reason": seat_reason(segment, original, seat)
+            }
+        }
+    }
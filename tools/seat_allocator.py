@@ -0,0 +1,246 @@
+import heapq
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from tools.scoring import HIGHSPENDER, STUDENT, score_seats
+from tools.seat_inventory import SeatInventory
+
+
+HELD = "held"
+CONFIRMED = "confirmed"
+
+# cohort assignment order: high-spenders pick first, then students, then everyone else
+COHORT_PRIORITY = {HIGHSPENDER: 0, STUDENT: 1}
+
+
+class UnknownFlight(ValueError):
+    """The flight is not in the catalogue, so it has no seats to hold."""
+
+
+class Reservation:
+    __slots__ = ("hold_id", "key", "pnr", "state", "expires_at")
+
+    def __init__(self, hold_id: str, key: Tuple[str, str, str], pnr: str, state: str, expires_at: Optional[float]):
+        self.hold_id = hold_id
+        self.key = key
+        self.pnr = pnr
+        self.state = state
+        self.expires_at = expires_at
+
+
+class SeatAllocator:
+    """
+    Reservation layer over a SeatInventory so concurrent recoveries never
+    get the same seat.
+
+    A seat is identified by (flight_uid, seat_number, travel_class) and
+    moves free -> held (with a TTL) -> confirmed, or back to free on
+    release or expiry. A PNR has at most one reservation per flight:
+    holding another seat on the same flight gives up the previous one, so
+    retried recoveries do not pile up seats. A flight's seats are those of
+    the seat maps flying its route (`route_of(flight_uid)`), or every seat
+    map when none does. Flights route_of() does not know (None) and
+    unknown seats cannot be held. Per flight and
+    travel class, a counter of taken seats backs remaining(). All
+    operations run under one lock. Expired holds are swept lazily from a
+    heap, so no timer thread is needed.
+    """
+
+    def __init__(self, inventory: SeatInventory, route_of: Callable[[str], Optional[Tuple[str, str]]],
+                 hold_ttl: float = 120, clock: Callable[[], float] = time.monotonic):
+        self.hold_ttl = hold_ttl
+        self._clock = clock
+        self._route_of = route_of
+        self._lock = threading.Lock()
+        self._by_seat: Dict[Tuple[str, str, str], Reservation] = {}
+        self._by_hold: Dict[str, Reservation] = {}
+        self._by_pnr: Dict[Tuple[str, str], Reservation] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._taken: Dict[Tuple[str, str], int] = {}
+        self.rebase(inventory)
+
+    def rebase(self, inventory: SeatInventory):
+        """Point at a new inventory (data reload); existing reservations are kept."""
+        with self._lock:
+            self._inventory = inventory
+            self._seat_sets: Dict[Tuple[str, str], Tuple[Dict[Tuple[str, str], Dict[str, Any]], Dict[str, int]]] = {}
+
+    def _flight_seats(self, flight_uid: str) -> Tuple[Dict[Tuple[str, str], Dict[str, Any]], Dict[str, int]]:
+        """
+        The flight's seats by (seat_number, travel_class), and their count
+        per travel class. UnknownFlight if route_of() does not know it.
+        """
+        route = self._route_of(flight_uid)
+        if route is None:
+            raise UnknownFlight(f"Unknown flight {flight_uid}")
+        route = tuple(route)
+        cached = self._seat_sets.get(route)
+        if cached is None:
+            seats = self._inventory.view(route=route)
+            if not seats:
+                seats = self._inventory.view()
+            by_key = {(seat["seat_number"], seat["travel_class"]): seat for seat in seats}
+            totals: Dict[str, int] = {}
+            for seat in by_key.values():
+                totals[seat["travel_class"]] = totals.get(seat["travel_class"], 0) + 1
+            cached = self._seat_sets[route] = (by_key, totals)
+        return cached
+
+    def _sweep(self):
+        now = self._clock()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, hold_id = heapq.heappop(self._expiry)
+            reservation = self._by_hold.get(hold_id)
+            if reservation is not None and reservation.state == HELD:
+                self._free(reservation)
+
+    def _free(self, reservation: Reservation):
+        del self._by_hold[reservation.hold_id]
+        del self._by_seat[reservation.key]
+        if self._by_pnr.get((reservation.pnr, reservation.key[0])) is reservation:
+            del self._by_pnr[(reservation.pnr, reservation.key[0])]
+        flight_class = (reservation.key[0], reservation.key[2])
+        self._taken[flight_class] -= 1
+
+    def _take(self, key: Tuple[str, str, str], pnr: str, state: str, ttl: Optional[float]) -> Reservation:
+        previous = self._by_pnr.get((pnr, key[0]))
+        if previous is not None:
+            self._free(previous)
+
+        hold_id = uuid.uuid4().hex
+        expires_at = None
+        if state == HELD:
+            expires_at = self._clock() + (self.hold_ttl if ttl is None else ttl)
+            heapq.heappush(self._expiry, (expires_at, hold_id))
+
+        reservation = Reservation(hold_id, key, pnr, state, expires_at)
+        self._by_seat[key] = reservation
+        self._by_hold[hold_id] = reservation
+        self._by_pnr[(pnr, key[0])] = reservation
+        flight_class = (key[0], key[2])
+        self._taken[flight_class] = self._taken.get(flight_class, 0) + 1
+        return reservation
+
+    def hold(self, flight_uid: str, seat_number: str, travel_class: str, pnr: str,
+             ttl: Optional[float] = None) -> Optional[Reservation]:
+        """
+        Hold a free seat for `ttl` seconds, replacing the PNR's earlier
+        reservation on this flight. None if another PNR has the seat;
+        UnknownFlight for a flight outside the catalogue, ValueError if
+        the flight has no such seat.
+        """
+        key = (flight_uid, seat_number, travel_class)
+        with self._lock:
+            self._sweep()
+            if (seat_number, travel_class) not in self._flight_seats(flight_uid)[0]:
+                raise ValueError(f"Unknown seat {seat_number}-{travel_class} on flight {flight_uid}")
+            existing = self._by_seat.get(key)
+            if existing is not None:
+                # idempotent for the same passenger
+                return existing if existing.pnr == pnr else None
+            return self._take(key, pnr, HELD, ttl)
+
+    def confirm(self, hold_id: str) -> Optional[Reservation]:
+        """Make a live hold permanent; None if it expired or never existed."""
+        with self._lock:
+            self._sweep()
+            reservation = self._by_hold.get(hold_id)
+            if reservation is None:
+                return None
+            reservation.state = CONFIRMED
+            reservation.expires_at = None
+            return reservation
+
+    def release(self, hold_id: str) -> bool:
+        with self._lock:
+            self._sweep()
+            reservation = self._by_hold.get(hold_id)
+            if reservation is None:
+                return False
+            self._free(reservation)
+            return True
+
+    def available(self, seats: List[Dict[str, Any]], flight_uids: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        `seats` that are free on at least one of `flight_uids`; for a single
+        flight, exactly its free seats. A seat taken on one flight stays
+        offered for the others, and hold() settles the chosen one.
+        """
+        flight_uids = list(flight_uids)
+        with self._lock:
+            self._sweep()
+            if not self._by_seat or not flight_uids:
+                return seats
+            taken = self._by_seat
+            return [
+                s for s in seats
+                if any((uid, s["seat_number"], s["travel_class"]) not in taken for uid in flight_uids)
+            ]
+
+    def remaining(self, flight_uid: str) -> Dict[str, int]:
+        """Free seats per travel class on a flight; UnknownFlight if there is no such flight."""
+        with self._lock:
+            self._sweep()
+            _, totals = self._flight_seats(flight_uid)
+            return {
+                travel_class: total - self._taken.get((flight_uid, travel_class), 0)
+                for travel_class, total in totals.items()
+            }
+
+    def assign_cohort(self, flight_uid: str, passengers: List[Dict[str, Any]]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Confirm one seat per passenger on `flight_uid` in a single locked pass.
+
+        `passengers` are {"pnr", "segment", "cabin_class"} dicts. High-spenders
+        choose first, then students, then the rest. Each passenger gets the
+        best free seat under the recovery seat rules, or None if their
+        cabin has nothing left. A passenger who already has a seat on the
+        flight keeps it. UnknownFlight if there is no such flight.
+        """
+        order = sorted(passengers, key=lambda p: COHORT_PRIORITY.get(p.get("segment"), 2))
+        assignments: Dict[str, Optional[Dict[str, Any]]] = {}
+        rankings: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]] = {}
+        cursors: Dict[Tuple[str, Optional[str]], int] = {}
+
+        with self._lock:
+            self._sweep()
+            by_key, _ = self._flight_seats(flight_uid)
+            seats = list(by_key.values())
+
+            for p in order:
+                existing = self._by_pnr.get((p.get("pnr"), flight_uid))
+                if existing is not None:
+                    existing.state = CONFIRMED
+                    existing.expires_at = None
+                    assignments[p.get("pnr")] = by_key.get((existing.key[1], existing.key[2])) or {
+                        "seat_number": existing.key[1],
+                        "travel_class": existing.key[2]
+                    }
+                    continue
+
+                rank_key = (p.get("cabin_class"), p.get("segment"))
+                if rank_key not in rankings:
+                    original = {"cabin_class": p.get("cabin_class")}
+                    rankings[rank_key] = [s for _, s in score_seats(seats, original, p.get("segment"))]
+                    cursors[rank_key] = 0
+
+                ranking = rankings[rank_key]
+                i = cursors[rank_key]
+                while i < len(ranking):
+                    key = (flight_uid, ranking[i]["seat_number"], ranking[i]["travel_class"])
+                    if key not in self._by_seat:
+                        break
+                    i += 1
+                cursors[rank_key] = i
+
+                if i == len(ranking):
+                    assignments[p.get("pnr")] = None
+                    continue
+
+                seat = ranking[i]
+                self._take((flight_uid, seat["seat_number"], seat["travel_class"]), p.get("pnr"), CONFIRMED, None)
+                assignments[p.get("pnr")] = seat
+
+        return assignments
@@ -27,12 +27,13 @@ def filter_available_seats_keep_structure(seat_data: Dict[str, Any]) -> Dict[str
 
     return result
 
-with open("/Users/rishabhraizada/Desktop/AIonOS Uniform/Dashboard UI - MCP/data/available_seats.json", "r", encoding="utf-8") as f:
-    seat_data = json.load(f)
+if __name__ == "__main__":
+    with open("/Users/rishabhraizada/Desktop/AIonOS Uniform/Dashboard UI - MCP/data/available_seats.json", "r", encoding="utf-8") as f:
+        seat_data = json.load(f)
 
-filtered_data = filter_available_seats_keep_structure(seat_data)
+    filtered_data = filter_available_seats_keep_structure(seat_data)
 
-with open("available_seats.json", "w", encoding="utf-8") as f:
-    json.dump(filtered_data, f, indent=2)
+    with open("available_seats.json", "w", encoding="utf-8") as f:
+        json.dump(filtered_data, f, indent=2)
 
-print("Saved: available_seats.json")
\ No newline at end of file
+    print("Saved: available_seats.json")
\ No newline at end of file
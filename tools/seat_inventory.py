@@ -0,0 +1,211 @@
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# seat properties as bitflags for filtering and scoring; seat_type keeps the seat map's order
+WINDOW = 1
+AISLE = 2
+LEGROOM = 4
+XL = 8
+STRETCH = 16
+
+SEAT_PROPERTIES = (
+    ("WINDOW", WINDOW),
+    ("AISLE", AISLE),
+    ("LEGROOM", LEGROOM),
+    ("XL", XL),
+    ("STRETCH", STRETCH),
+)
+PROPERTY_FLAGS = dict(SEAT_PROPERTIES)
+
+
+def property_mask(codes) -> int:
+    mask = 0
+    for code in codes:
+        mask |= PROPERTY_FLAGS.get(code, 0)
+    return mask
+
+
+def seat_type_codes(codes) -> Tuple[str, ...]:
+    """The known property codes among `codes`, in their seat-map order."""
+    seat_type: List[str] = []
+    for code in codes:
+        if code in PROPERTY_FLAGS and code not in seat_type:
+            seat_type.append(code)
+    return tuple(seat_type)
+
+
+def seat_available(seat: Dict[str, Any]) -> bool:
+    """A seat-map unit that can be offered: assignable with availability left."""
+    return seat.get("assignable") is True and seat.get("availability", 0) > 0
+
+
+class SeatMapInventory:
+    """
+    Available (assignable, availability > 0) seats of one seat map kept as
+    parallel arrays: designator, travel class code, property bitmask, seat
+    type code and availability. Travel classes and seat types (property
+    codes in seat-map order) are indexes into the owning inventory's
+    tables.
+    """
+
+    __slots__ = (
+        "name", "equipment_type", "departure_station", "arrival_station",
+        "designators", "class_codes", "properties", "seat_types", "availability",
+    )
+
+    def __init__(self, seat_map: Dict[str, Any], class_index: Dict[str, int],
+                 default_class: Optional[str] = None,
+                 type_index: Optional[Dict[Tuple[str, ...], int]] = None):
+        if type_index is None:
+            type_index = {}
+        self.name = seat_map.get("name")
+        self.equipment_type = seat_map.get("equipmentType")
+        self.departure_station = seat_map.get("departureStation")
+        self.arrival_station = seat_map.get("arrivalStation")
+
+        self.designators: List[str] = []
+        self.class_codes = array("B")
+        self.properties = array("B")
+        self.seat_types = array("H")
+        self.availability = array("I")
+
+        for deck in seat_map.get("decks", {}).values():
+            for cabin in deck.get("compartments", {}).values():
+                for seat in cabin.get("units", []):
+                    if not seat_available(seat):
+                        continue
+
+                    travel_class = seat.get("travelClassCode", default_class)
+                    if travel_class not in class_index:
+                        class_index[travel_class] = len(class_index)
+
+                    seat_type = seat_type_codes(p.get("code") for p in seat.get("properties", []))
+                    if seat_type not in type_index:
+                        type_index[seat_type] = len(type_index)
+
+                    self.designators.append(seat.get("designator"))
+                    self.class_codes.append(class_index[travel_class])
+                    self.properties.append(property_mask(seat_type))
+                    self.seat_types.append(type_index[seat_type])
+                    self.availability.append(seat.get("availability"))
+
+    @classmethod
+    def from_columns(cls, name, equipment_type, departure_station, arrival_station,
+                     designators, class_codes, properties, seat_types, availability) -> "SeatMapInventory":
+        """
+        Wrap prebuilt columns (e.g. memory-mapped views from a compiled
+        snapshot) without copying them. Any indexable sequences work.
+        """
+        seat_map = cls.__new__(cls)
+        seat_map.name = name
+        seat_map.equipment_type = equipment_type
+        seat_map.departure_station = departure_station
+        seat_map.arrival_station = arrival_station
+        seat_map.designators = designators
+        seat_map.class_codes = class_codes
+        seat_map.properties = properties
+        seat_map.seat_types = seat_types
+        seat_map.availability = availability
+        return seat_map
+
+    def __len__(self) -> int:
+        return len(self.designators)
+
+
+class SeatInventory:
+    """
+    Compact seat inventory for every seat map in a seat-map response, built
+    once and queried by travel class, required properties and route.
+    Seats are addressed as (map index, seat index) pairs.
+    """
+
+    def __init__(self, maps: List[SeatMapInventory], classes: List[Optional[str]],
+                 seat_types: List[Tuple[str, ...]]):
+        self.maps = maps
+        self.classes = classes
+        self.seat_types = seat_types
+        self._class_index = {c: i for i, c in enumerate(classes)}
+        self._views: Dict[Tuple, List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def from_seatmap(cls, seatmap_json: Optional[dict], default_class: Optional[str] = None) -> "SeatInventory":
+        class_index: Dict[Optional[str], int] = {}
+        type_index: Dict[Tuple[str, ...], int] = {}
+        maps = []
+
+        if seatmap_json:
+            for sm in seatmap_json.get("data", {}).get("seatMaps", []):
+                maps.append(SeatMapInventory(sm.get("seatMap", {}), class_index, default_class, type_index))
+
+        classes = sorted(class_index, key=class_index.get)
+        seat_types = sorted(type_index, key=type_index.get)
+        return cls(maps, classes, seat_types)
+
+    def __len__(self) -> int:
+        return sum(len(m) for m in self.maps)
+
+    def select(
+        self,
+        travel_class: Optional[str] = None,
+        require: int = 0,
+        route: Optional[Tuple[str, str]] = None,
+        dedupe: bool = True
+    ) -> Iterator[Tuple[int, int]]:
+        """
+        Yield (map, seat) positions of available seats, optionally limited to
+        one travel class, seats having every flag in `require`, and seat maps
+        flying `route` (origin, destination). With dedupe, a designator and
+        class seen on an earlier seat map is skipped.
+        """
+        code = None
+        if travel_class is not None:
+            code = self._class_index.get(travel_class)
+            if code is None:
+                return
+
+        seen = set()
+
+        for m, seat_map in enumerate(self.maps):
+            if route is not None and (seat_map.departure_station, seat_map.arrival_station) != tuple(route):
+                continue
+
+            designators = seat_map.designators
+            class_codes = seat_map.class_codes
+            properties = seat_map.properties
+
+            for i in range(len(designators)):
+                if code is not None and class_codes[i] != code:
+                    continue
+                if require and properties[i] & require != require:
+                    continue
+                if dedupe:
+                    key = (designators[i], class_codes[i])
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                yield m, i
+
+    def seat(self, m: int, i: int) -> Dict[str, Any]:
+        seat_map = self.maps[m]
+        return {
+            "seat_number": seat_map.designators[i],
+            "travel_class": self.classes[seat_map.class_codes[i]],
+            "availability": seat_map.availability[i],
+            "seat_type": list(self.seat_types[seat_map.seat_types[i]])
+        }
+
+    def to_list(self, **filters) -> List[Dict[str, Any]]:
+        """select(**filters) rendered in the recover_passenger seat format."""
+        return [self.seat(m, i) for m, i in self.select(**filters)]
+
+    def view(self, **filters) -> List[Dict[str, Any]]:
+        """
+        Memoized to_list(**filters). The inventory never changes once built,
+        so repeated queries share one rendered list; callers must not mutate it.
+        """
+        key = tuple(sorted(filters.items()))
+        rendered = self._views.get(key)
+        if rendered is None:
+            rendered = self._views[key] = self.to_list(**filters)
+        return rendered
@@ -0,0 +1,47 @@
+"""
+Compile the JSON fixtures into a binary data snapshot (tools/binary_snapshot.py):
+
+    python -m tools.snapshot_compiler [--data-dir data] [--out data/snapshot.bin]
+
+Point `data.snapshot` in config/config.yaml at the output to have the MCP
+servers memory-map it instead of parsing the JSON files. Re-run after
+changing any fixture; the servers pick up the new file on their next
+reload poll.
+"""
+import argparse
+import os
+import time
+
+from tools.binary_snapshot import write_snapshot
+from tools.codec import load_file
+from tools.flight_catalog import extract_available_flights
+from tools.seat_inventory import SeatInventory
+
+
+def compile_snapshot(data_dir: str, out: str):
+    seats = SeatInventory.from_seatmap(load_file(os.path.join(data_dir, "available_seats.json"), "seatmap"))
+    flights = extract_available_flights(load_file(os.path.join(data_dir, "flights-dataa-extended.json"), "flights"))
+    cdp = load_file(os.path.join(data_dir, "cdp.json"), "cdp")
+    cancellations = load_file(os.path.join(data_dir, "cancell_trigger.json"), "cancellations")
+
+    write_snapshot(out, seats, flights, cdp, cancellations)
+    return len(seats), len(flights), len(cdp), len(cancellations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile data/*.json into a memory-mappable snapshot")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--out", default=os.path.join("data", "snapshot.bin"))
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    seats, flights, users, cancellations = compile_snapshot(args.data_dir, args.out)
+    print(
+        f"✅ {args.out}: {seats} seats, {flights} flights, {users} profiles, "
+        f"{cancellations} cancellations, {os.path.getsize(args.out)} bytes "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
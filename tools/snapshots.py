@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tools.codec import load_file
+
+
+logger = logging.getLogger("flight-disruption-snapshots")
+
+
+def load_json(path: str):
+    return load_file(path)
+
+
+class Snapshot:
+    """
+    One consistent, read-only generation of every registered data source.
+
+    Handlers take a reference once per request and read only from it, so a
+    reload that swaps in a newer snapshot never changes data mid-request.
+
+    `version` identifies the data, not the process: it is a digest of every
+    source file's mtime and size, so it changes whenever a file does, also
+    across restarts, while processes loading the same files agree on it.
+    `generation` counts the snapshots this process published.
+    """
+
+    __slots__ = ("version", "generation", "loaded_at", "_data")
+
+    def __init__(self, generation: int, data: Dict[str, Any], version: Optional[str] = None):
+        self.generation = generation
+        self.version = version if version is not None else str(generation)
+        self.loaded_at = time.time()
+        self._data = MappingProxyType(dict(data))
+
+    def __getitem__(self, name: str):
+        return self._data[name]
+
+    def get(self, name: str, default=None):
+        return self._data.get(name, default)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._data
+
+
+class SnapshotManager:
+    """
+    Loads registered data files, watches them by mtime/size and rebuilds
+    only the sources that changed on a background thread.
+
+    The new Snapshot is published with a single reference assignment, so
+    readers never see a half-built generation. If a rebuild fails (e.g. a
+    file caught mid-write) the current snapshot is kept and the source is
+    retried on the next poll.
+    """
+
+    def __init__(self, poll_interval: float = 2.0):
+        self.poll_interval = poll_interval
+        self._sources: Dict[str, Tuple[str, Callable[[str], Any]]] = {}
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._current: Optional[Snapshot] = None
+        self._listeners: List[Callable[[Snapshot], None]] = []
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, path: str, builder: Callable[[str], Any] = load_json):
+        """builder(path) turns the file into whatever handlers should read."""
+        self._sources[name] = (path, builder)
+
+    def on_swap(self, callback: Callable[[Snapshot], None]):
+        self._listeners.append(callback)
+
+    def current(self) -> Snapshot:
+        snapshot = self._current
+        if snapshot is None:
+            raise RuntimeError("Data snapshot not loaded")
+        return snapshot
+
+    @staticmethod
+    def _stamp(path: str) -> Tuple[int, int]:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def _version(self) -> str:
+        """Digest of the stamps the current data was built from."""
+        stamps = sorted((name, self._sources[name][0]) + self._stamps[name] for name in self._stamps)
+        return hashlib.sha256(repr(stamps).encode()).hexdigest()[:16]
+
+    def load(self) -> Snapshot:
+        """Synchronous first load; missing or invalid files raise."""
+        with self._reload_lock:
+            data = {}
+            for name, (path, builder) in self._sources.items():
+                stamp = self._stamp(path)
+                data[name] = builder(path)
+                self._stamps[name] = stamp
+
+            self._publish(Snapshot(1, data, self._version()))
+            return self._current
+
+    def refresh(self) -> bool:
+        """Rebuild changed sources and swap; returns True if a new snapshot was published."""
+        with self._reload_lock:
+            previous = self.current()
+            changed = {}
+
+            for name, (path, builder) in self._sources.items():
+                try:
+                    stamp = self._stamp(path)
+                except FileNotFoundError:
+                    continue
+
+                if self._stamps.get(name) == stamp:
+                    continue
+
+                try:
+                    changed[name] = (builder(path), stamp)
+                except Exception as e:
+                    logger.warning("⚠️ Reload of %s (%s) failed, keeping previous data: %s", name, path, e)
+
+            if not changed:
+                return False
+
+            data = {name: previous.get(name) for name in self._sources}
+            for name, (value, stamp) in changed.items():
+                data[name] = value
+                self._stamps[name] = stamp
+
+            self._publish(Snapshot(previous.generation + 1, data, self._version()))
+            logger.info("🔄 Data snapshot %s (generation %s) published (%s)",
+                        self._current.version, self._current.generation, ", ".join(sorted(changed)))
+            return True
+
+    def _publish(self, snapshot: Snapshot):
+        self._current = snapshot
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception:
+                logger.exception("Snapshot listener failed")
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Snapshot refresh failed")
+
+    def start(self):
+        if self._thread is not None or self.poll_interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="snapshot-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
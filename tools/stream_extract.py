@@ -0,0 +1,76 @@
+"""
+Incremental extraction from Indigo response bodies.
+
+ijson parses the body as a stream of events, and only the small objects
+the extractors look at are built: one journey, or the few fields of one
+seat unit, at a time. The full response tree is never materialized, and
+results are yielded while the body is still downloading. Requires ijson;
+HAS_IJSON tells callers to fall back to parsing the whole body.
+"""
+import re
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from tools.seat_inventory import seat_available, seat_type_codes
+
+
+HAS_IJSON = ijson is not None
+
+JOURNEYS = "data.trips.item.journeysAvailable.item"
+SEAT_UNIT = re.compile(r"^data\.seatMaps\.item\.seatMap\.decks\.[^.]+\.compartments\.[^.]+\.units\.item$")
+UNIT_FIELDS = ("designator", "assignable", "availability", "travelClassCode")
+
+
+def iter_journeys(stream) -> Iterator[Dict[str, Any]]:
+    """Each journey of a flight search response, from a file-like byte stream."""
+    return ijson.items(stream, JOURNEYS, use_float=True)
+
+
+def _seat_units(events) -> Iterator[Dict[str, Any]]:
+    """
+    Seat units as dicts of just the keys the seat extractor reads; the
+    other unit fields are skipped without being built.
+    """
+    unit = None
+    unit_prefix = ""
+    fields: Dict[str, str] = {}
+    property_code = ""
+
+    for prefix, event, value in events:
+        if unit is None:
+            if event == "start_map" and prefix.endswith(".units.item") and SEAT_UNIT.match(prefix):
+                unit = {"properties": []}
+                unit_prefix = prefix
+                fields = {f"{prefix}.{key}": key for key in UNIT_FIELDS}
+                property_code = f"{prefix}.properties.item.code"
+            continue
+
+        if prefix == unit_prefix:
+            if event == "end_map":
+                yield unit
+                unit = None
+        elif prefix == property_code:
+            unit["properties"].append({"code": value})
+        elif prefix in fields and event != "map_key":
+            unit[fields[prefix]] = value
+
+
+def iter_available_seats(stream, default_class: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Available seats of a seat map response in the recover_passenger seat
+    format; the same seats, in the same order, as
+    SeatInventory.from_seatmap(...).to_list(dedupe=False).
+    """
+    for seat in _seat_units(ijson.parse(stream, use_float=True)):
+        if not seat_available(seat):
+            continue
+        yield {
+            "seat_number": seat.get("designator"),
+            "travel_class": seat.get("travelClassCode", default_class),
+            "availability": seat.get("availability"),
+            "seat_type": list(seat_type_codes(p.get("code") for p in seat.get("properties", [])))
+        }
@@ -0,0 +1,58 @@
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from tools.metrics import DEFAULT_BUCKETS, counter, histogram
+
+
+logger = logging.getLogger("flight-disruption-tracing")
+
+
+# sent by the dashboard on every MCP call and echoed on its own responses
+TRACE_HEADER = "x-trace-id"
+
+STAGE_SECONDS = histogram(
+    "recovery_stage_seconds",
+    "Time spent in each recovery stage",
+    # local stages take well under the default 5ms first bucket
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025) + DEFAULT_BUCKETS
+)
+
+STAGE_ERRORS = counter(
+    "recovery_stage_errors_total",
+    "Recovery stages that ended with an exception"
+)
+
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+
+def bind_trace_id(trace_id: Optional[str] = None) -> str:
+    """Make trace_id (a new one if empty) the current task's trace id."""
+    trace_id = trace_id or uuid.uuid4().hex
+    _trace_id.set(trace_id)
+    return trace_id
+
+
+@contextmanager
+def span(stage: str, **labels):
+    """
+    Time the block into recovery_stage_seconds{stage=...}, also when it
+    raises; a raise is counted in recovery_stage_errors_total as well.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage, **labels)
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage, **labels)
+        logger.debug("⏱️ trace=%s %s %.1fms", current_trace_id(), stage, elapsed * 1000)
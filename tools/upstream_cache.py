@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from tools.metrics import counter
+
+
+logger = logging.getLogger("flight-disruption-upstream-cache")
+
+
+UPSTREAM_CACHE_REQUESTS = counter(
+    "upstream_cache_requests_total",
+    "Upstream response lookups by cache and outcome (hit, stale, miss, shared)"
+)
+
+
+class UpstreamCache:
+    """
+    TTL cache for upstream responses with stale-while-revalidate and
+    single-flight.
+
+    A value is fresh for `ttl` seconds and may then be served for another
+    `stale` seconds. A stale read returns at once and starts one background
+    refresh. A miss waits for the single fetch in flight for its key, so N
+    concurrent misses cost one upstream call. fetch() returning None means
+    failure: nothing is cached and a stale value stays until it runs out.
+    Values are shared, so callers must not mutate them.
+    """
+
+    def __init__(self, name: str, ttl: float = 30, stale: float = 60, max_entries: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.ttl = ttl
+        self.stale = stale
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            fresh_until, stale_until, value = entry
+            now = self._clock()
+            if now < fresh_until:
+                UPSTREAM_CACHE_REQUESTS.inc(cache=self.name, outcome="hit")
+                self._entries.move_to_end(key)
+                return value
+            if now < stale_until:
+                UPSTREAM_CACHE_REQUESTS.inc(cache=self.name, outcome="stale")
+                if key not in self._inflight:
+                    task = self._start(key, fetch)
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                return value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            UPSTREAM_CACHE_REQUESTS.inc(cache=self.name, outcome="miss")
+            task = self._start(key, fetch)
+        else:
+            UPSTREAM_CACHE_REQUESTS.inc(cache=self.name, outcome="shared")
+
+        # the fetch outlives a cancelled caller so the others (and the cache) still get it
+        return await asyncio.shield(task)
+
+    def _start(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, fetch))
+        return task
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        try:
+            value = await fetch()
+        except Exception as e:
+            logger.warning("⚠️ %s fetch for %s failed: %s", self.name, key, e)
+            value = None
+        finally:
+            self._inflight.pop(key, None)
+
+        if value is not None and self.ttl + self.stale > 0:
+            now = self._clock()
+            self._entries[key] = (now + self.ttl, now + self.ttl + self.stale, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value